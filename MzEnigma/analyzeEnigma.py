@@ -18,15 +18,20 @@ to get sufficient analysis results.
 """
 
 from __future__ import annotations
-from typing import Optional, Callable, Dict, List, Tuple
+from typing import Optional, Union, Callable, Dict, List, Tuple, Iterator
 
 import copy
 import random
 import itertools
 import pickle
+import os
 import os.path
+import math
+import heapq
+import tempfile
+import concurrent.futures
 
-import networkx
+import numpy
 
 import MzEnigma
 
@@ -88,7 +93,7 @@ class TagesschluesselRange(object):
     self.zusatzwalzenList.append(walze)
   assert umkehrwalzenList is not None or len(self.enigma.umkehrwalzen) == 1, '{}: umkehrwalzenList is required'.format(self.__class__.__name__)
   if umkehrwalzenList is None:
-   umkehrwalzenList = [ self.enigma.umkehrwalzen ]
+   umkehrwalzenList = self.enigma.umkehrwalzen
   self.umkehrwalzenList = list()
   for _walze in umkehrwalzenList:
    walze = copy.deepcopy(_walze)
@@ -97,13 +102,18 @@ class TagesschluesselRange(object):
   self.spruchScoring = spruchScoring 
  
  @classmethod
- def rejewskiAttack(cls, catalog : List[Tuple[MzEnigma.Tagesschluessel, List[List[str]]]], encodedSpruchSchluessel : str) -> List[Tuple[MzEnigma.Tagesschluessel, str]]:
-  """Find candidate values for the unencoded SpruchSchluessel from a catalog
+ def rejewskiAttack(cls, 
+  catalog : Union[List[Tuple[MzEnigma.Tagesschluessel, List[List[str]]]], MzEnigma.RejewskiCatalog], 
+  encodedSpruchSchluessel : str) -> List[Tuple[MzEnigma.Tagesschluessel, str]]:
+  """Find candidate values for the unencoded SpruchSchluessel from a catalog.
+  A 'RejewskiCatalog' is searched by its index, any other catalog is scanned entry by entry.
 
 :param catalog: catalog of encoded spruchschluessels (required)
 :param encodedSpruchSchluessel: encoded spruchschluessels to be found (required)
 :returns: List[Tuple[Tagesschluessel, unencodedSpruchSchluessel]]
   """
+  if isinstance(catalog, MzEnigma.RejewskiCatalog):
+   return catalog.find(encodedSpruchSchluessel)
   cls.checkRejewskiCatalog(catalog)
   firstKey, firstItem = catalog[0]
   alphabet = firstKey.alphabet
@@ -124,44 +134,62 @@ class TagesschluesselRange(object):
    
   return validCandidates
 
- def createRejewskiCatalog(self, pickleFile : Optional[str] = None) -> List[Tuple[MzEnigma.Tagesschluessel, List[List[str]]]]:
+ def createRejewskiCatalog(self, 
+  pickleFile : Optional[str] = None, 
+  catalogFile : Optional[str] = None, 
+  checkpointDir : Optional[str] = None, 
+  resume : bool = False, 
+  workers : int = 1) -> Union[List[Tuple[MzEnigma.Tagesschluessel, List[List[str]]]], MzEnigma.RejewskiCatalog]:
   """Build up a catalog of encoded spruchschluessels. Works only without a steckerbrett. 
+With a *catalogFile*, an indexed, memory mapped catalog is created instead of a list (see `RejewskiCatalog`).
+With a *checkpointDir*, the entries of each Umkehrwalze and Walzen order are saved as soon as they are completed, 
+i.e. an interrupted build is continued by *resume* (see `Checkpoint`).
+With *workers* > 1, the Umkehrwalze and Walzen orders are sharded across a process pool, each worker writes
+its shards independently (to the checkpoint directory or a temporary directory), finally the shards are merged
+in the order of the serial build, i.e. the catalog does not depend on the number of workers.
 
 :param pickleFile: pickle file to be created (optional)
-:returns: List[Tuple[Tagesschluessel, List[List[Doublet]]]
+:param catalogFile: indexed catalog file to be created (optional)
+:param checkpointDir: checkpoint directory (optional)
+:param resume: skip the Umkehrwalze and Walzen orders completed in the checkpoint directory
+:param workers: number of worker processes (1: no process pool, 0: number of CPUs)
+:returns: List[Tuple[Tagesschluessel, List[List[Doublet]]] or RejewskiCatalog
   """
+  info = MzEnigma.tracing.getTracer('analysis').emitter(MzEnigma.tracing.INFO, self.notify)
+  debug = MzEnigma.tracing.getTracer('analysis').emitter(MzEnigma.tracing.DEBUG, self.notify)
   assert self.enigma.steckerbrett is None, '{}.createRejewskiCatalog: engines with steckerbrett are not supported'.format(self.__class__.__name__)
+  assert pickleFile is None or catalogFile is None, '{}.createRejewskiCatalog: either pickleFile or catalogFile'.format(self.__class__.__name__)
+  assert workers >= 0, '{}.createRejewskiCatalog: workers = {} >= 0 required'.format(self.__class__.__name__, workers)
   if pickleFile is not None:
    pickleFile = os.path.normpath(pickleFile)
    assert not os.path.exists(pickleFile), '{}.createRejewskiCatalog: pickle file {} is already exising'.format(self.__class__.__name__, pickleFile)
-  gTagesschluessel = MzEnigma.Tagesschluessel(enigma = self.enigma, notify = None)
-  rejewskiList = list()
-  for umkehrwalze in self.umkehrwalzenList:
-   if self.notify:
-    self.notify('{}.createRejewskiCatalog: - examining umkehrwalze = {}'.format(self.__class__.__name__, umkehrwalze.name))
-   for walzen in self.walzenList:
-    if self.notify:
-     nameList = list()
-     for walze in walzen:
-      nameList.append(walze.name)
-     self.notify('{}.createRejewskiCatalog:  - examining walzen = {}'.format(self.__class__.__name__, nameList))
-    for tagesWalzenStellungenID, tagesWalzenStellungenTuple in enumerate(self.tagesWalzenStellungenList):
-     tagesWalzenStellungen = ''.join(tagesWalzenStellungenTuple)
-     if self.notify:
-      self.notify('{}.createRejewskiCatalog:   + examining tagesWalzenStellungen = {} ({} of {})'.format(self.__class__.__name__, tagesWalzenStellungen, tagesWalzenStellungenID,  len(self.tagesWalzenStellungenList)))
-     if len(self.zusatzwalzenList) > 0:
-      for zusatzwalze in self.zusatzwalzenList:
-       if self.notify:
-        self.notify('{}.createRejewskiCatalog:  - examining zusatzwalze = {}'.format(self.__class__.__name__, zusatzwalze.name))
-       tagesschluessel = MzEnigma.Tagesschluessel.changeWalzen(
-                                  gTagesschluessel, walzen = walzen, tagesWalzenStellungen = tagesWalzenStellungen, umkehrwalze = umkehrwalze, zusatzwalze = zusatzwalze)
-       rejewskiList.append((tagesschluessel, tagesschluessel.findDoublets(first = 0, second = self.enigma.numberOfWalzen, all = True)))
-     else:
-      tagesschluessel = MzEnigma.Tagesschluessel.changeWalzen(
-                                 gTagesschluessel, walzen = walzen, tagesWalzenStellungen = tagesWalzenStellungen, umkehrwalze = umkehrwalze)
-      rejewskiList.append((tagesschluessel, tagesschluessel.findDoublets(first = 0, second = self.enigma.numberOfWalzen, all = True)))
+  if catalogFile is not None:
+   catalogFile = os.path.normpath(catalogFile)
+   assert not os.path.exists(catalogFile), '{}.createRejewskiCatalog: catalog file {} is already exising'.format(self.__class__.__name__, catalogFile)
+  if workers == 0:
+   workers = os.cpu_count() or 1
+  indexed = catalogFile is not None
+  checkpoint = self._checkpoint(checkpointDir, resume, 'createRejewskiCatalog', indexed = indexed)
+  shardDir = None
+  try:
+   if workers > 1:
+    if checkpoint is None:
+     shardDir = tempfile.TemporaryDirectory(prefix = 'rejewski')
+     checkpoint = self._checkpoint(shardDir.name, False, 'createRejewskiCatalog', indexed = indexed)
+    self._parallelRejewskiShards(checkpoint, indexed, workers, info)
+   # merge: the shards completed by the workers are loaded, any other shard is examined serially
+   shards = self._rejewskiShards(checkpoint, indexed, info, debug)
+  finally:
+   if shardDir is not None:
+    shardDir.cleanup()
+  if indexed:
+   components = self._detachedComponents()
+   components['alphabet'] = self.enigma.alphabet
+   MzEnigma.RejewskiCatalog.save(catalogFile, components, numpy.concatenate(shards))
+   return MzEnigma.RejewskiCatalog(catalogFile)
+  rejewskiList = list(itertools.chain.from_iterable(shards))
   if pickleFile is not None:
-   pickle.dump( rejewskiList, open( pickleFile, "wb" ) )
+   MzEnigma.Checkpoint.dump(rejewskiList, pickleFile)
   return rejewskiList
   
  @classmethod
@@ -181,187 +209,483 @@ class TagesschluesselRange(object):
   assert isinstance(firstItem[0][0], str), '{}.checkRejewskiCatalog: improper catalog item.item, str espected'.format(cls.__class__.__name__)  
 
  @classmethod
- def loadRejewskiCatalog(cls, pickleFile : str) -> List[Tuple[MzEnigma.Tagesschluessel, List[List[str]]]]:
-  """Build up a catalog of encoded spruchschluessels  
+ def loadRejewskiCatalog(cls, pickleFile : str) -> Union[List[Tuple[MzEnigma.Tagesschluessel, List[List[str]]]], MzEnigma.RejewskiCatalog]:
+  """Load a catalog of encoded spruchschluessels, either pickled or indexed (see `RejewskiCatalog`)
 
-:returns: List[Tuple[Tagesschluessel, List[List[Doublet]]]
+:returns: List[Tuple[Tagesschluessel, List[List[Doublet]]] or RejewskiCatalog
   """
   pickleFile = os.path.normpath(pickleFile)
   assert os.path.isfile(pickleFile), '{}.loadRejewskiCatalog: pickle file {} is not or not a file'.format(cls.__class__.__name__, pickleFile)
+  if MzEnigma.RejewskiCatalog.isCatalogFile(pickleFile):
+   return MzEnigma.RejewskiCatalog(pickleFile)
   rejewskiList = pickle.load( open( pickleFile, "rb" ) )
   cls.checkRejewskiCatalog(rejewskiList)
   return rejewskiList
 
- def turingAttack(self, encodedSpruch : str = '', crib : str = '', startingPosition : int = 0) -> List[Tuple[MzEnigma.Tagesschluessel, List[Tuple[str, str]]]]:
+ def _rejewskiRecords(self, key : MzEnigma.CompactTagesschluessel, umkehrwalzeID : int, walzenID : int) -> numpy.ndarray:
+  """Records of all tagesWalzenStellungen and zusatzwalzen of an Umkehrwalze and Walzen order (see `RejewskiCatalog.recordType`)
+
+:param key: CompactTagesschluessel bound to the umkehrwalze and walzen
+:param umkehrwalzeID: index of the umkehrwalze
+:param walzenID: index of the walzen
+:returns: records in the order of tagesWalzenStellungen and zusatzwalzen
+  """
+  k = self.enigma.numberOfWalzen
+  nPos = len(self.enigma.alphabet)
+  records = numpy.zeros((len(self.tagesWalzenStellungenList), max(1, len(self.zusatzwalzenList))), dtype = MzEnigma.RejewskiCatalog.recordType(nPos, k))
+  records['umkehrwalze'] = umkehrwalzeID
+  records['walzen'] = walzenID
+  for zusatzwalzeID, positions, tables in self._indicatorTables(key):
+   # doublets (first, second) of the positions (n, k + n), see Tagesschluessel.findDoublets
+   records['zusatzwalze'][:, zusatzwalzeID] = zusatzwalzeID
+   records['tagesWalzenStellungen'][:, zusatzwalzeID] = positions
+   records['doublets'][:, zusatzwalzeID] = numpy.stack((tables[:, :k], tables[:, k:]), axis = 2)
+  return records.ravel()
+
+ def _indicatorTables(self, key : MzEnigma.CompactTagesschluessel) -> Iterator[Tuple[int, numpy.ndarray, numpy.ndarray]]:
+  """Permutations of the twice encoded spruchschluessel for all tagesWalzenStellungen, zusatzwalze by zusatzwalze
+
+:param key: CompactTagesschluessel bound to an umkehrwalze and walzen
+:returns: iterator of (zusatzwalzeID, tagesWalzenStellungen codes, permutation tables of shape (nStellungen, 2*numberOfWalzen, len(alphabet)))
+  """
+  for zusatzwalzeID in range(max(1, len(self.zusatzwalzenList))):
+   if self.zusatzwalzenList:
+    key.rebind(zusatzwalze = self.zusatzwalzenList[zusatzwalzeID])
+   scrambler = key.scrambler()
+   positions = scrambler.walzenStellungenCodes(self.tagesWalzenStellungenList)
+   yield zusatzwalzeID, positions, scrambler.permutationTableBatch(positions, 2*self.enigma.numberOfWalzen)
+
+ def _rejewskiShards(self, 
+  checkpoint : Optional[MzEnigma.Checkpoint], 
+  indexed : bool, 
+  info : Optional[Callable[..., None]], 
+  debug : Optional[Callable[..., None]]) -> List[Union[List[Tuple[MzEnigma.Tagesschluessel, List[List[str]]]], numpy.ndarray]]:
+  """Shards of `createRejewskiCatalog` in the order of Umkehrwalzen and Walzen, loaded from the *checkpoint* if completed
+
+:returns: entries or records (if *indexed*) of every Umkehrwalze and Walzen order
+  """
+  key = MzEnigma.CompactTagesschluessel(enigma = self.enigma, walzen = self.walzenList[0], 
+                                                               tagesWalzenStellungen = self.enigma.numberOfWalzen * self.enigma.alphabet[0])
+  shards = list()
+  for umkehrwalzeID, umkehrwalze in enumerate(self.umkehrwalzenList):
+   if info is not None:
+    info('umkehrwalze', '{}.createRejewskiCatalog: - examining umkehrwalze = {}', self.__class__.__name__, umkehrwalze.name)
+   for walzenID, walzen in enumerate(self.walzenList):
+    if checkpoint is not None and checkpoint.isDone((umkehrwalzeID, walzenID)):
+     if info is not None:
+      info('walzen', '{}.createRejewskiCatalog:  - loading walzen = {}', self.__class__.__name__, [walze.name for walze in walzen])
+     shards.append(checkpoint.load((umkehrwalzeID, walzenID)))
+     continue
+    if info is not None:
+     info('walzen', '{}.createRejewskiCatalog:  - examining walzen = {}', self.__class__.__name__, [walze.name for walze in walzen])
+    shards.append(self._rejewskiShard(key, umkehrwalzeID, walzenID, indexed, info, debug))
+    if checkpoint is not None:
+     checkpoint.save((umkehrwalzeID, walzenID), shards[-1])
+  return shards
+
+ def _rejewskiShard(self, 
+  key : MzEnigma.CompactTagesschluessel, 
+  umkehrwalzeID : int, 
+  walzenID : int, 
+  indexed : bool, 
+  info : Optional[Callable[..., None]] = None, 
+  debug : Optional[Callable[..., None]] = None) -> Union[List[Tuple[MzEnigma.Tagesschluessel, List[List[str]]]], numpy.ndarray]:
+  """Entries or records (if *indexed*) of all tagesWalzenStellungen and zusatzwalzen of an Umkehrwalze and Walzen order
+
+:param key: CompactTagesschluessel to be rebound
+:param umkehrwalzeID: index of the umkehrwalze
+:param walzenID: index of the walzen
+:param indexed: records of a `RejewskiCatalog` instead of catalog entries
+:returns: List[Tuple[Tagesschluessel, List[List[Doublet]]] or records
+  """
+  key.rebind(walzen = self.walzenList[walzenID], umkehrwalze = self.umkehrwalzenList[umkehrwalzeID])
+  if indexed:
+   return self._rejewskiRecords(key, umkehrwalzeID, walzenID)
+  shardList = list()
+  for tagesWalzenStellungenID, tagesWalzenStellungenTuple in enumerate(self.tagesWalzenStellungenList):
+   tagesWalzenStellungen = ''.join(tagesWalzenStellungenTuple)
+   if debug is not None:
+    debug('candidate', '{}.createRejewskiCatalog:   + examining tagesWalzenStellungen = {} ({} of {})', self.__class__.__name__, tagesWalzenStellungen, tagesWalzenStellungenID,  len(self.tagesWalzenStellungenList))
+   if len(self.zusatzwalzenList) > 0:
+    for zusatzwalze in self.zusatzwalzenList:
+     if info is not None:
+      info('zusatzwalze', '{}.createRejewskiCatalog:  - examining zusatzwalze = {}', self.__class__.__name__, zusatzwalze.name)
+     key.rebind(tagesWalzenStellungen = tagesWalzenStellungen, zusatzwalze = zusatzwalze)
+     shardList.append((key.toTagesschluessel(), key.findDoublets(first = 0, second = self.enigma.numberOfWalzen, all = True)))
+   else:
+    key.rebind(tagesWalzenStellungen = tagesWalzenStellungen)
+    shardList.append((key.toTagesschluessel(), key.findDoublets(first = 0, second = self.enigma.numberOfWalzen, all = True)))
+  return shardList
+
+ def _parallelRejewskiShards(self, 
+  checkpoint : MzEnigma.Checkpoint, 
+  indexed : bool, 
+  workers : int, 
+  info : Optional[Callable[..., None]]) -> None:
+  """Process pool variant of `_rejewskiShards`.
+  The workers rebuild the components from their definitions and write the shards missing in the *checkpoint*, i.e. only plain data cross the process boundary.
+  """
+  tasks = [(umkehrwalzeID, walzenID) for umkehrwalzeID in range(len(self.umkehrwalzenList)) for walzenID in range(len(self.walzenList)) 
+              if not checkpoint.isDone((umkehrwalzeID, walzenID))]
+  if not tasks:
+   return
+  context = self._componentDefinitions()
+  context.update({
+   'tagesWalzenStellungenList': [''.join(v) for v in self.tagesWalzenStellungenList],
+   'blank': self.blank,
+   'checkpointDirectory': checkpoint.directory,
+   'checkpointTask': checkpoint.task,
+   'indexed': indexed })
+  with concurrent.futures.ProcessPoolExecutor(max_workers = min(workers, len(tasks)), initializer = _initRejewskiWorker, initargs = (context, )) as executor:
+   for umkehrwalzeID, walzenID in executor.map(_rejewskiWorker, tasks):
+    if info is not None:
+     info('walzen', '{}.createRejewskiCatalog:  - examined umkehrwalze = {}, walzen = {}', self.__class__.__name__, 
+            self.umkehrwalzenList[umkehrwalzeID].name, [walze.name for walze in self.walzenList[walzenID]])
+
+ def createCyclometerCatalog(self, pickleFile : Optional[str] = None) -> MzEnigma.CyclometerCatalog:
+  """Build up a catalog of the characteristics of all Tagesschluessels (see `cyclometer`).
+  The characteristic does not depend on the Steckerbrett, i.e. engines with steckerbrett are supported.
+
+:param pickleFile: pickle file to be created (optional)
+:returns: CyclometerCatalog
+  """
+  info = MzEnigma.tracing.getTracer('analysis').emitter(MzEnigma.tracing.INFO, self.notify)
+  if pickleFile is not None:
+   pickleFile = os.path.normpath(pickleFile)
+   assert not os.path.exists(pickleFile), '{}.createCyclometerCatalog: pickle file {} is already exising'.format(self.__class__.__name__, pickleFile)
+  k = self.enigma.numberOfWalzen
+  nStellungen = len(self.tagesWalzenStellungenList)
+  nZusatzwalzen = max(1, len(self.zusatzwalzenList))
+  # the permutations of the scrambler without steckerbrett define the characteristic
+  key = MzEnigma.CompactTagesschluessel(enigma = self.enigma, walzen = self.walzenList[0],
+                                                               tagesWalzenStellungen = k * self.enigma.alphabet[0])
+  recordsList = list()
+  productsList = list()
+  for umkehrwalzeID, umkehrwalze in enumerate(self.umkehrwalzenList):
+   if info is not None:
+    info('umkehrwalze', '{}.createCyclometerCatalog: - examining umkehrwalze = {}', self.__class__.__name__, umkehrwalze.name)
+   for walzenID, walzen in enumerate(self.walzenList):
+    if info is not None:
+     info('walzen', '{}.createCyclometerCatalog:  - examining walzen = {}', self.__class__.__name__, [walze.name for walze in walzen])
+    key.rebind(walzen = walzen, umkehrwalze = umkehrwalze)
+    records = numpy.zeros((nStellungen, nZusatzwalzen), dtype = MzEnigma.CyclometerCatalog.recordType(k))
+    records['umkehrwalze'] = umkehrwalzeID
+    records['walzen'] = walzenID
+    products = numpy.empty((nStellungen, nZusatzwalzen, k, len(self.enigma.alphabet)), dtype = numpy.intp)
+    for zusatzwalzeID, positions, tables in self._indicatorTables(key):
+     records['zusatzwalze'][:, zusatzwalzeID] = zusatzwalzeID
+     records['tagesWalzenStellungen'][:, zusatzwalzeID] = positions
+     products[:, zusatzwalzeID] = MzEnigma.CyclometerCatalog.products(tables)
+    recordsList.append(records.ravel())
+    productsList.append(products.reshape(-1, k, len(self.enigma.alphabet)))
+  records = numpy.concatenate(recordsList)
+  characteristicsList = MzEnigma.CyclometerCatalog._characteristics(numpy.concatenate(productsList))
+  characteristicIDs : Dict[Tuple[Tuple[int, ...], ...], int] = dict()
+  records['characteristic'] = [characteristicIDs.setdefault(characteristic, len(characteristicIDs)) for characteristic in characteristicsList]
+  components = self._detachedComponents()
+  components['alphabet'] = self.enigma.alphabet
+  catalog = MzEnigma.CyclometerCatalog(components, records, list(characteristicIDs.keys()))
+  if info is not None:
+   info('catalog', '{}.createCyclometerCatalog: {} Tagesschluessels, {} characteristics', self.__class__.__name__, len(catalog), len(characteristicIDs))
+  if pickleFile is not None:
+   catalog.save(pickleFile)
+  return catalog
+
+ @classmethod
+ def cyclometerAttack(cls,
+  catalog : MzEnigma.CyclometerCatalog,
+  encodedSpruchSchluesselList : List[str]) -> List[MzEnigma.Tagesschluessel]:
+  """Find candidate Tagesschluessels of a day by the characteristic of its spruchschluessels (see `cyclometer`).
+  The Steckerbrett of the candidates is unconnected, it is derived e.g. by `gilloglyAttackPhase2`.
+
+:param catalog: catalog of the characteristics (required)
+:param encodedSpruchSchluesselList: twice encoded spruchschluessels of a day, each letter must be found at each position (required)
+:returns: List[Tagesschluessel]
+  """
+  return catalog.find(MzEnigma.CyclometerCatalog.characteristic(encodedSpruchSchluesselList, catalog.alphabet))
+
+ def turingAttack(self, 
+  encodedSpruch : str = '', 
+  crib : Union[str, MzEnigma.CribMenu] = '', 
+  startingPosition : int = 0, 
+  diagonalBoard : bool = False, 
+  checkpointDir : Optional[str] = None, 
+  resume : bool = False, 
+  workers : int = 1) -> List[Tuple[MzEnigma.Tagesschluessel, List[Tuple[str, List[Dict[str, str]]]]]]:
   """Turing attack to derive candidate settings for Umkehrwalze, Walzen, Zusatzwalze, Tageswalzenstellungen and several settings of the Steckerbrett
 An engine with Steckerbrett is required.
 The rate of correct Tagesschluessels increases with increasing length of the crib.
+The menu of the crib is compiled once and run by a `Bombe` for all Umkehrwalzen, Walzen and Zusatzwalzen.
+With a *checkpointDir*, the stops of each Umkehrwalze, Walzen order and Zusatzwalze are saved as soon as they are completed, 
+i.e. an interrupted attack is continued by *resume* (see `Checkpoint`).
+With *workers* > 1, the Umkehrwalzen, Walzen orders and Zusatzwalzen are sharded across a process pool. 
+Each worker gets the crib and the plain definitions of the components once (no component is pickled), compiles the menu, builds the scrambler tables of its shards itself and returns the stops only, 
+which are reported (and saved to the checkpoint) as soon as they are found. The result does not depend on the number of workers.
 
 :param encodedSpruch: encoded message to be attacked (required)
-:param crib: unencoded crib to be found in the message (required) 
-:param startingPosition: starting position of the crib in the message
+:param crib: unencoded crib to be found in the message or its compiled 'CribMenu' (required) 
+:param startingPosition: starting position of the crib in the message (ignored for a 'CribMenu')
+:param diagonalBoard: use the diagonal board of the bombe, i.e. reject stops with an inconsistent Steckerbrett
+:param checkpointDir: checkpoint directory (optional)
+:param resume: skip the Umkehrwalzen, Walzen orders and Zusatzwalzen completed in the checkpoint directory
+:param workers: number of worker processes (1: no process pool, 0: number of CPUs)
 :return: List[Tuple[Tagesschluessel, List[Tuple[Walzenstellungen, Steckerbrett.wiring]]]]
   """
-  def connectBus(id : int, v : str) -> bool:
-   '''Heart of the turing bomb - the bus is restricted to the ONE active line with a character
-   
-   :param id: bus to be used
-   :param v: input value
-   :return: boolean indicating success
-   '''
-   nonlocal graph, ecList, buses
-   if buses[id] is None:
-    buses[id] = v
-    vID = self.enigma.alphabet.index(v)
-    for tgtID in graph.neighbors(id):
-     for _, posDict in graph[id][tgtID].items():
-      pos = posDict['pos']
-      tgtV = ecList[vID][pos]
-      if not connectBus(tgtID, tgtV):
-       return False
-    return True
-   else:
-    return buses[id] == v
-   
-  def getValidWalzenStellungen(tagesschluessel : MzEnigma.Tagesschluessel) -> List[Tuple[str, List[Dict[str, str]]]]: 
-   nonlocal ecList, buses, firstBus, spruchLen, graph
-   if self.notify:
-    self.notify('{}.turingAttack: \n{}'.format(self.__class__.__name__, tagesschluessel))
-   oldTagesWalzenStellungen = tagesschluessel.tagesWalzenStellungen
+  info = MzEnigma.tracing.getTracer('analysis').emitter(MzEnigma.tracing.INFO, self.notify)
+  debug = MzEnigma.tracing.getTracer('analysis').emitter(MzEnigma.tracing.DEBUG, self.notify)
+  def getValidWalzenStellungen(tagesschluessel : MzEnigma.CompactTagesschluessel, shard : Tuple[int, int, int]) -> List[Tuple[str, List[Dict[str, str]]]]: 
+   if shard in completed:
+    return completed[shard]
+   if checkpoint is not None and checkpoint.isDone(shard):
+    if info is not None:
+     info('checkpoint', '{}.turingAttack:  - resuming shard {}', self.__class__.__name__, shard)
+    return checkpoint.load(shard)
+   if debug is not None:
+    debug('tagesschluessel', '{}.turingAttack: \n{}', self.__class__.__name__, tagesschluessel)
+   stopsList = bombe.run(tagesschluessel.scrambler(), tagesWalzenStellungenList)
    candidateSteckerbrettList = list()
-   for tagesWalzenStellungenID, tagesWalzenStellungenTuple in enumerate(self.tagesWalzenStellungenList):
-    knownWirings = list()
-    tagesschluessel.tagesWalzenStellungen = ''.join(tagesWalzenStellungenTuple)
-    if self.notify:
-     self.notify('{}.turingAttack:  - examining tagesWalzenStellungen = {} ({} of {})'.format(self.__class__.__name__, tagesschluessel.tagesWalzenStellungen, tagesWalzenStellungenID,  len(self.tagesWalzenStellungenList)))
-    ecList = list()
-    for nc, c in enumerate(self.enigma.alphabet):
-     ecList.append(list())
-     for cs in tagesschluessel.encode(spruchLen * c):
-      ecList[-1].append(cs)
-    
-    for v in self.enigma.alphabet:
-     if self.notify:
-       self.notify('{}.turingAttack:  + examining "{}"'.format(self.__class__.__name__, v))
-     buses = len(self.enigma.alphabet) * [ None ]
-     if connectBus(firstBus, v):
-      knownWiring = dict()
-      for n, id in enumerate(buses):
-       if id is not None:
-        knownWiring[self.enigma.alphabet[n]] = id
-      keys = list(knownWiring.keys())
-      for key in keys:
-       value = knownWiring[key]
-       if value not in keys:
-        knownWiring[value] = key
-      knownWirings.append(knownWiring)
-      if self.notify:
-       self.notify('{}.turingAttack:   wiring {} found'.format(self.__class__.__name__, knownWiring))
-    candidateSteckerbrettList.append((tagesschluessel.tagesWalzenStellungen, knownWirings))
-   tagesschluessel.tagesWalzenStellungen = oldTagesWalzenStellungen
+   for tagesWalzenStellungenID, (tagesWalzenStellungen, knownWirings) in enumerate(zip(tagesWalzenStellungenList, stopsList)):
+    if debug is not None:
+     debug('candidate', '{}.turingAttack:  - examining tagesWalzenStellungen = {} ({} of {})', self.__class__.__name__, tagesWalzenStellungen, tagesWalzenStellungenID,  len(tagesWalzenStellungenList))
+    if info is not None:
+     for knownWiring in knownWirings:
+      info('wiring', '{}.turingAttack:   wiring {} found', self.__class__.__name__, knownWiring)
+    candidateSteckerbrettList.append((tagesWalzenStellungen, knownWirings))
+   if checkpoint is not None:
+    checkpoint.save(shard, candidateSteckerbrettList)
    return candidateSteckerbrettList
 
   assert self.enigma.steckerbrett is not None, '{}.turingAttack: engines without steckerbrett are not supported'.format(self.__class__.__name__)
-  posList = MzEnigma.Enigma.validCribPositions(encodedSpruch, crib)
-  assert startingPosition in posList, '{}.turingAttack: {} is not a valid starting position, use in {}'.format(self.__class__.__name__, startingPosition, posList)
-  encodedSpruch = encodedSpruch[startingPosition:]
-  ecList = list()
-  buses = list()
-  
-  # We need to use a MultiGraph, since the menu may contain duplicate edges (with different positions) 
-  graph = networkx.MultiGraph()
-
-  for pos, cc in enumerate(crib):
-   icc = self.enigma.alphabet.index(cc)
-   iec = self.enigma.alphabet.index(encodedSpruch[pos])
-   graph.add_edge(icc, iec, pos = pos)
-  firstBus = sorted(graph.adjacency(), key = lambda item: len(item[1]), reverse = True)[0][0]
- 
-  spruchLen = len(crib)
-  encodedSpruch = encodedSpruch[:spruchLen]
+  assert workers >= 0, '{}.turingAttack: workers = {} >= 0 required'.format(self.__class__.__name__, workers)
+  if workers == 0:
+   workers = os.cpu_count() or 1
+  if isinstance(crib, MzEnigma.CribMenu):
+   menu = crib
+   assert menu.alphabet == self.enigma.alphabet, '{}.turingAttack: alphabet of the menu must match'.format(self.__class__.__name__)
+  else:
+   posList = MzEnigma.Enigma.validCribPositions(encodedSpruch, crib)
+   assert startingPosition in posList, '{}.turingAttack: {} is not a valid starting position, use in {}'.format(self.__class__.__name__, startingPosition, posList)
+   menu = MzEnigma.CribMenu(encodedSpruch, crib, startingPosition, self.enigma.alphabet)
+  if info is not None:
+   info('menu', '{}.turingAttack: test register = {}, {} loops, {:.3g} false stops expected per Walzen order', self.__class__.__name__, 
+          menu.testRegister, len(menu.loops), menu.expectedFalseStops(len(self.tagesWalzenStellungenList)))
+  bombe = MzEnigma.Bombe(menu, diagonalBoard)
+  tagesWalzenStellungenList = [''.join(v) for v in self.tagesWalzenStellungenList]
+  checkpoint = self._checkpoint(checkpointDir, resume, 'turingAttack', menu = menu, diagonalBoard = diagonalBoard)
+  completed : Dict[Tuple[int, int, int], List[Tuple[str, List[Dict[str, str]]]]] = dict()
+  if workers > 1:
+   completed = self._parallelTuringShards(menu, diagonalBoard, checkpoint, workers, info)
   
-  gTagesschluessel = MzEnigma.Tagesschluessel(enigma = self.enigma, 
-                                                                 steckerbrett = copy.deepcopy(MzEnigma.UnconnectedSteckerbrett), 
-                                                                 tagesWalzenStellungen = self.enigma.numberOfWalzen * 'A', 
-                                                                 blank = self.blank, notify = None)
+  unconnectedSteckerbrett = MzEnigma.machines['UnconnectedSteckerbrett']
+  key = MzEnigma.CompactTagesschluessel(enigma = self.enigma, walzen = self.walzenList[0], 
+                                                               steckerbrettWiring = unconnectedSteckerbrett.wiring, 
+                                                               tagesWalzenStellungen = self.enigma.numberOfWalzen * 'A', blank = self.blank)
   validCandidates = list()
-  for umkehrwalze in self.umkehrwalzenList:
-   if self.notify:
-    self.notify('{}.turingAttack: - examining umkehrwalze = {}'.format(self.__class__.__name__, umkehrwalze.name))
-   for walzen in self.walzenList:
-    if self.notify:
-     nameList = list()
-     for walze in walzen:
-      nameList.append(walze.name)
-     self.notify('{}.turingAttack:  - examining walzen = {}'.format(self.__class__.__name__, nameList))
+  for umkehrwalzeID, umkehrwalze in enumerate(self.umkehrwalzenList):
+   if info is not None:
+    info('umkehrwalze', '{}.turingAttack: - examining umkehrwalze = {}', self.__class__.__name__, umkehrwalze.name)
+   for walzenID, walzen in enumerate(self.walzenList):
+    if info is not None:
+     info('walzen', '{}.turingAttack:  - examining walzen = {}', self.__class__.__name__, [walze.name for walze in walzen])
     if len(self.zusatzwalzenList) > 0:
-     for zusatzwalze in self.zusatzwalzenList:
-      if self.notify:
-       self.notify('{}.turingAttack:  - examining zusatzwalze = {}'.format(self.__class__.__name__, zusatzwalze.name))
-      tagesschluessel = MzEnigma.Tagesschluessel.changeWalzen(
-                                 gTagesschluessel, walzen = walzen, tagesWalzenStellungen = gTagesschluessel.tagesWalzenStellungen, 
-                                 umkehrwalze = umkehrwalze, zusatzwalze = zusatzwalze)
-      candidateSteckerbrettList = getValidWalzenStellungen(tagesschluessel)
+     for zusatzwalzeID, zusatzwalze in enumerate(self.zusatzwalzenList):
+      if info is not None:
+       info('zusatzwalze', '{}.turingAttack:  - examining zusatzwalze = {}', self.__class__.__name__, zusatzwalze.name)
+      key.rebind(walzen = walzen, umkehrwalze = umkehrwalze, zusatzwalze = zusatzwalze)
+      candidateSteckerbrettList = getValidWalzenStellungen(key, (umkehrwalzeID, walzenID, zusatzwalzeID))
       if len(candidateSteckerbrettList) > 0:
-       validCandidates.append((copy.deepcopy(tagesschluessel), candidateSteckerbrettList))
+       validCandidates.append((key.toTagesschluessel(steckerbrett = copy.deepcopy(unconnectedSteckerbrett)), candidateSteckerbrettList))
     else:
-     tagesschluessel = MzEnigma.Tagesschluessel.changeWalzen( 
-                                gTagesschluessel, walzen = walzen, tagesWalzenStellungen = gTagesschluessel.tagesWalzenStellungen, umkehrwalze = umkehrwalze)
-     candidateSteckerbrettList = getValidWalzenStellungen(tagesschluessel)
+     key.rebind(walzen = walzen, umkehrwalze = umkehrwalze)
+     candidateSteckerbrettList = getValidWalzenStellungen(key, (umkehrwalzeID, walzenID, 0))
      if len(candidateSteckerbrettList) > 0:
-      validCandidates.append((copy.deepcopy(tagesschluessel), candidateSteckerbrettList))
+      validCandidates.append((key.toTagesschluessel(steckerbrett = copy.deepcopy(unconnectedSteckerbrett)), candidateSteckerbrettList))
   return validCandidates
   
- def gilloglyAttackPhase1(self, encodedSpruch : str) -> MzEnigma.Tagesschluessel:
+ def _parallelTuringShards(self, 
+  menu : MzEnigma.CribMenu, 
+  diagonalBoard : bool, 
+  checkpoint : Optional[MzEnigma.Checkpoint], 
+  workers : int, 
+  info : Optional[Callable[..., None]]) -> Dict[Tuple[int, int, int], List[Tuple[str, List[Dict[str, str]]]]]:
+  """Process pool variant of `turingAttack`.
+  The tasks are the Umkehrwalzen, Walzen orders and Zusatzwalzen missing in the *checkpoint*, 
+  the crib and the definitions of the components are sent once per worker, the stops are collected in the order of completion.
+
+:returns: stops of the tagesWalzenStellungen by indices of umkehrwalze, walzen and zusatzwalze
+  """
+  tasks = [(umkehrwalzeID, walzenID, zusatzwalzeID) for umkehrwalzeID in range(len(self.umkehrwalzenList)) 
+              for walzenID in range(len(self.walzenList)) for zusatzwalzeID in range(max(1, len(self.zusatzwalzenList)))]
+  if checkpoint is not None:
+   tasks = [task for task in tasks if not checkpoint.isDone(task)]
+  completed : Dict[Tuple[int, int, int], List[Tuple[str, List[Dict[str, str]]]]] = dict()
+  if not tasks:
+   return completed
+  context = self._componentDefinitions()
+  context.update({
+   'tagesWalzenStellungenList': [''.join(v) for v in self.tagesWalzenStellungenList],
+   'crib': menu.crib,
+   'encodedCrib': menu.encodedCrib,
+   'startingPosition': menu.startingPosition,
+   'diagonalBoard': diagonalBoard })
+  with concurrent.futures.ProcessPoolExecutor(max_workers = min(workers, len(tasks)), initializer = _initTuringWorker, initargs = (context, )) as executor:
+   futures = [executor.submit(_turingWorker, task) for task in tasks]
+   for future in concurrent.futures.as_completed(futures):
+    task, candidateSteckerbrettList = future.result()
+    if checkpoint is not None:
+     checkpoint.save(task, candidateSteckerbrettList)
+    completed[task] = candidateSteckerbrettList
+    if info is not None:
+     umkehrwalzeID, walzenID, zusatzwalzeID = task
+     info('walzen', '{}.turingAttack:  - examined umkehrwalze = {}, walzen = {}, zusatzwalze = {} ({} of {})', self.__class__.__name__, 
+            self.umkehrwalzenList[umkehrwalzeID].name, [walze.name for walze in self.walzenList[walzenID]], 
+            self.zusatzwalzenList[zusatzwalzeID].name if self.zusatzwalzenList else None, len(completed), len(tasks))
+     for tagesWalzenStellungen, knownWirings in candidateSteckerbrettList:
+      for knownWiring in knownWirings:
+       info('wiring', '{}.turingAttack:   tagesWalzenStellungen = {}, wiring {} found', self.__class__.__name__, tagesWalzenStellungen, knownWiring)
+  return completed
+
+ def gilloglyAttackPhase1(self, 
+  encodedSpruch : str, 
+  workers : int = 1, 
+  chunkSize : int = 0, 
+  topK : int = 0, 
+  checkpointDir : Optional[str] = None, 
+  resume : bool = False, 
+  earlyAbort : Optional[float] = None) -> Union[MzEnigma.Tagesschluessel, List[Tuple[MzEnigma.Tagesschluessel, float]]]:
   """Brute force attack to derive settings for Umkehrwalze, Walzen, Zusatzwalze, and Tageswalzenstellungen.
 Uses the index of coincidence for scoring.
 The rate of correct Tagesschluessels increases with increasing length of the encodedSpruch.
+With *workers* > 1, the candidates are sharded across a process pool, the result does not depend on the
+number of workers (in case of equal scores, the first candidate in the order of the serial attack wins).
+As the correct Tagesschluessel of a short message often does not have the highest score, the *topK* best candidates
+may be kept, i.e. phase 2 can examine several candidates without repeating phase 1.
+With a *checkpointDir*, the best candidates of each Umkehrwalze and Walzen order (or task of the process pool) are saved 
+as soon as they are completed, i.e. an interrupted attack is continued by *resume* (see `Checkpoint`).
+With *earlyAbort*, the spruch is decoded and scored segment by segment and a candidate is abandoned as soon as an upper bound
+of its final index of coincidence is below the score of the *topK*-th best candidate found so far (see `_phase1BoundedScores`).
+The bound of *earlyAbort* = 0 holds for any remaining letters, i.e. the result is the same as without *earlyAbort*.
+As this bound is rather loose, *earlyAbort* > 0 bounds the remaining letters by their expected contribution plus *earlyAbort*
+standard deviations, i.e. most candidates are abandoned much earlier. This bound is lossy: *earlyAbort* > 0 may drop
+any candidate with an unusual spruch, including the correct Tagesschluessel, the scores of the candidates kept are exact.
  
 :param encodedSpruch: message to be attacked (required)
-:return: Tagesschlüssel 
-  """
-  def doScoring():
-   nonlocal encodedSpruch, bestScore, tagesschluessel, bestTagesschluessel, lastDecryptedSpruch
-   decryptedSpruch = tagesschluessel.decode(encodedSpruch)
-   actScore = MzEnigma.SpruchScoring.indexOfCoincidence(decryptedSpruch)
-   # decryptedSpruchMD5 = hashlib.md5(str(decryptedSpruch).encode("utf-8")).hexdigest()
-   if self.notify:
-    self.notify('{}.gilloglyAttackPhase1: + examining tagesWalzenStellungen = {}'.format(self.__class__.__name__, tagesschluessel.tagesWalzenStellungen))
-    self.notify('{} score = {:.3f} (best: {:.3f})'.format(60*' ', actScore, bestScore))
-   lastDecryptedSpruch = decryptedSpruch
-   if actScore > bestScore:
-    bestScore = actScore
-    bestTagesschluessel = copy.deepcopy(tagesschluessel)
-   
-  lastDecryptedSpruch = ''
-  gTagesschluessel = MzEnigma.Tagesschluessel(enigma = self.enigma, steckerbrett = self.steckerbrett, blank = self.blank, notify = None)
-  bestTagesschluessel = None
-  bestScore = 0
-  for umkehrwalze in self.umkehrwalzenList:
-   if self.notify:
-    self.notify('{}.gilloglyAttackPhase1: - examining umkehrwalze = {}'.format(self.__class__.__name__, umkehrwalze.name))
-   for walzen in self.walzenList:
-    if self.notify:
-     nameList = list()
-     for walze in walzen:
-      nameList.append(walze.name)
-     self.notify('{}.gilloglyAttackPhase1:  - examining walzen = {}'.format(self.__class__.__name__, nameList))
-    for tagesWalzenStellungenTuple in self.tagesWalzenStellungenList:
-     tagesWalzenStellungen = ''.join(tagesWalzenStellungenTuple)
-     if len(self.zusatzwalzenList) > 0:
-      for zusatzwalze in self.zusatzwalzenList:
-       if self.notify:
-        self.notify('{}.gilloglyAttackPhase1:  - examining zusatzwalze = {}'.format(self.__class__.__name__, zusatzwalze.name))
-       tagesschluessel = MzEnigma.Tagesschluessel.changeWalzen(
-                                  gTagesschluessel, walzen = walzen, tagesWalzenStellungen = tagesWalzenStellungen, umkehrwalze = umkehrwalze, zusatzwalze = zusatzwalze)
-       doScoring()
-     else:
-      tagesschluessel = MzEnigma.Tagesschluessel.changeWalzen( 
-                                 gTagesschluessel, walzen = walzen, tagesWalzenStellungen = tagesWalzenStellungen, umkehrwalze = umkehrwalze)
-      doScoring()
-  if self.notify:
-   self.notify('{}.gilloglyAttackPhase1: bestScore = {:.3f}\n{}'.format(self.__class__.__name__,  bestScore, bestTagesschluessel))
-  return bestTagesschluessel
+:param workers: number of worker processes (1: no process pool, 0: number of CPUs)
+:param chunkSize: number of tagesWalzenStellungen per task of the process pool (0: balanced for the workers)
+:param topK: number of candidates to be kept (0: the best Tagesschluessel only)
+:param checkpointDir: checkpoint directory (optional)
+:param resume: skip the Umkehrwalze and Walzen orders completed in the checkpoint directory
+:param earlyAbort: bounded scoring, number of standard deviations of the bound (None: the whole spruch is decoded for every candidate, 0: same result, > 0: lossy)
+:return: Tagesschlüssel or, if *topK* > 0, List[Tuple[Tagesschluessel, score]] ranked by decreasing score
+  """
+  info = MzEnigma.tracing.getTracer('analysis').emitter(MzEnigma.tracing.INFO, self.notify)
+  debug = MzEnigma.tracing.getTracer('analysis').emitter(MzEnigma.tracing.DEBUG, self.notify)
+  assert workers >= 0, '{}.gilloglyAttackPhase1: workers = {} >= 0 required'.format(self.__class__.__name__, workers)
+  assert topK >= 0, '{}.gilloglyAttackPhase1: topK = {} >= 0 required'.format(self.__class__.__name__, topK)
+  assert earlyAbort is None or earlyAbort >= 0, '{}.gilloglyAttackPhase1: earlyAbort = {} >= 0 required'.format(self.__class__.__name__, earlyAbort)
+  if workers == 0:
+   workers = os.cpu_count() or 1
+  checkpoint = self._checkpoint(checkpointDir, resume, 'gilloglyAttackPhase1', encodedSpruch = encodedSpruch, topK = max(1, topK), earlyAbort = earlyAbort)
+  if workers > 1:
+   return self._phase1Result(self._parallelGilloglyAttackPhase1(encodedSpruch, workers, chunkSize, max(1, topK), checkpoint, earlyAbort, info), topK, info)
+
+  key = MzEnigma.CompactTagesschluessel(enigma = self.enigma, walzen = self.walzenList[0], 
+                                                               tagesWalzenStellungen = self.enigma.numberOfWalzen * self.enigma.alphabet[0], 
+                                                               steckerbrettWiring = None if self.steckerbrett is None else self.steckerbrett.wiring, 
+                                                               blank = self.blank)
+  encodedCodes = key.scrambler().toCodes(encodedSpruch)
+  positions = key.scrambler().walzenStellungenCodes(self.tagesWalzenStellungenList)
+  candidates = _CandidateHeap(max(1, topK))
+  for umkehrwalzeID, umkehrwalze in enumerate(self.umkehrwalzenList):
+   if info is not None:
+    info('umkehrwalze', '{}.gilloglyAttackPhase1: - examining umkehrwalze = {}', self.__class__.__name__, umkehrwalze.name)
+   for walzenID, walzen in enumerate(self.walzenList):
+    # a shard covers all tagesWalzenStellungen, i.e. it is a task of the process pool as well
+    shard = (umkehrwalzeID, walzenID, 0, len(positions))
+    if checkpoint is not None and checkpoint.isDone(shard):
+     if info is not None:
+      info('walzen', '{}.gilloglyAttackPhase1:  - resuming walzen = {}', self.__class__.__name__, [walze.name for walze in walzen])
+     for actScore, candidate in checkpoint.load(shard):
+      candidates.push(actScore, candidate)
+     continue
+    if info is not None:
+     info('walzen', '{}.gilloglyAttackPhase1:  - examining walzen = {}', self.__class__.__name__, [walze.name for walze in walzen])
+    key.rebind(walzen = walzen, umkehrwalze = umkehrwalze)
+    # scores of all tagesWalzenStellungen (rows) and zusatzwalzen (columns), i.e. flattened in the order of examination
+    scores = _phase1Scores(key, encodedCodes, positions, self.zusatzwalzenList, candidates.threshold, earlyAbort, max(1, topK)).ravel()
+    if debug is not None:
+     nZusatzwalzen = max(1, len(self.zusatzwalzenList))
+     runningScore = candidates.bestScore
+     for n, actScore in enumerate(scores.tolist()):
+      debug('candidate', '{}.gilloglyAttackPhase1: + examining tagesWalzenStellungen = {}', self.__class__.__name__, ''.join(self.tagesWalzenStellungenList[n // nZusatzwalzen]))
+      debug('score', '{} score = {:.3f} (best: {:.3f})', 60*' ', actScore, runningScore)
+      runningScore = max(runningScore, actScore)
+    if checkpoint is not None:
+     # the best candidates of the shard include all of its candidates ranking among the best of the range
+     shardCandidates = _CandidateHeap(max(1, topK))
+     shardCandidates.pushScores(scores, umkehrwalzeID, walzenID, 0, len(self.zusatzwalzenList))
+     checkpoint.save(shard, shardCandidates.ranked())
+    candidates.pushScores(scores, umkehrwalzeID, walzenID, 0, len(self.zusatzwalzenList))
+  return self._phase1Result(candidates, topK, info)
+
+ def gilloglyRingSearch(self, 
+  phase1Tagesschluessel : MzEnigma.Tagesschluessel, 
+  encodedSpruch : str, 
+  topK : int = 0, 
+  useNgrams : bool = False) -> Union[MzEnigma.Tagesschluessel, List[Tuple[MzEnigma.Tagesschluessel, float]]]:
+  """Brute force attack to derive the ring settings after `gilloglyAttackPhase1`.
+A ring setting shifts the wiring like the Walzenstellung does, but not the notches, i.e. phase 1 finds the Walzenstellungen relative to the rings
+and the ring settings change only the letters at which the next Walze is stepped. Hence, each ring setting is examined with the
+Walzenstellung shifted by the same amount. As the notch of the last Walze steps no other Walze, its ring setting is absorbed into its
+Walzenstellung, i.e. only the rings of the other Walzen are examined (len(alphabet)**2 ring settings for an engine with 3 Walzen).
+As phase 1 assumes the wrong letters for the steps of the next Walzen, its Walzenstellungen of these Walzen may be off by one step,
+i.e. each ring setting is examined with the Walzenstellungen of the Walzen but the first corrected by -1, 0 and +1.
+Uses the index of coincidence or the n-gram score for scoring, in case of equal scores the ring settings of the *phase1Tagesschluessel* win.
+As a wrong ring setting garbles the letters after a wrong step only, the n-gram score distinguishes the candidates better.
+
+:param phase1Tagesschluessel: Tagesschluessel with settings for Umkehrwalze, Walzen, Zusatzwalze, and Tageswalzenstellungen (required)
+:param encodedSpruch: message to be attacked (required)
+:param topK: number of candidates to be kept (0: the best Tagesschluessel only)
+:param useNgrams: use the n-gram score of self.spruchScoring (see `SpruchScoring.ngramScoreBatch`) instead of the index of coincidence
+:return: Tagesschlüssel or, if *topK* > 0, List[Tuple[Tagesschluessel, score]] ranked by decreasing score
+  """
+  info = MzEnigma.tracing.getTracer('analysis').emitter(MzEnigma.tracing.INFO, self.notify)
+  assert topK >= 0, '{}.gilloglyRingSearch: topK = {} >= 0 required'.format(self.__class__.__name__, topK)
+  assert not useNgrams or self.spruchScoring is not None, '{}.gilloglyRingSearch: self.spruchScoring is required'.format(self.__class__.__name__)
+  alphabet = phase1Tagesschluessel.alphabet
+  nPos = len(alphabet)
+  ringSettings = phase1Tagesschluessel.ringSettings
+  nWalzen = len(ringSettings)
+  key = MzEnigma.CompactTagesschluessel.fromTagesschluessel(phase1Tagesschluessel)
+  scrambler = key.scrambler()
+  encodedCodes = scrambler.toCodes(encodedSpruch)
+  # shifts of the ring settings (and Walzenstellungen) and corrections of the Walzenstellungen, the first row keeps the phase 1 settings
+  ringShifts = numpy.array(list(itertools.product(range(nPos), repeat = nWalzen - 1)), dtype = numpy.intp).reshape(-1, nWalzen - 1)
+  corrections = numpy.array(list(itertools.product((0, -1, 1), repeat = nWalzen - 1)), dtype = numpy.intp).reshape(-1, nWalzen - 1)
+  shifts = numpy.zeros((len(ringShifts) * len(corrections), nWalzen), dtype = numpy.intp)
+  shifts[:, :-1] = numpy.repeat(ringShifts, len(corrections), axis = 0)
+  steps = numpy.zeros_like(shifts)
+  steps[:, 1:] = numpy.tile(corrections, (len(ringShifts), 1))
+  positions = (numpy.array(key.positions(), dtype = numpy.intp) + shifts + steps) % nPos
+  scores = numpy.empty(len(shifts))
+  # the batches are limited to about 1M letters
+  batchSize = max(1, (1 << 20) // max(1, len(encodedCodes)))
+  for start in range(0, len(shifts), batchSize):
+   decodedCodes = scrambler.encodeBatch(encodedCodes, positions[start:start + batchSize], shifts[start:start + batchSize])
+   if useNgrams:
+    scores[start:start + batchSize] = self.spruchScoring.ngramScoreBatch(decodedCodes, alphabet = alphabet)
+   else:
+    scores[start:start + batchSize] = MzEnigma.SpruchScoring.indexOfCoincidenceBatch(decodedCodes, nPos)
+  ranked = list()
+  # the stable sort keeps candidates with equal scores in the order of examination
+  for n in numpy.argsort(-scores, kind = 'stable')[:max(1, topK)].tolist():
+   candidate = key.copy().rebind(tagesWalzenStellungen = ''.join(alphabet[v] for v in positions[n].tolist()), 
+                                              ringSettings = ''.join(alphabet[(alphabet.index(c) + v) % nPos] for c, v in zip(ringSettings, shifts[n].tolist())))
+   ranked.append((candidate.toTagesschluessel(steckerbrett = copy.deepcopy(phase1Tagesschluessel.steckerbrett), 
+                                                                    compiled = phase1Tagesschluessel.compiled, notify = phase1Tagesschluessel.notify), float(scores[n])))
+  if info is not None:
+   info('result', '{}.gilloglyRingSearch: score {:.3f} -> {:.3f}\n{}', self.__class__.__name__, float(scores[0]), ranked[0][1], ranked[0][0])
+  return ranked if topK > 0 else ranked[0][0]
 
  def shotgunPhase2(self, 
    phase1Tagesschluessel : MzEnigma.Tagesschluessel, encodedSpruch : str = '', noImprovement : int = 10) -> MzEnigma.Tagesschluessel:
@@ -373,11 +697,12 @@ Uses the 'newNgramScore' for scoring.
 :param noImprovement: stop condition after *noImprovement* number of attempts in a cycle
 :return: Tagesschlüssel
   """
-  def fillWired(tagesschluessel):
+  info = MzEnigma.tracing.getTracer('analysis').emitter(MzEnigma.tracing.INFO, self.notify)
+  def fillWired(alphabet, wiring):
    wired = set()
    unwired = set()
-   for n, c in enumerate(tagesschluessel.alphabet):
-    if tagesschluessel.steckerbrett.wiring[n] != c:
+   for n, c in enumerate(alphabet):
+    if wiring[n] != c:
      wired.add(c)
     else:
      unwired.add(c)
@@ -385,28 +710,30 @@ Uses the 'newNgramScore' for scoring.
 
   assert self.spruchScoring is not None, '{}.shotgunPhase2: self.spruchScoring is required'.format(self.__class__.__name__)
   assert phase1Tagesschluessel.steckerbrett is not None, '{}.gilloglyAttackPhase2: steckerbrett is required'.format(self.__class__.__name__)
-  wired,  unwired = fillWired(phase1Tagesschluessel)
+  wired,  unwired = fillWired(phase1Tagesschluessel.alphabet, phase1Tagesschluessel.steckerbrett.wiring)
   if len(wired) <= 2:
    return phase1Tagesschluessel
   assert len(unwired) > 2, '{}.shotgunPhase2: steckerbrett with > 0 unconnected pins required'.format(self.__class__.__name__)
   tagesschluessel = copy.deepcopy(phase1Tagesschluessel)
+  # each move re-decodes and re-scores the positions affected by the changed plugs only
+  state = MzEnigma.SteckerbrettState(tagesschluessel, encodedSpruch, self.spruchScoring)
 
   notImproved = 0
   bestScore = 0
   while notImproved < noImprovement:
-   actScore = self.spruchScoring.newNgramScore(tagesschluessel.decode(encodedSpruch), bestScore, tagesschluessel.alphabet)
+   actScore = self.spruchScoring.acceptScore(state.score, bestScore)
    if actScore >= bestScore:
     if actScore > bestScore:
      notImproved = -1
     bestScore = actScore
     bestWired = copy.deepcopy(wired)
     bestUnwired = copy.deepcopy(unwired)
-    bestWiring = tagesschluessel.steckerbrett.wiring
-    if self.notify:
-     self.notify('{}.shotgunPhase2: bestScore = {}\n{}\n'.format(
-      self.__class__.__name__, bestScore, tagesschluessel))
+    bestWiring = state.wiring
+    if info is not None:
+     tagesschluessel.steckerbrett.wiring = bestWiring
+     info('score', '{}.shotgunPhase2: bestScore = {}\n{}\n', self.__class__.__name__, bestScore, tagesschluessel)
    else:
-    tagesschluessel.steckerbrett.wiring = bestWiring
+    state.wiring = bestWiring
     wired = copy.deepcopy(bestWired)
     unwired = copy.deepcopy(bestUnwired)
    notImproved += 1
@@ -415,9 +742,10 @@ Uses the 'newNgramScore' for scoring.
    unwired.remove(connectSrc)
    unwired.add(unconnectSrc)
    connectTgt = random.choice(list(unwired))
-   tagesschluessel.steckerbrett.clearMark3Setting(unconnectSrc)
-   tagesschluessel.steckerbrett.addMark3Setting(connectSrc, connectTgt)
-   wired,  unwired = fillWired(tagesschluessel)
+   state.clearMark3Setting(unconnectSrc)
+   state.addMark3Setting(connectSrc, connectTgt)
+   wired,  unwired = fillWired(state.alphabet, state.wiring)
+  tagesschluessel.steckerbrett.wiring = state.wiring
   return tagesschluessel
 
  def exchangePhase2(self, 
@@ -429,6 +757,7 @@ Uses the 'newNgramScore' for scoring.
 :param cycles: number of exchange cycles
 :return: Tagesschlüssel
   """
+  info = MzEnigma.tracing.getTracer('analysis').emitter(MzEnigma.tracing.INFO, self.notify)
   assert self.spruchScoring is not None, '{}.exchangePhase2: self.spruchScoring is required'.format(self.__class__.__name__)
   assert phase1Tagesschluessel.steckerbrett is not None, '{}.gilloglyAttackPhase2: steckerbrett is required'.format(self.__class__.__name__)
   tagesschluessel = copy.deepcopy(phase1Tagesschluessel)
@@ -438,28 +767,30 @@ Uses the 'newNgramScore' for scoring.
     wired.add(c)
   if len(wired) <= 2:
    return phase1Tagesschluessel
-  bestWiring = tagesschluessel.steckerbrett.wiring
-  bestScore = self.spruchScoring.ngramScore(tagesschluessel.decode(encodedSpruch), validChars = tagesschluessel.alphabet)
+  state = MzEnigma.SteckerbrettState(tagesschluessel, encodedSpruch, self.spruchScoring)
+  bestWiring = state.wiring
+  bestScore = state.score
   for cycle in range(cycles):
+   tagesschluessel.steckerbrett.wiring = state.wiring
    frequencyDict = tagesschluessel.frequencyDict(encodedSpruch, decode = True)
    for freq in sorted(frequencyDict.keys(), reverse = True):
     for c1, _ in frequencyDict[freq]:
      if c1 in wired:
-      c1Index = tagesschluessel.steckerbrett.wiring.index(c1)
+      c1Index = state.wiring.index(c1)
       if c1 != tagesschluessel.alphabet[c1Index]: 
        for c2 in wired:
-        c2Index = tagesschluessel.steckerbrett.wiring.index(c2)
+        c2Index = state.wiring.index(c2)
         if c2 != c1 and c2 != tagesschluessel.alphabet[c2Index]:
-         actWiring = tagesschluessel.steckerbrett.wiring
-         tagesschluessel.steckerbrett.exchangeMark3Setting(c1, c2)
-         actScore = self.spruchScoring.ngramScore(tagesschluessel.decode(encodedSpruch), validChars = tagesschluessel.alphabet)
+         actWiring = state.wiring
+         state.exchangeMark3Setting(c1, c2)
+         actScore = state.score
          if actScore > bestScore:
           bestScore = actScore
-          bestWiring = tagesschluessel.steckerbrett.wiring
-          if self.notify:
-           self.notify('{}.exchangePhase2: cycle {}, exchanging {} <-> {}, score = {:.3f}'.format(self.__class__.__name__, cycle + 1, c1, c2, bestScore))
-         tagesschluessel.steckerbrett.wiring = actWiring
-   tagesschluessel.steckerbrett.wiring = bestWiring
+          bestWiring = state.wiring
+          if info is not None:
+           info('result', '{}.exchangePhase2: cycle {}, exchanging {} <-> {}, score = {:.3f}', self.__class__.__name__, cycle + 1, c1, c2, bestScore)
+         state.wiring = actWiring
+   state.wiring = bestWiring
   tagesschluessel.steckerbrett.wiring = bestWiring
   return tagesschluessel
 
@@ -475,6 +806,7 @@ Uses the 'newNgramScore' for scoring.
 :param useSimulatedAnnealing: use simulated annealing instead of conventional hill climbing
 :return: Tagesschlüssel
   """
+  info = MzEnigma.tracing.getTracer('analysis').emitter(MzEnigma.tracing.INFO, self.notify)
 
   if useSimulatedAnnealing:
    self.spruchScoring.setSATemperature(encodedSpruch)
@@ -482,23 +814,23 @@ Uses the 'newNgramScore' for scoring.
    self.spruchScoring.setSATemperature('')
   bestScore = 0
   tagesschluessel = copy.deepcopy(phase1Tagesschluessel)
-  initialScore = self.spruchScoring.ngramScore(tagesschluessel.decode(encodedSpruch), 1, validChars = tagesschluessel.alphabet)
+  initialScore = self.spruchScoring.ngramScore(tagesschluessel.decode(encodedSpruch), 1, validChars = tagesschluessel.alphabet, alphabet = tagesschluessel.alphabet)
   bestWiring = tagesschluessel.steckerbrett.wiring
   
   for cycle in range(cycles):
-   tagesschluessel = self.shotgunPhase2(self, tagesschluessel, encodedSpruch,  noImprovement)
-   actScore = self.spruchScoring.newNgramScore(tagesschluessel.decode(encodedSpruch), bestScore, tagesschluessel.alphabet)
-   if self.notify:
-    self.notify('{}.gilloglyAttackPhase2/cycle {}: score = {:.3f} (best: {:.3f})'.format(self.__class__.__name__, cycle, actScore, bestScore))
+   tagesschluessel = self.shotgunPhase2(tagesschluessel, encodedSpruch,  noImprovement)
+   actScore = self.spruchScoring.newNgramScore(tagesschluessel.decode(encodedSpruch), bestScore, tagesschluessel.alphabet, tagesschluessel.alphabet)
+   if info is not None:
+    info('score', '{}.gilloglyAttackPhase2/cycle {}: score = {:.3f} (best: {:.3f})', self.__class__.__name__, cycle, actScore, bestScore)
    if actScore > bestScore:
     bestScore = actScore
     bestWiring = tagesschluessel.steckerbrett.wiring
    newSteckerbrett = MzEnigma.Steckerbrett.Mark_3(alphabet = tagesschluessel.alphabet)
    tagesschluessel.steckerbrett.wiring = newSteckerbrett.wiring
   tagesschluessel.steckerbrett.wiring = bestWiring
-  if self.notify:
-   finalScore = self.spruchScoring.ngramScore(tagesschluessel.decode(encodedSpruch), 1, validChars = tagesschluessel.alphabet)
-   self.notify('{}.gilloglyAttackPhase2: score {:.3f} -> {:.3f}'.format(self.__class__.__name__, initialScore, finalScore))
+  if info is not None:
+   finalScore = self.spruchScoring.ngramScore(tagesschluessel.decode(encodedSpruch), 1, validChars = tagesschluessel.alphabet, alphabet = tagesschluessel.alphabet)
+   info('result', '{}.gilloglyAttackPhase2: score {:.3f} -> {:.3f}', self.__class__.__name__, initialScore, finalScore)
   return tagesschluessel
 
  def mzAttackPhase2(self, phase1Tagesschluessel : MzEnigma.Tagesschluessel, encodedSpruch : str = '') -> MzEnigma.Tagesschluessel:
@@ -509,6 +841,7 @@ Uses the 'ngramScore' for scoring.
 :param encodedSpruch: encrypted message to be attacked (required)
 :return: Tagesschlüssel
   """
+  info = MzEnigma.tracing.getTracer('analysis').emitter(MzEnigma.tracing.INFO, self.notify)
   assert self.spruchScoring is not None, '{}.mzAttackPhase2: self.spruchScoring is required'.format(self.__class__.__name__)
   assert phase1Tagesschluessel.steckerbrett is not None, '{}.mzAttackPhase2: steckerbrett is required'.format(self.__class__.__name__)
   tagesschluessel = copy.deepcopy(phase1Tagesschluessel)
@@ -521,9 +854,10 @@ Uses the 'ngramScore' for scoring.
   tagesschluessel.steckerbrett.wiring = tagesschluessel.alphabet
   monograms = sorted(self.spruchScoring.ngramDict[1].items(), key = lambda c2s: c2s[1], reverse = False)
   assert len(monograms) > 2*nConnections, '{}.mzAttackPhase2: len(monograms) = {} > 2*nConnections = {}'.format(self.__class__.__name__, len(monograms), 2*nConnections)
-  initialScore = self.spruchScoring.ngramScore(tagesschluessel.decode(encodedSpruch), 1, validChars = tagesschluessel.alphabet)
+  initialScore = self.spruchScoring.ngramScore(tagesschluessel.decode(encodedSpruch), 1, validChars = tagesschluessel.alphabet, alphabet = tagesschluessel.alphabet)
   unwired = list(tagesschluessel.alphabet)
   self.spruchScoring.numberOfChars = 1
+  state = MzEnigma.SteckerbrettState(tagesschluessel, encodedSpruch, self.spruchScoring, numberOfChars = 1, validChars = '')
   connectedChars = ''
   connection = 0
   while connection < nConnections and len(unwired) > 1:
@@ -531,31 +865,441 @@ Uses the 'ngramScore' for scoring.
    connectedChars += connectTgt
    if connectTgt not in unwired:
     continue
+   state.validChars = connectedChars
    maxScore = 0
    maxN = -1
    wiring = tagesschluessel.steckerbrett.wiring
    for n, connectSrc in enumerate(unwired):
-    tagesschluessel.steckerbrett.wiring = wiring
+    state.wiring = wiring
     if connectSrc != connectTgt:
-     tagesschluessel.steckerbrett.addMark3Setting(connectSrc, connectTgt)
-    decodedSpruch = tagesschluessel.decode(encodedSpruch)
-    if True:
-     actScore = self.spruchScoring.ngramScore(decodedSpruch, 1, validChars = connectedChars)
-    else:
-     actScore = MzEnigma.SpruchScoring.indexOfCoincidence(decodedSpruch)
+     state.addMark3Setting(connectSrc, connectTgt)
+    actScore = state.score
     if actScore > maxScore:
      maxScore = actScore
      maxN = n
-   tagesschluessel.steckerbrett.wiring = wiring
+   state.wiring = wiring
    connectSrc = unwired[maxN]
    unwired.pop(unwired.index(connectSrc))
-   if self.notify:
-    self.notify('{}.mzAttackPhase2: connecting {} -> {}, maxScore = {:.3f}'.format(self.__class__.__name__, connectSrc, connectTgt, maxScore))
+   if info is not None:
+    info('score', '{}.mzAttackPhase2: connecting {} -> {}, maxScore = {:.3f}', self.__class__.__name__, connectSrc, connectTgt, maxScore)
    if connectSrc != connectTgt:
     tagesschluessel.steckerbrett.addMark3Setting(connectSrc, connectTgt)
     unwired.pop(unwired.index(connectTgt))
     connection += 1
-  if self.notify:
-   finalScore = self.spruchScoring.ngramScore(tagesschluessel.decode(encodedSpruch), 1, validChars = tagesschluessel.alphabet)
-   self.notify('{}.mzAttackPhase2: score {:.3f} -> {:.3f}'.format(self.__class__.__name__, initialScore, finalScore))
+  if info is not None:
+   finalScore = self.spruchScoring.ngramScore(tagesschluessel.decode(encodedSpruch), 1, validChars = tagesschluessel.alphabet, alphabet = tagesschluessel.alphabet)
+   info('result', '{}.mzAttackPhase2: score {:.3f} -> {:.3f}', self.__class__.__name__, initialScore, finalScore)
   return tagesschluessel
+
+ def _detachedComponents(self) -> Dict[str, object]:
+  """Collects the enigma and the components of the range to be pickled (e.g. into a catalog).
+  The components are copied without notify function, as it may not be picklable
+  """
+  def detached(component):
+   component = copy.copy(component)
+   component.notify = None
+   return component
+  return {
+   'enigma': self.enigma,
+   'umkehrwalzenList': [detached(v) for v in self.umkehrwalzenList],
+   'walzenList': [[detached(v) for v in walzen] for walzen in self.walzenList],
+   'zusatzwalzenList': [detached(v) for v in self.zusatzwalzenList] }
+
+ def _componentDefinitions(self) -> Dict[str, object]:
+  """Collects the plain definitions of the enigma and the components of the range (see `predefined.createDefinitions`),
+  i.e. the worker processes rebuild the components by `_rebuildComponents` and no component crosses the process boundary
+  """
+  objects : Dict[str, object] = {'enigma': self.enigma}
+  names : Dict[int, str] = dict()
+  def named(component):
+   if id(component) not in names:
+    names[id(component)] = 'component/{}'.format(len(names))
+    objects[names[id(component)]] = component
+   return names[id(component)]
+  context : Dict[str, object] = {
+   'umkehrwalzenList': [named(v) for v in self.umkehrwalzenList],
+   'walzenList': [[named(v) for v in walzen] for walzen in self.walzenList],
+   'zusatzwalzenList': [named(v) for v in self.zusatzwalzenList] }
+  context['machines'] = MzEnigma.createDefinitions(objects)
+  return context
+
+ def _checkpoint(self,
+  checkpointDir : Optional[str],
+  resume : bool,
+  method : str,
+  **parameters : object) -> Optional[MzEnigma.Checkpoint]:
+  """Opens the checkpoint of a build or attack (see `checkpoint`), the task is described by the components of the range and the parameters
+
+:param checkpointDir: checkpoint directory (if undefined, no checkpoint)
+:param resume: resume a checkpoint in the directory
+:param method: name of the build or attack
+:returns: Checkpoint or None
+  """
+  assert checkpointDir is not None or not resume, '{}.{}: checkpointDir is required to resume'.format(self.__class__.__name__, method)
+  if checkpointDir is None:
+   return None
+  task = {
+   'method': method,
+   'model': self.enigma.model,
+   'alphabet': self.enigma.alphabet,
+   'umkehrwalzenList': [(v.name, v.wiring) for v in self.umkehrwalzenList],
+   'walzenList': [[(v.name, v.wiring, v.ringstellung, v.ringSetting) for v in walzen] for walzen in self.walzenList],
+   'zusatzwalzenList': [(v.name, v.wiring, v.ringstellung) for v in self.zusatzwalzenList],
+   'tagesWalzenStellungenList': [''.join(v) for v in self.tagesWalzenStellungenList],
+   'steckerbrettWiring': None if self.steckerbrett is None else self.steckerbrett.wiring,
+   'blank': self.blank }
+  task.update(parameters)
+  return MzEnigma.Checkpoint(checkpointDir, task, resume)
+
+ def _phase1Context(self, encodedSpruch : str) -> Dict[str, object]:
+  """Collects everything a worker process needs to score candidates of `gilloglyAttackPhase1` (see `_componentDefinitions`)
+  """
+  context = self._componentDefinitions()
+  context.update({
+   'tagesWalzenStellungenList': [''.join(v) for v in self.tagesWalzenStellungenList],
+   'steckerbrettWiring': None if self.steckerbrett is None else self.steckerbrett.wiring,
+   'blank': self.blank,
+   'encodedSpruch': encodedSpruch })
+  return context
+
+ def _parallelGilloglyAttackPhase1(self, 
+  encodedSpruch : str, 
+  workers : int, 
+  chunkSize : int, 
+  topK : int, 
+  checkpoint : Optional[MzEnigma.Checkpoint], 
+  earlyAbort : Optional[float], 
+  info : Optional[Callable[..., None]]) -> _CandidateHeap:
+  """Process pool variant of `gilloglyAttackPhase1`.
+  The tasks are slices of tagesWalzenStellungenList for an Umkehrwalze and Walzen order, 
+  the best candidates of each task are merged into a single heap, i.e. deterministically.
+  The tasks completed in the *checkpoint* are not submitted again.
+  """
+  nStellungen = len(self.tagesWalzenStellungenList)
+  nCombinations = len(self.umkehrwalzenList) * len(self.walzenList)
+  if chunkSize <= 0:
+   chunkSize = max(1, math.ceil(nCombinations * nStellungen / (4 * workers)))
+  chunkSize = min(chunkSize, nStellungen)
+  tasks = list()
+  for umkehrwalzeID in range(len(self.umkehrwalzenList)):
+   for walzenID in range(len(self.walzenList)):
+    for start in range(0, nStellungen, chunkSize):
+     tasks.append((umkehrwalzeID, walzenID, start, min(start + chunkSize, nStellungen)))
+
+  candidates = _CandidateHeap(topK)
+  if checkpoint is not None:
+   isDone = [checkpoint.isDone(task) for task in tasks]
+   for task in itertools.compress(tasks, isDone):
+    for actScore, candidate in checkpoint.load(task):
+     candidates.push(actScore, candidate)
+   tasks = [task for task, done in zip(tasks, isDone) if not done]
+   if info is not None:
+    info('checkpoint', '{}.gilloglyAttackPhase1: {} tasks resumed, {} tasks pending', self.__class__.__name__, sum(isDone), len(tasks))
+  lastCombination = None
+  context = self._phase1Context(encodedSpruch)
+  context['topK'] = topK
+  context['earlyAbort'] = earlyAbort
+  with concurrent.futures.ProcessPoolExecutor(max_workers = workers, initializer = _initPhase1Worker, initargs = (context, )) as executor:
+   for task, taskCandidates in zip(tasks, executor.map(_phase1Worker, tasks)):
+    if info is not None and task[:2] != lastCombination:
+     lastCombination = task[:2]
+     info('walzen', '{}.gilloglyAttackPhase1:  - examined umkehrwalze = {}, walzen = {}', self.__class__.__name__, 
+            self.umkehrwalzenList[task[0]].name, [walze.name for walze in self.walzenList[task[1]]])
+    if checkpoint is not None:
+     checkpoint.save(task, taskCandidates)
+    for actScore, candidate in taskCandidates:
+     candidates.push(actScore, candidate)
+  return candidates
+
+ def _phase1Result(self, 
+  candidates : _CandidateHeap, 
+  topK : int, 
+  info : Optional[Callable[..., None]]) -> Union[MzEnigma.Tagesschluessel, List[Tuple[MzEnigma.Tagesschluessel, float]]]:
+  """Creates the Tagesschluessels of the best candidates of `gilloglyAttackPhase1`
+  """
+  ranked = [(self._phase1Tagesschluessel(candidate), actScore) for actScore, candidate in candidates.ranked()]
+  bestTagesschluessel, bestScore = ranked[0] if ranked else (None, 0)
+  if info is not None:
+   info('result', '{}.gilloglyAttackPhase1: bestScore = {:.3f}\n{}', self.__class__.__name__,  bestScore, bestTagesschluessel)
+  return ranked if topK > 0 else bestTagesschluessel
+
+ def _phase1Tagesschluessel(self, candidate : Tuple[int, int, int, int]) -> MzEnigma.Tagesschluessel:
+  """Creates the Tagesschluessel of a candidate of `gilloglyAttackPhase1`
+
+:param candidate: indices of umkehrwalze, walzen, tagesWalzenStellungen and zusatzwalze (if any)
+:returns: Tagesschluessel object
+  """
+  umkehrwalzeID, walzenID, stellungID, zusatzwalzeID = candidate
+  return MzEnigma.CompactTagesschluessel(enigma = self.enigma, 
+                                                            umkehrwalze = self.umkehrwalzenList[umkehrwalzeID], 
+                                                            walzen = self.walzenList[walzenID], 
+                                                            tagesWalzenStellungen = ''.join(self.tagesWalzenStellungenList[stellungID]), 
+                                                            steckerbrettWiring = None if self.steckerbrett is None else self.steckerbrett.wiring, 
+                                                            zusatzwalze = self.zusatzwalzenList[zusatzwalzeID] if self.zusatzwalzenList else None, 
+                                                            blank = self.blank).toTagesschluessel()
+
+class _CandidateHeap(object):
+ """Bounded heap of the best candidates of `TagesschluesselRange.gilloglyAttackPhase1`.
+ A candidate is a compact descriptor, i.e. the indices of umkehrwalze, walzen, tagesWalzenStellungen and zusatzwalze.
+ In case of equal scores, the candidate examined first ranks higher.
+
+:param topK: maximum number of candidates
+ """
+ def __init__(self, topK : int) -> None:
+  self.topK = topK
+  # min-heap, i.e. the worst candidate (lowest score, examined last) is on top
+  self._heap : List[Tuple[float, Tuple[int, ...], Tuple[int, int, int, int]]] = list()
+
+ @property
+ def bestScore(self) -> float:
+  """
+  :getter: Returns the highest score (0, if there is no candidate)
+  :setter: None
+  """
+  return max(self._heap)[0] if self._heap else 0
+
+ @property
+ def threshold(self) -> float:
+  """
+  :getter: Returns the score a candidate must exceed to be kept (0, if there are less than topK candidates)
+  :setter: None
+  """
+  return self._heap[0][0] if len(self._heap) == self.topK else 0
+
+ def push(self, score : float, candidate : Tuple[int, int, int, int]) -> None:
+  """Adds a candidate, if it ranks among the topK candidates
+
+:param score: score of the candidate
+:param candidate: indices of umkehrwalze, walzen, tagesWalzenStellungen and zusatzwalze
+  """
+  item = (score, tuple(-v for v in candidate), candidate)
+  if len(self._heap) < self.topK:
+   heapq.heappush(self._heap, item)
+  elif item > self._heap[0]:
+   heapq.heapreplace(self._heap, item)
+
+ def pushScores(self, scores : numpy.ndarray, umkehrwalzeID : int, walzenID : int, start : int, nZusatzwalzen : int) -> None:
+  """Adds the best candidates of an Umkehrwalze and Walzen order (see `_phase1Scores`)
+
+:param scores: flattened scores of the tagesWalzenStellungen (rows) and zusatzwalzen (columns)
+:param umkehrwalzeID: index of the umkehrwalze
+:param walzenID: index of the walzen
+:param start: index of the first tagesWalzenStellungen
+:param nZusatzwalzen: number of zusatzwalzen
+  """
+  if len(self._heap) == self.topK and scores.max() <= self._heap[0][0]:
+   return
+  # the stable sort keeps candidates with equal scores in the order of examination
+  for n in numpy.argsort(-scores, kind = 'stable')[:self.topK].tolist():
+   actScore = float(scores[n])
+   if actScore <= 0:
+    break
+   stellungID, zusatzwalzeID = divmod(n, max(1, nZusatzwalzen))
+   self.push(actScore, (umkehrwalzeID, walzenID, start + stellungID, zusatzwalzeID))
+
+ def ranked(self) -> List[Tuple[float, Tuple[int, int, int, int]]]:
+  """
+:returns: scores and candidates, ranked by decreasing score
+  """
+  return [(actScore, candidate) for actScore, _, candidate in sorted(self._heap, reverse = True)]
+
+def _phase1Scores(
+ key : MzEnigma.CompactTagesschluessel, 
+ encodedCodes : List[int], 
+ positions : numpy.ndarray, 
+ zusatzwalzenList : List[MzEnigma.Zusatzwalze], 
+ threshold : float = 0, 
+ earlyAbort : Optional[float] = None, 
+ topK : int = 1) -> numpy.ndarray:
+ """Index of coincidence of the decoded spruch for many tagesWalzenStellungen at once (see `gilloglyAttackPhase1`)
+
+:param key: key with Umkehrwalze and Walzen to be examined
+:param encodedCodes: integer codes of the encoded spruch
+:param positions: integer array of the tagesWalzenStellungen (see `Scrambler.walzenStellungenCodes`)
+:param zusatzwalzenList: Zusatzwalzen to be examined (if any)
+:param threshold: score of the topK-th best candidate so far (see `_phase1BoundedScores`)
+:param earlyAbort: bounded scoring (see `_phase1BoundedScores`)
+:param topK: number of candidates to be kept, i.e. the threshold is raised to the topK-th best score examined here
+:returns: float array of shape (len(positions), max(1, len(zusatzwalzenList))), 0 for abandoned candidates
+ """
+ scores = numpy.empty((len(positions), max(1, len(zusatzwalzenList))))
+ # the batches are limited to about 1M letters
+ batchSize = max(1, (1 << 20) // max(1, len(encodedCodes)))
+ for zusatzwalzeID, zusatzwalze in enumerate(zusatzwalzenList or [None]):
+  if zusatzwalze is not None:
+   key.rebind(zusatzwalze = zusatzwalze)
+  scrambler = key.scrambler()
+  for start in range(0, len(positions), batchSize):
+   if earlyAbort is not None:
+    # the topK-th best score examined so far is a lower bound of the topK-th best score of all candidates
+    examined = numpy.concatenate((scores[:, :zusatzwalzeID].ravel(), scores[:start, zusatzwalzeID]))
+    if len(examined) >= topK:
+     threshold = max(threshold, numpy.partition(examined, len(examined) - topK)[len(examined) - topK])
+   if earlyAbort is not None and threshold > 0:
+    scores[start:start + batchSize, zusatzwalzeID] = _phase1BoundedScores(scrambler, encodedCodes, positions[start:start + batchSize], threshold, earlyAbort)
+    continue
+   decodedCodes = scrambler.encodeBatch(encodedCodes, positions[start:start + batchSize])
+   scores[start:start + batchSize, zusatzwalzeID] = MzEnigma.SpruchScoring.indexOfCoincidenceBatch(decodedCodes, len(scrambler.alphabet))
+ return scores
+
+def _phase1BoundedScores(
+ scrambler : MzEnigma.Scrambler, 
+ encodedCodes : List[int], 
+ positions : numpy.ndarray, 
+ threshold : float, 
+ earlyAbort : float, 
+ numberOfSegments : int = 16) -> numpy.ndarray:
+ """Index of coincidence of the decoded spruch, candidates are abandoned as soon as they cannot exceed the *threshold*.
+ After each segment, the letter counts *c* of the decoded letters are known and *R* letters remain. The final numerator
+ sum(n*(n - 1)) is bounded by
+ 
+ * the worst case, i.e. all remaining letters are decoded to the most frequent letter: sum(c*(c - 1)) + R*(2*max(c) + R - 1)
+ * if *earlyAbort* > 0, the expectation plus *earlyAbort* standard deviations, if the remaining letters are drawn
+   from the (smoothed) frequencies *q* of the decoded letters: sum(a*a + R*q*(1 - q)) - N + 2*earlyAbort*sqrt(R*(sum(q*a*a) - sum(q*a)**2)) with a = c + R*q
+
+:param scrambler: scrambler of the candidates
+:param encodedCodes: integer codes of the encoded spruch
+:param positions: integer array of the tagesWalzenStellungen
+:param threshold: score to be exceeded
+:param earlyAbort: number of standard deviations of the expectation bound (0: worst case bound only)
+:param numberOfSegments: number of segments of the spruch
+:returns: float array of shape (len(positions), ), scores of the completed candidates (as `SpruchScoring.indexOfCoincidenceBatch`), 0 for abandoned candidates
+ """
+ nPos = len(scrambler.alphabet)
+ codes = numpy.asarray(encodedCodes, dtype = numpy.intp)
+ nSpruch = len(codes)
+ denominator = nSpruch * (nSpruch - 1)
+ segmentLength = max(1, math.ceil(nSpruch / numberOfSegments))
+ counts = numpy.zeros((len(positions), nPos), dtype = numpy.int64)
+ active = numpy.arange(len(positions))
+ actual = numpy.asarray(positions, dtype = numpy.intp)
+ for start in range(0, nSpruch, segmentLength):
+  decodedCodes, actual = scrambler.encodeSegmentBatch(codes[start:start + segmentLength], actual)
+  offsets = numpy.arange(len(active), dtype = numpy.intp)[:, None] * nPos
+  counts[active] += numpy.bincount((decodedCodes + offsets).ravel(), minlength = len(active) * nPos).reshape(len(active), nPos)
+  remaining = nSpruch - min(start + segmentLength, nSpruch)
+  if remaining == 0:
+   break
+  c = counts[active]
+  bound = (c * (c - 1)).sum(axis = 1) + remaining * (2 * c.max(axis = 1) + remaining - 1)
+  if earlyAbort > 0:
+   q = (c + 1) / (nSpruch - remaining + nPos)
+   a = c + remaining * q
+   expected = (a * a + remaining * q * (1 - q)).sum(axis = 1) - nSpruch
+   deviation = 2 * numpy.sqrt(remaining * numpy.maximum((q * a * a).sum(axis = 1) - (q * a).sum(axis = 1) ** 2, 0))
+   bound = numpy.minimum(bound, expected + earlyAbort * deviation)
+  isKept = bound / denominator >= threshold
+  active = active[isKept]
+  actual = actual[isKept]
+  if len(active) == 0:
+   break
+ scores = numpy.zeros(len(positions))
+ if len(active) > 0:
+  c = counts[active]
+  scores[active] = (c * (c - 1)).sum(axis = 1) / denominator
+ return scores
+
+_phase1WorkerContext : Dict[str, object] = dict()
+
+def _rebuildComponents(context : Dict[str, object]) -> Dict[str, object]:
+ """Rebuilds the enigma and the components of a worker context (see `TagesschluesselRange._componentDefinitions`)
+
+:param context: context with the definitions and the names of the components
+:returns: context with the enigma and the components
+ """
+ context = dict(context)
+ machines = MzEnigma.createRegistry(context.pop('machines'))
+ context['enigma'] = machines['enigma']
+ context['umkehrwalzenList'] = [machines[v] for v in context['umkehrwalzenList']]
+ context['walzenList'] = [[machines[v] for v in walzen] for walzen in context['walzenList']]
+ context['zusatzwalzenList'] = [machines[v] for v in context['zusatzwalzenList']]
+ return context
+
+def _initPhase1Worker(context : Dict[str, object]) -> None:
+ _phase1WorkerContext.clear()
+ _phase1WorkerContext.update(_rebuildComponents(context))
+ # best candidates of all tasks of the worker, their threshold is a lower bound of the threshold of all tasks
+ _phase1WorkerContext['bestCandidates'] = _CandidateHeap(context['topK'])
+
+def _phase1Worker(task : Tuple[int, int, int, int]) -> List[Tuple[float, Tuple[int, int, int, int]]]:
+ """Scores a slice of tagesWalzenStellungenList in a worker process (see `TagesschluesselRange.gilloglyAttackPhase1`)
+
+:param task: indices of umkehrwalze and walzen, start and stop of the slice
+:returns: ranked best scores and candidates (see `_CandidateHeap`)
+ """
+ context = _phase1WorkerContext
+ umkehrwalzeID, walzenID, start, stop = task
+ encodedSpruch = context['encodedSpruch']
+ tagesWalzenStellungenList = context['tagesWalzenStellungenList']
+ zusatzwalzenList = context['zusatzwalzenList']
+ key = MzEnigma.CompactTagesschluessel(enigma = context['enigma'], 
+                                                              umkehrwalze = context['umkehrwalzenList'][umkehrwalzeID], 
+                                                              walzen = context['walzenList'][walzenID], 
+                                                              tagesWalzenStellungen = tagesWalzenStellungenList[start], 
+                                                              steckerbrettWiring = context['steckerbrettWiring'], 
+                                                              blank = context['blank'])
+ positions = key.scrambler().walzenStellungenCodes(tagesWalzenStellungenList[start:stop])
+ bestCandidates = context['bestCandidates']
+ scores = _phase1Scores(key, key.scrambler().toCodes(encodedSpruch), positions, zusatzwalzenList, bestCandidates.threshold, context['earlyAbort'], context['topK']).ravel()
+ candidates = _CandidateHeap(context['topK'])
+ candidates.pushScores(scores, umkehrwalzeID, walzenID, start, len(zusatzwalzenList))
+ ranked = candidates.ranked()
+ for actScore, candidate in ranked:
+  bestCandidates.push(actScore, candidate)
+ return ranked
+
+_rejewskiWorkerContext : Dict[str, object] = dict()
+
+def _initRejewskiWorker(context : Dict[str, object]) -> None:
+ context = _rebuildComponents(context)
+ enigma = context['enigma']
+ _rejewskiWorkerContext.clear()
+ _rejewskiWorkerContext.update(context)
+ _rejewskiWorkerContext['checkpoint'] = MzEnigma.Checkpoint(context['checkpointDirectory'], context['checkpointTask'], resume = True)
+ _rejewskiWorkerContext['range'] = TagesschluesselRange(enigma = enigma, 
+                                                                               umkehrwalzenList = context['umkehrwalzenList'], 
+                                                                               walzenList = context['walzenList'], 
+                                                                               tagesWalzenStellungenList = context['tagesWalzenStellungenList'], 
+                                                                               zusatzwalzenList = context['zusatzwalzenList'] if enigma.zusatzwalzen is not None else None, 
+                                                                               blank = context['blank'])
+
+def _rejewskiWorker(task : Tuple[int, int]) -> Tuple[int, int]:
+ """Examines an Umkehrwalze and Walzen order in a worker process and writes its shard (see `TagesschluesselRange.createRejewskiCatalog`)
+
+:param task: indices of umkehrwalze and walzen
+:returns: task
+ """
+ context = _rejewskiWorkerContext
+ tagesschluesselRange = context['range']
+ key = MzEnigma.CompactTagesschluessel(enigma = tagesschluesselRange.enigma, walzen = tagesschluesselRange.walzenList[0], 
+                                                              tagesWalzenStellungen = tagesschluesselRange.enigma.numberOfWalzen * tagesschluesselRange.enigma.alphabet[0])
+ context['checkpoint'].save(task, tagesschluesselRange._rejewskiShard(key, task[0], task[1], context['indexed']))
+ return task
+
+_turingWorkerContext : Dict[str, object] = dict()
+
+def _initTuringWorker(context : Dict[str, object]) -> None:
+ context = _rebuildComponents(context)
+ enigma = context['enigma']
+ _turingWorkerContext.clear()
+ _turingWorkerContext.update(context)
+ # the menu is compiled once per worker (the letters in front of the crib are not used), the scrambler tables are built by the bombe for each task
+ menu = MzEnigma.CribMenu(context['startingPosition'] * context['crib'][0] + context['encodedCrib'], context['crib'], context['startingPosition'], enigma.alphabet)
+ _turingWorkerContext['bombe'] = MzEnigma.Bombe(menu, context['diagonalBoard'])
+ _turingWorkerContext['key'] = MzEnigma.CompactTagesschluessel(enigma = enigma, walzen = context['walzenList'][0], 
+                                                                                      tagesWalzenStellungen = enigma.numberOfWalzen * enigma.alphabet[0])
+
+def _turingWorker(task : Tuple[int, int, int]) -> Tuple[Tuple[int, int, int], List[Tuple[str, List[Dict[str, str]]]]]:
+ """Runs the bombe for an Umkehrwalze, Walzen order and Zusatzwalze in a worker process (see `TagesschluesselRange.turingAttack`)
+
+:param task: indices of umkehrwalze, walzen and zusatzwalze
+:returns: task and the stops of the tagesWalzenStellungen
+ """
+ context = _turingWorkerContext
+ umkehrwalzeID, walzenID, zusatzwalzeID = task
+ zusatzwalzenList = context['zusatzwalzenList']
+ key = context['key'].rebind(umkehrwalze = context['umkehrwalzenList'][umkehrwalzeID], 
+                                           walzen = context['walzenList'][walzenID], 
+                                           zusatzwalze = zusatzwalzenList[zusatzwalzeID] if zusatzwalzenList else None)
+ tagesWalzenStellungenList = context['tagesWalzenStellungenList']
+ return task, list(zip(tagesWalzenStellungenList, context['bombe'].run(key.scrambler(), tagesWalzenStellungenList)))
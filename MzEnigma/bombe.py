@@ -0,0 +1,317 @@
+"""
+Bitset engine of the Turing bombe.
+
+A `CribMenu` is compiled once per crib and starting position: every letter of
+the menu is a *bus* of len(alphabet) wires, an edge of the menu connects two
+buses by the permutation of the scrambler at the position of the crib letter.
+A live wire *w* in bus *a* stands for the hypothesis "*a* is steckered to *w*".
+The closed loops of the menu reject false hypotheses, i.e. the number of loops
+tells in advance, how many false stops are to be expected (see `CribMenu.falseStopRate`).
+
+The bombe energizes a single wire of the test register (the bus with the most
+connections) and propagates it through the menu until no further wire gets live.
+All hypotheses of the test register, which got live, share the result, i.e. a
+single propagation usually rejects all hypotheses of a Walzenstellung at once:
+
+* all wires of the test register are live: no hypothesis is consistent
+* otherwise, the hypotheses not yet examined are propagated one by one and a
+  hypothesis is consistent (a *stop*), if every bus has at most one live wire
+
+The first propagation is done for many Walzenstellungen at once on boolean arrays,
+the few remaining Walzenstellungen are examined with a 26-bit mask (an integer) per bus.
+With a *diagonal board*, a live wire *w* in bus *a* makes wire *a* in bus *w* live
+(the Steckerbrett is symmetric), which rejects most of the false stops.
+"""
+
+from __future__ import annotations
+from typing import Optional, Sequence, List, Tuple, Dict
+
+import numpy
+
+import MzEnigma
+
+class CribMenu(object):
+ """Represents the compiled menu of a crib at a position of an encoded spruch.
+ The menu does not depend on the Walzen, Umkehrwalze or Zusatzwalze, i.e. it is compiled once and
+ may be run by a `Bombe` against any scrambler. The menu is immutable.
+
+:param encodedSpruch: encoded spruch (required)
+:param crib: unencoded crib (required)
+:param startingPosition: position of the crib in the encoded spruch
+:param alphabet: alphabet of the spruch and the crib
+  """
+ __slots__ = ('_alphabet', '_crib', '_encodedCrib', '_startingPosition', '_edges', '_buses', '_testRegister', '_component', '_loops')
+
+ def __init__(self,
+  encodedSpruch : str,
+  crib : str,
+  startingPosition : int = 0,
+  alphabet : str = MzEnigma.stdAlphabet) -> None:
+  assert crib, '{}: crib required'.format(self.__class__.__name__)
+  encodedCrib = encodedSpruch[startingPosition:startingPosition + len(crib)]
+  assert startingPosition >= 0 and len(encodedCrib) == len(crib), '{}: crib does not fit into the encoded spruch at position {}'.format(self.__class__.__name__, startingPosition)
+  assert all(cc != ec for cc, ec in zip(crib, encodedCrib)), '{}: {} is not a valid starting position, a letter is never encoded by itself'.format(self.__class__.__name__, startingPosition)
+  index = {c: n for n, c in enumerate(alphabet)}
+  assert all(c in index for c in crib + encodedCrib), '{}: characters of the crib or the encoded spruch not in alphabet'.format(self.__class__.__name__)
+  self._alphabet = alphabet
+  self._crib = crib
+  self._encodedCrib = encodedCrib
+  self._startingPosition = startingPosition
+  self._edges : Tuple[Tuple[int, int, int], ...] = tuple((index[cc], index[ec], pos) for pos, (cc, ec) in enumerate(zip(crib, encodedCrib)))
+  # buses in the order of their first appearance, connected buses of each bus
+  buses : List[int] = list()
+  neighbors : Dict[int, set] = dict()
+  for src, tgt, _ in self._edges:
+   for bus in (src, tgt):
+    if bus not in neighbors:
+     buses.append(bus)
+     neighbors[bus] = set()
+   neighbors[src].add(tgt)
+   neighbors[tgt].add(src)
+  self._buses = tuple(buses)
+  self._testRegister = max(buses, key = lambda bus: len(neighbors[bus]))
+  # spanning tree of the buses reachable from the test register, each edge not in the tree closes a loop
+  parents : Dict[int, Optional[Tuple[int, int]]] = {self._testRegister: None}
+  pending = [self._testRegister]
+  while pending:
+   bus = pending.pop(0)
+   for src, tgt, pos in self._edges:
+    if bus in (src, tgt):
+     other = tgt if bus == src else src
+     if other not in parents:
+      parents[other] = (bus, pos)
+      pending.append(other)
+  treePositions = {parent[1] for parent in parents.values() if parent is not None}
+  def pathToTestRegister(bus : int) -> List[int]:
+   path = list()
+   while parents[bus] is not None:
+    bus, pos = parents[bus]
+    path.append(pos)
+   return path
+  loops = list()
+  for src, tgt, pos in self._edges:
+   if src in parents and pos not in treePositions:
+    srcPath, tgtPath = pathToTestRegister(src), pathToTestRegister(tgt)
+    while srcPath and tgtPath and srcPath[-1] == tgtPath[-1]:
+     srcPath.pop()
+     tgtPath.pop()
+    loops.append(tuple([pos] + tgtPath + list(reversed(srcPath))))
+  self._component = frozenset(parents.keys())
+  self._loops = tuple(loops)
+
+ @property
+ def alphabet(self) -> str:
+  """
+  :getter: Returns the alphabet
+  :setter: None
+  """
+  return self._alphabet
+
+ @property
+ def crib(self) -> str:
+  """
+  :getter: Returns the unencoded crib
+  :setter: None
+  """
+  return self._crib
+
+ @property
+ def encodedCrib(self) -> str:
+  """
+  :getter: Returns the encoded crib, i.e. the part of the encoded spruch at the starting position
+  :setter: None
+  """
+  return self._encodedCrib
+
+ @property
+ def startingPosition(self) -> int:
+  """
+  :getter: Returns the position of the crib in the encoded spruch
+  :setter: None
+  """
+  return self._startingPosition
+
+ @property
+ def edges(self) -> Tuple[Tuple[str, str, int], ...]:
+  """
+  :getter: Returns the edges of the menu (unencoded letter, encoded letter, position in the crib)
+  :setter: None
+  """
+  return tuple((self._alphabet[src], self._alphabet[tgt], pos) for src, tgt, pos in self._edges)
+
+ @property
+ def testRegister(self) -> str:
+  """
+  :getter: Returns the letter of the test register, i.e. the letter with most connections
+  :setter: None
+  """
+  return self._alphabet[self._testRegister]
+
+ @property
+ def component(self) -> str:
+  """
+  :getter: Returns the letters connected to the test register in the order of their appearance
+  :setter: None
+  """
+  return ''.join(self._alphabet[bus] for bus in self._buses if bus in self._component)
+
+ @property
+ def loops(self) -> Tuple[Tuple[int, ...], ...]:
+  """
+  :getter: Returns the closed loops connected to the test register, each loop as positions in the crib
+  :setter: None
+  """
+  return self._loops
+
+ @property
+ def falseStopRate(self) -> float:
+  """
+  :getter: Returns the expected number of false stops per Walzenstellungen (without diagonal board),
+    i.e. each of the len(alphabet) hypotheses of the test register passes each closed loop by chance with 1/len(alphabet)
+  :setter: None
+  """
+  nPos = len(self._alphabet)
+  return nPos * float(nPos) ** -len(self._loops)
+
+ def expectedFalseStops(self, numberOfWalzenStellungen : int) -> float:
+  """
+:param numberOfWalzenStellungen: number of Walzenstellungen to be examined (e.g. 26**3 per Walzen order)
+:returns: expected number of false stops (without diagonal board)
+  """
+  return self.falseStopRate * numberOfWalzenStellungen
+
+ def __eq__(self, other : CribMenu) -> bool:
+  return isinstance(other, CribMenu) and self._alphabet == other._alphabet and self._edges == other._edges
+
+ def __hash__(self) -> int:
+  return hash((self._alphabet, self._edges))
+
+ def __repr__(self) -> str:
+  return 'class: {}\ncrib: {}\nencoded crib: {}\nstarting position: {}\ntest register: {}\ncomponent: {}\nloops: {}\nfalse stop rate: {:.3g}'.format(
+              self.__class__.__name__, self._crib, self._encodedCrib, self._startingPosition, self.testRegister, self.component, len(self._loops), self.falseStopRate)
+
+class Bombe(object):
+ """Represents a Turing bombe running a compiled crib menu.
+ The Walzenstellungen examined are the Walzenstellungen at the first letter of the crib.
+
+:param menu: 'CribMenu' (required)
+:param diagonalBoard: use the diagonal board
+  """
+ def __init__(self, menu : CribMenu, diagonalBoard : bool = False) -> None:
+  assert menu is not None, '{}: menu required'.format(self.__class__.__name__)
+  self.menu = menu
+  self.diagonalBoard = diagonalBoard
+  nPos = len(menu.alphabet)
+  # forward: plain letter -> encoded letter, backward by the inverse permutation
+  self._adjacency : List[List[Tuple[int, int, bool]]] = [list() for _ in range(nPos)]
+  for src, tgt, pos in menu._edges:
+   self._adjacency[src].append((tgt, pos, True))
+   self._adjacency[tgt].append((src, pos, False))
+  self._testRegister = menu._testRegister
+  # only the edges reachable from the test register take part
+  self._edges = [edge for edge in menu._edges if edge[0] in menu._component]
+  self._length = len(menu.crib)
+  self._alphabet = menu.alphabet
+
+ def run(self,
+  scrambler : MzEnigma.Scrambler,
+  walzenStellungenList : Sequence[str],
+  chunkSize : int = 2048) -> List[List[Dict[str, str]]]:
+  """Examines a list of Walzenstellungen
+
+:param scrambler: 'Scrambler' of the Tagesschluessel without Steckerbrett (required)
+:param walzenStellungenList: Walzenstellungen to be examined, each a string or a tuple of characters (required)
+:param chunkSize: number of Walzenstellungen propagated at once
+:returns: for each Walzenstellungen the stops, each stop is a dictionary of the known Steckerbrett settings
+  """
+  assert scrambler.alphabet == self._alphabet, '{}.run: alphabet of the scrambler must match'.format(self.__class__.__name__)
+  assert chunkSize > 0, '{}.run: chunkSize = {} > 0 required'.format(self.__class__.__name__, chunkSize)
+  stopsList : List[List[Dict[str, str]]] = list()
+  for start in range(0, len(walzenStellungenList), chunkSize):
+   positions = scrambler.walzenStellungenCodes(walzenStellungenList[start:start + chunkSize])
+   tables = scrambler.permutationTableBatch(positions, self._length).astype(numpy.intp)
+   inverseTables = numpy.argsort(tables, axis = 2)
+   candidates = self._screen(tables, inverseTables)
+   stopsList.extend(list() for _ in range(len(positions)))
+   for n in numpy.flatnonzero(candidates).tolist():
+    stopsList[start + n] = self._stops(tables[n].tolist(), inverseTables[n].tolist())
+  return stopsList
+
+ def _screen(self, tables : numpy.ndarray, inverseTables : numpy.ndarray) -> numpy.ndarray:
+  """Propagates the first wire of the test register for all Walzenstellungen at once
+
+:returns: indicator per Walzenstellungen, if a hypothesis may be consistent
+  """
+  nPositions, _, nPos = tables.shape
+  test = self._testRegister
+  live = numpy.zeros((nPositions, nPos, nPos), dtype = bool)
+  live[:, test, 0] = True
+  active = numpy.arange(nPositions)
+  while len(active) > 0:
+   nLive = int(live.sum())
+   for src, tgt, pos in self._edges:
+    live[:, tgt] |= numpy.take_along_axis(live[:, src], inverseTables[active, pos], axis = 1)
+    live[:, src] |= numpy.take_along_axis(live[:, tgt], tables[active, pos], axis = 1)
+   if self.diagonalBoard:
+    live |= live.transpose(0, 2, 1)
+   isStable = int(live.sum()) == nLive
+   # Walzenstellungen with a full test register are rejected
+   isOpen = ~live[:, test].all(axis = 1)
+   live = live[isOpen]
+   active = active[isOpen]
+   if isStable:
+    break
+  candidates = numpy.zeros(nPositions, dtype = bool)
+  candidates[active] = True
+  return candidates
+
+ def _closure(self, table : List[List[int]], inverseTable : List[List[int]], wire : int) -> List[int]:
+  """Propagates a single wire of the test register
+
+:returns: mask of live wires per bus
+  """
+  live = len(self._alphabet) * [0]
+  test = self._testRegister
+  live[test] = 1 << wire
+  pending = [(test, wire)]
+  while pending:
+   bus, wire = pending.pop()
+   for tgt, pos, forward in self._adjacency[bus]:
+    tgtWire = table[pos][wire] if forward else inverseTable[pos][wire]
+    if not live[tgt] >> tgtWire & 1:
+     live[tgt] |= 1 << tgtWire
+     pending.append((tgt, tgtWire))
+   if self.diagonalBoard and not live[wire] >> bus & 1:
+    live[wire] |= 1 << bus
+    pending.append((wire, bus))
+  return live
+
+ def _stops(self, table : List[List[int]], inverseTable : List[List[int]]) -> List[Dict[str, str]]:
+  """Examines all hypotheses of the test register for a single Walzenstellungen
+
+:returns: known Steckerbrett settings of each consistent hypothesis
+  """
+  alphabet = self._alphabet
+  examined = 0
+  stops = list()
+  for wire in range(len(alphabet)):
+   if examined >> wire & 1:
+    continue
+   live = self._closure(table, inverseTable, wire)
+   examined |= live[self._testRegister]
+   if all(mask & (mask - 1) == 0 for mask in live):
+    knownWiring = dict()
+    for bus, mask in enumerate(live):
+     if mask:
+      knownWiring[alphabet[bus]] = alphabet[mask.bit_length() - 1]
+    keys = list(knownWiring.keys())
+    for key in keys:
+     value = knownWiring[key]
+     if value not in keys:
+      knownWiring[value] = key
+    stops.append(knownWiring)
+  return stops
+
+ def __repr__(self) -> str:
+  return 'class: {}\ntest register: {}\nedges: {}\ndiagonal board: {}'.format(
+              self.__class__.__name__, self.menu.testRegister, len(self._edges), self.diagonalBoard)
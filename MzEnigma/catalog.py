@@ -0,0 +1,215 @@
+"""
+Indexed, memory mapped catalog of the Rejewski attack.
+
+A pickled catalog (see `TagesschluesselRange.createRejewskiCatalog`) holds a full
+Tagesschluessel and the doublets as strings per entry, it is loaded completely into
+memory and scanned linearly. A *RejewskiCatalog* file holds a fixed-width record per
+Tagesschluessel and an index from the doublets of the first position to the record IDs:
+
+.. csv-table:: File layout
+   :header: "Section", "Content"
+   :widths: 15, 45
+
+   *header*, "magic, version, len(alphabet), number of walzen, length of the components, number of records"
+   *components*, "pickled alphabet, enigma and lists of the Umkehrwalzen, Walzen and Zusatzwalzen"
+   *records*, "IDs of umkehrwalze, walzen, zusatzwalze, tagesWalzenStellungen codes and doublet codes"
+   *index*, "offsets of the doublets (first, second) and the record IDs sorted by doublet"
+
+The file is opened with `mmap`_, i.e. opening is instant and only the records
+of the doublet found in the index are read.
+
+.. _mmap: https://docs.python.org/3/library/mmap.html
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Tuple, Any, Iterator
+
+import collections.abc
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+
+import numpy
+
+import MzEnigma
+
+class RejewskiCatalog(collections.abc.Sequence):
+ """Represents a memory mapped Rejewski catalog.
+ Like a pickled catalog, it is a sequence of (Tagesschluessel, doublets) entries.
+
+:param catalogFile: catalog file (required)
+  """
+ MAGIC : bytes = b'MzRjwski'
+ VERSION : int = 1
+ _header = struct.Struct('<8sIIIQQ')
+
+ def __init__(self, catalogFile : str) -> None:
+  catalogFile = os.path.normpath(catalogFile)
+  assert os.path.isfile(catalogFile), '{}: catalog file {} is not or not a file'.format(self.__class__.__name__, catalogFile)
+  assert self.isCatalogFile(catalogFile), '{}: {} is not a catalog file'.format(self.__class__.__name__, catalogFile)
+  self.catalogFile = catalogFile
+  with open(catalogFile, 'rb') as f:
+   self._mmap = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+  _, version, nPos, numberOfWalzen, componentsLength, numberOfRecords = self._header.unpack_from(self._mmap, 0)
+  assert version <= self.VERSION, '{}: version {} of {} not supported'.format(self.__class__.__name__, version, catalogFile)
+  offset = self._header.size
+  components = pickle.loads(self._mmap[offset:offset + componentsLength])
+  self._alphabet : str = components['alphabet']
+  self._enigma : MzEnigma.Enigma = components['enigma']
+  self._umkehrwalzenList = components['umkehrwalzenList']
+  self._walzenList = components['walzenList']
+  self._zusatzwalzenList = components['zusatzwalzenList']
+  self._numberOfWalzen = numberOfWalzen
+  offset = self._aligned(offset + componentsLength)
+  recordType = self.recordType(nPos, numberOfWalzen)
+  self._records = numpy.frombuffer(self._mmap, dtype = recordType, count = numberOfRecords, offset = offset)
+  offset = self._aligned(offset + recordType.itemsize * numberOfRecords)
+  self._offsets = numpy.frombuffer(self._mmap, dtype = numpy.int64, count = nPos * nPos + 1, offset = offset)
+  offset += self._offsets.nbytes
+  self._ids = numpy.frombuffer(self._mmap, dtype = numpy.uint32, count = numberOfRecords * nPos, offset = offset)
+
+ @staticmethod
+ def _aligned(offset : int) -> int:
+  return (offset + 7) // 8 * 8
+
+ @staticmethod
+ def recordType(numberOfPositions : int, numberOfWalzen : int) -> numpy.dtype:
+  """Fixed-width record of a Tagesschluessel, the doublets of position *n* and letter *x* are
+  doublets[n][0][x] and doublets[n][1][x]
+
+:param numberOfPositions: number of characters in the alphabet
+:param numberOfWalzen: number of walzen, i.e. number of characters of a spruchschluessel
+:returns: numpy record type
+  """
+  return numpy.dtype([('umkehrwalze', '<u2'), ('walzen', '<u2'), ('zusatzwalze', '<u2'),
+                                 ('tagesWalzenStellungen', 'u1', (numberOfWalzen, )),
+                                 ('doublets', 'u1', (numberOfWalzen, 2, numberOfPositions))])
+
+ @classmethod
+ def isCatalogFile(cls, catalogFile : str) -> bool:
+  """
+:param catalogFile: file to be checked
+:returns: indicator, if the file starts like a catalog file
+  """
+  with open(catalogFile, 'rb') as f:
+   return f.read(len(cls.MAGIC)) == cls.MAGIC
+
+ @classmethod
+ def save(cls, catalogFile : str, components : Dict[str, Any], records : numpy.ndarray) -> None:
+  """Writes a catalog file and creates the index
+
+:param catalogFile: catalog file to be created (required)
+:param components: alphabet, enigma, umkehrwalzenList, walzenList and zusatzwalzenList referenced by the records (required)
+:param records: records of type `recordType` (required)
+  """
+  alphabet = components['alphabet']
+  nPos = len(alphabet)
+  numberOfWalzen = records.dtype['tagesWalzenStellungen'].shape[0]
+  assert records.dtype == cls.recordType(nPos, numberOfWalzen), '{}.save: improper record type'.format(cls.__name__)
+  # index: each record is found by the doublets (first, second) of all letters at the first position
+  doublets = records['doublets'][:, 0].astype(numpy.intp)
+  keys = (doublets[:, 0] * nPos + doublets[:, 1]).ravel()
+  order = numpy.argsort(keys, kind = 'stable')
+  ids = (order // nPos).astype(numpy.uint32)
+  offsets = numpy.zeros(nPos * nPos + 1, dtype = numpy.int64)
+  offsets[1:] = numpy.cumsum(numpy.bincount(keys, minlength = nPos * nPos))
+  componentsData = pickle.dumps(components, protocol = pickle.HIGHEST_PROTOCOL)
+  # written atomically, i.e. an interrupted build does not leave a truncated catalog
+  catalogFile = os.path.normpath(catalogFile)
+  handle, tempFile = tempfile.mkstemp(dir = os.path.dirname(os.path.abspath(catalogFile)), prefix = '.' + os.path.basename(catalogFile), suffix = '.tmp')
+  try:
+   with os.fdopen(handle, 'wb') as f:
+    f.write(cls._header.pack(cls.MAGIC, cls.VERSION, nPos, numberOfWalzen, len(componentsData), len(records)))
+    f.write(componentsData)
+    for section in (numpy.ascontiguousarray(records), offsets):
+     f.write(bytes(cls._aligned(f.tell()) - f.tell()))
+     f.write(section.tobytes())
+    f.write(ids.tobytes())
+   os.replace(tempFile, catalogFile)
+  except BaseException:
+   if os.path.exists(tempFile):
+    os.remove(tempFile)
+   raise
+
+ @property
+ def alphabet(self) -> str:
+  """
+  :getter: Returns the alphabet
+  :setter: None
+  """
+  return self._alphabet
+
+ @property
+ def records(self) -> numpy.ndarray:
+  """
+  :getter: Returns the memory mapped records
+  :setter: None
+  """
+  return self._records
+
+ def tagesschluessel(self, recordID : int) -> MzEnigma.Tagesschluessel:
+  """
+:param recordID: number of the record
+:returns: Tagesschluessel of the record
+  """
+  record = self._records[recordID]
+  return MzEnigma.CompactTagesschluessel(enigma = self._enigma,
+                                                            umkehrwalze = self._umkehrwalzenList[record['umkehrwalze']],
+                                                            walzen = self._walzenList[record['walzen']],
+                                                            tagesWalzenStellungen = ''.join(self._alphabet[c] for c in record['tagesWalzenStellungen'].tolist()),
+                                                            zusatzwalze = self._zusatzwalzenList[record['zusatzwalze']] if self._zusatzwalzenList else None).toTagesschluessel()
+
+ def doublets(self, recordID : int) -> List[List[str]]:
+  """
+:param recordID: number of the record
+:returns: doublets of the record for every position (see `Tagesschluessel.findDoublets`)
+  """
+  alphabet = self._alphabet
+  return [[alphabet[c1] + alphabet[c2] for c1, c2 in zip(first, second)] for first, second in self._records[recordID]['doublets'].tolist()]
+
+ def find(self, encodedSpruchSchluessel : str) -> List[Tuple[MzEnigma.Tagesschluessel, str]]:
+  """Finds candidate values for the unencoded SpruchSchluessel by the index (see `TagesschluesselRange.rejewskiAttack`)
+
+:param encodedSpruchSchluessel: twice encoded spruchschluessel (required)
+:returns: List[Tuple[Tagesschluessel, unencodedSpruchSchluessel]] in the order of the records
+  """
+  k = self._numberOfWalzen
+  nPos = len(self._alphabet)
+  assert len(encodedSpruchSchluessel) >= 2*k and all(c in self._alphabet for c in encodedSpruchSchluessel[:2*k]), '{}.find: {} is not a twice encoded spruchschluessel'.format(self.__class__.__name__, encodedSpruchSchluessel)
+  codes = [self._alphabet.index(c) for c in encodedSpruchSchluessel[:2*k]]
+  bucket = codes[0] * nPos + codes[k]
+  recordIDs = numpy.asarray(self._ids[self._offsets[bucket]:self._offsets[bucket + 1]], dtype = numpy.intp)
+  doublets = self._records['doublets'][recordIDs]
+  isMatch = numpy.ones(len(recordIDs), dtype = bool)
+  letters = numpy.empty((len(recordIDs), k), dtype = numpy.intp)
+  for n in range(k):
+   isPair = (doublets[:, n, 0] == codes[n]) & (doublets[:, n, 1] == codes[k + n])
+   isMatch &= isPair.any(axis = 1)
+   letters[:, n] = isPair.argmax(axis = 1)
+  return [(self.tagesschluessel(recordID), ''.join(self._alphabet[c] for c in letterCodes))
+              for recordID, letterCodes in zip(recordIDs[isMatch].tolist(), letters[isMatch].tolist())]
+
+ def close(self) -> None:
+  """Closes the memory map, the catalog is no longer usable
+  """
+  self._records = self._offsets = self._ids = None
+  self._mmap.close()
+
+ def __getitem__(self, recordID : int) -> Tuple[MzEnigma.Tagesschluessel, List[List[str]]]:
+  if recordID < 0:
+   recordID += len(self)
+  if not 0 <= recordID < len(self):
+   raise IndexError('{}: record {} not found'.format(self.__class__.__name__, recordID))
+  return self.tagesschluessel(recordID), self.doublets(recordID)
+
+ def __iter__(self) -> Iterator[Tuple[MzEnigma.Tagesschluessel, List[List[str]]]]:
+  for recordID in range(len(self)):
+   yield self[recordID]
+
+ def __len__(self) -> int:
+  return len(self._records)
+
+ def __repr__(self) -> str:
+  return 'class: {}\nfile: {}\nalphabet: {}\nrecords: {}'.format(self.__class__.__name__, self.catalogFile, self._alphabet, len(self))
@@ -0,0 +1,106 @@
+"""
+Checkpoints of long running catalog builds and brute force attacks.
+
+The builds and attacks of `TagesschluesselRange` are split into shards, e.g. an
+Umkehrwalze and Walzen order. With a checkpoint directory, the result of every completed
+shard is written to its own file, i.e. after a crash or preemption the work is resumed
+by *resume = True* and only the missing shards are examined again:
+
+.. code-block:: python
+
+  candidates = tagesschluesselRange.turingAttack(encodedSpruch, crib, checkpointDir = 'turing', resume = True)
+
+The directory holds the description of the task (*task.pickle*), a checkpoint of another task
+is rejected. All files are written atomically (temporary file and `os.replace`_), i.e. a file
+is either complete or not existing.
+
+.. _os.replace: https://docs.python.org/3/library/os.html#os.replace
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Tuple, Any
+
+import os
+import pickle
+import tempfile
+
+class Checkpoint(object):
+ """Represents a directory with the results of the completed shards of a task
+
+:param directory: checkpoint directory, created if not existing (required)
+:param task: plain data describing the task, e.g. method, components and parameters (required)
+:param resume: resume a checkpoint of the task in the directory
+  """
+ TASKFILE : str = 'task.pickle'
+
+ def __init__(self, directory : str, task : Dict[str, Any], resume : bool = False) -> None:
+  self.directory = os.path.normpath(directory)
+  os.makedirs(self.directory, exist_ok = True)
+  taskFile = os.path.join(self.directory, self.TASKFILE)
+  if os.path.exists(taskFile):
+   assert resume, '{}: {} holds a checkpoint already, use resume = True'.format(self.__class__.__name__, self.directory)
+   with open(taskFile, 'rb') as f:
+    assert pickle.load(f) == task, '{}: {} holds a checkpoint of another task'.format(self.__class__.__name__, self.directory)
+  else:
+   self.dump(task, taskFile)
+  self.task = task
+
+ @staticmethod
+ def dump(data : Any, file : str) -> None:
+  """Pickles data atomically, i.e. the file is replaced only by complete data
+
+:param data: data to be pickled
+:param file: file to be written (required)
+  """
+  file = os.path.normpath(file)
+  handle, tempFile = tempfile.mkstemp(dir = os.path.dirname(os.path.abspath(file)), prefix = '.' + os.path.basename(file), suffix = '.tmp')
+  try:
+   with os.fdopen(handle, 'wb') as f:
+    pickle.dump(data, f, protocol = pickle.HIGHEST_PROTOCOL)
+    f.flush()
+    os.fsync(f.fileno())
+   os.replace(tempFile, file)
+  except BaseException:
+   if os.path.exists(tempFile):
+    os.remove(tempFile)
+   raise
+
+ def _shardFile(self, shard : Tuple[int, ...]) -> str:
+  return os.path.join(self.directory, 'shard-{}.pickle'.format('-'.join(str(v) for v in shard)))
+
+ def isDone(self, shard : Tuple[int, ...]) -> bool:
+  """
+:param shard: key of the shard, e.g. indices of umkehrwalze and walzen
+:returns: indicator, if the result of the shard has been saved
+  """
+  return os.path.isfile(self._shardFile(shard))
+
+ def load(self, shard : Tuple[int, ...]) -> Any:
+  """
+:param shard: key of a completed shard (required)
+:returns: result of the shard
+  """
+  assert self.isDone(shard), '{}.load: shard {} not completed'.format(self.__class__.__name__, shard)
+  with open(self._shardFile(shard), 'rb') as f:
+   return pickle.load(f)
+
+ def save(self, shard : Tuple[int, ...], result : Any) -> None:
+  """Saves the result of a completed shard
+
+:param shard: key of the shard (required)
+:param result: result of the shard
+  """
+  self.dump(result, self._shardFile(shard))
+
+ def shards(self) -> List[Tuple[int, ...]]:
+  """
+:returns: keys of the completed shards
+  """
+  shards = list()
+  for name in sorted(os.listdir(self.directory)):
+   if name.startswith('shard-') and name.endswith('.pickle'):
+    shards.append(tuple(int(v) for v in name[len('shard-'):-len('.pickle')].split('-')))
+  return shards
+
+ def __repr__(self) -> str:
+  return 'class: {}\ndirectory: {}\ntask: {}\ncompleted shards: {}'.format(self.__class__.__name__, self.directory, self.task.get('method'), len(self.shards()))
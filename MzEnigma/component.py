@@ -1,6 +1,9 @@
 from typing import TypeVar,  Union, Optional, Callable, Dict,  List,  Tuple
 import random
 import copy
+import itertools
+
+import MzEnigma.tracing
 
 stdAlphabet : str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
 sgsAlphabet : str = 'ABCDEFGHIJKLMNOPQRSTUVXYZÅÄÖ'
@@ -11,6 +14,9 @@ class Zusatzwalze: pass
 class Walze: pass
 Component = TypeVar('Component', Umkehrwalze, Steckerbrett, Zusatzwalze, Walze)
 
+# versions of the components, unique within the process (see `Umkehrwalze.version`)
+_versions = itertools.count(1)
+
 class Umkehrwalze(object):
  """Represents an Umkehrwalze (UKW == reflector)
 
@@ -27,6 +33,13 @@ class Umkehrwalze(object):
 :param alphabet: unencoded alphabet to be used
 :param notify: notification function (e.g. print)
  """
+ __slots__ = ('__weakref__', '_notify', '_emit', '_version', '_nextComponent', '_prevComponent', '_name', '_alphabet', '_numberOfPositions', '_wiring')
+ # capabilities of the class, checked on the hot path instead of the instance attributes
+ _isReflector : bool = True
+ _hasReverseWiring : bool = False
+ _hasRingstellung : bool = False
+ _isStepping : bool = False
+
  def __init__(self, 
   name  : str = '', 
   wiring : Union[str, Dict[str, str]] = '', 
@@ -49,12 +62,52 @@ class Umkehrwalze(object):
     wiringList[srcID] = tgt
    wiring = ''.join(wiringList)
   self.wiring = wiring
-  if self.__class__.__name__ == 'Umkehrwalze':
+  if self._isReflector:
    for n, c in enumerate(self._alphabet):
     assert wiring[n] != c, '{}: Character {} reflected to itself'.format(self.__class__.__name__, c)
   
  def copy(self) -> Component:
   return copy.deepcopy(self)
+
+ def __getstate__(self) -> Dict[str, object]:
+  state = dict()
+  for cls in self.__class__.__mro__:
+   for name in cls.__dict__.get('__slots__', ()):
+    if name not in ('__weakref__', '_emit', '_version') and hasattr(self, name):
+     state[name] = getattr(self, name)
+  return state
+
+ def __setstate__(self, state : Union[Dict[str, object], Tuple[Optional[Dict[str, object]], Dict[str, object]]]) -> None:
+  # accepts the state of components pickled before __slots__ have been introduced
+  if isinstance(state, tuple):
+   dictState, slotsState = state
+   state = dict(dictState or dict(), **(slotsState or dict()))
+  self.notify = state.pop('_notify', state.pop('notify', None))
+  for name, value in state.items():
+   setattr(self, name, value)
+  # versions are not pickled, they are unique within a process only
+  self._version = next(_versions)
+
+ @property
+ def notify(self) -> Optional[Callable[[str], None]]:
+  """
+  :getter: Returns the notification function
+  :setter: Sets the notification function and subscribes to the 'component' tracer (see `resolveEmitter`)
+  """
+  return self._notify
+
+ @notify.setter
+ def notify(self, notify : Optional[Callable[[str], None]]) -> None:
+  self._notify = notify
+  MzEnigma.tracing.getTracer('component').subscribe(self)
+
+ def resolveEmitter(self, tracer : MzEnigma.tracing.Tracer) -> None:
+  """Resolves the emitter of the 'component' tracer, called by the tracer whenever its configuration changes,
+  i.e. the hot paths only test the emitter kept by the component
+
+:param tracer: the 'component' tracer
+  """
+  self._emit = tracer.emitter(MzEnigma.tracing.TRACE, self._notify)
  
  def nCC(self) -> int:
   ncc = 0
@@ -102,12 +155,22 @@ class Umkehrwalze(object):
    assert c not in _wiring, '{}/wiring: Duplicate character {} in wiring'.format(self.__class__.__name__, c)
    _wiring += c
   self._wiring = _wiring
-  if '_rwiring' in vars(self):
+  if self._hasReverseWiring:
    rwiringList = [' '] * self._numberOfPositions
    for n, c in enumerate(self._wiring):
     nr = self.alphabet.index(c)
     rwiringList[nr] = self.alphabet[n]
    self._rwiring = ''.join(rwiringList)
+  self._version = next(_versions)
+
+ @property
+ def version(self) -> int:
+  """
+  :getter: Returns the version, changed whenever a setting compiled by a `Scrambler` changes (e.g. the wiring), 
+    i.e. equal versions within a process stand for equal settings
+  :setter: None
+  """
+  return self._version
  
  @property
  def nextComponent(self) -> str:
@@ -131,7 +194,7 @@ class Umkehrwalze(object):
   
  @prevComponent.setter
  def prevComponent(self, component : Component) -> None:
-  if self.__class__.__name__ == 'Umkehrwalze':
+  if self._isReflector:
    raise TypeError('{} is unidirectional'.format(self.__class__.__name__))
   self._prevComponent = component
 
@@ -145,18 +208,21 @@ class Umkehrwalze(object):
   """
   assert len(c) == 1, '{}.encode({})/{}: len({}) != 1'.format(self.__class__.__name__, forward, self.name, c)
   assert c in self._alphabet, '{}.encode({})/{}: Character {} out of range'.format(self.__class__.__name__, forward, self.name, c)
-  if '_ringstellung' in vars(self):
+  if self._hasRingstellung:
    state = self._alphabet.index(self._ringstellung)
+   if self._isStepping:
+    state -= self._alphabet.index(self._ringSetting)
   else:
    state = 0
   if forward:
    output = self._wiring[(self._alphabet.index(c) + state) % self._numberOfPositions]            
   else:
    output = self._alphabet[(self._alphabet.index(self._rwiring[self._alphabet.index(c)]) - state)  % self._numberOfPositions]     
-  if self.notify is not None:
-   self.notify('{}.encode({})/{}: {} => {}'.format(self.__class__.__name__, forward, self.name, c, output))
+  emit = self._emit
+  if emit is not None:
+   emit('encode', '{}.encode({})/{}: {} => {}', self.__class__.__name__, forward, self.name, c, output)
   if not componentOnly:
-   if self._nextComponent and self.__class__ == Umkehrwalze:
+   if self._nextComponent and self._isReflector:
     return self._nextComponent.encode(output, forward = False)
    elif self._nextComponent and forward:
     return self._nextComponent.encode(output, forward = True)
@@ -173,11 +239,12 @@ class Umkehrwalze(object):
   """
   chainList = list()
   lastComponent = self
+  emit = self._emit
   while lastComponent is not None:
-   chainList.append((lastComponent, forward or lastComponent.__class__ == Umkehrwalze))
-   if self.notify is not None:
-    self.notify('{}.chain({})/{}'.format(self.__class__.__name__, forward, self.name))
-   if lastComponent.__class__ == Umkehrwalze:
+   chainList.append((lastComponent, forward or lastComponent._isReflector))
+   if emit is not None:
+    emit('chain', '{}.chain({})/{}', self.__class__.__name__, forward, self.name)
+   if lastComponent._isReflector:
     lastComponent = lastComponent.nextComponent
     forward = False
    elif forward:
@@ -233,12 +300,15 @@ class Steckerbrett(Umkehrwalze):
 :param alphabet: unencoded alphabet to be used
 :param notify: notification function (e.g. print)
  """
+ __slots__ = ('_rwiring', )
+ _isReflector : bool = False
+ _hasReverseWiring : bool = True
+
  def __init__(self, 
   name  : str = '', 
   wiring : Union[str, Dict[str, str]] = '', 
   alphabet  : str = stdAlphabet, 
   notify : Optional[Callable[[str], None]] = None) -> None:
-  self._rwiring = ''
   super(Steckerbrett, self).__init__(name, wiring, alphabet, notify)
   if self.__class__ == Steckerbrett:
    if name == 'Mark 1':
@@ -441,6 +511,9 @@ class Zusatzwalze(Steckerbrett) :
 :param alphabet: unencoded alphabet to be used
 :param notify: notification function (e.g. print)
  """
+ __slots__ = ('_ringstellung', )
+ _hasRingstellung : bool = True
+
  def __init__(self, 
   name  : str = '', 
   wiring : Union[str, Dict[str, str]] = '', 
@@ -472,6 +545,9 @@ class Zusatzwalze(Steckerbrett) :
    assert len(ringstellung) == 1, '{}.ringstellung {}: 1 character expected, {} got'.format(self.__class__.__name__, self._name, ringstellung)
    assert ringstellung in self._alphabet
    self._ringstellung = ringstellung
+   # the ringstellung of a stepping Walze is not compiled
+   if not self._isStepping:
+    self._version = next(_versions)
 
  def __eq__(self, component : Component) -> bool:
   return super(Zusatzwalze, self).__eq__(component) and self._ringstellung == component._ringstellung
@@ -496,19 +572,29 @@ class Walze(Zusatzwalze):
 :param notches: visible characters for the notches, positions related to the *alphabet*
 :param alphabet: unencoded alphabet to be used
 :param notify: notification function (e.g. print)
+:param ringSetting: ring setting (Ringstellung of the key sheets), position related to the *alphabet* (default: first character, i.e. the wiring is not shifted)
 
+The *ringstellung* is the visible character, i.e. the position of the ring. The wiring is shifted by the
+position relative to the *ringSetting*, whereas the notches are fixed to the ring, i.e. to the visible characters.
  """
+ __slots__ = ('_notches', '_ringSetting')
+ _isStepping : bool = True
+
  def __init__(self, 
   name  : str = '', 
   wiring : Union[str, Dict[str, str]] = '', 
   ringstellung : Optional[str] = None, 
   notches : str  = '', 
   alphabet : str = stdAlphabet, 
-  notify : Optional[Callable[[str], None]] = None) -> None:
+  notify : Optional[Callable[[str], None]] = None, 
+  ringSetting : Optional[str] = None) -> None:
   """
   Initialization
   """
   super(Walze, self).__init__(name, wiring, ringstellung, alphabet, notify)
+  self._ringSetting = self._alphabet[0]
+  if ringSetting is not None:
+   self.ringSetting = ringSetting
   assert notches, '{} {}: At least 1 notch required'.format(self.__class__.__name__, self._name)
   self._notches = ''
   for notch in notches:
@@ -518,11 +604,22 @@ class Walze(Zusatzwalze):
    
  def stepN(self, n : int)-> None:
   """
-  Steps the Walze n times
+  Steps the Walze n times. The Walze passes its notches (n // numberOfPositions) * len(notches) times
+  plus the notches within the remaining steps, i.e. the next Walze is stepped in closed form as well.
   """
   assert n > 0, '{} {}: n == {} <= 0'.format(self.__class__.__name__, self._name, n)
-  for _ in range(n):
-   self.step()
+  position = self._alphabet.index(self._ringstellung)
+  nCycles, nRest = divmod(n, self._numberOfPositions)
+  nNotches = nCycles * len(self._notches)
+  for notch in self._notches:
+   if (self._alphabet.index(notch) - position) % self._numberOfPositions < nRest:
+    nNotches += 1
+  if nNotches > 0 and self._nextComponent and self._nextComponent._isStepping:
+   self._nextComponent.stepN(nNotches)
+  self._ringstellung = self._alphabet[(position + n) % self._numberOfPositions]
+  emit = self._emit
+  if emit is not None:
+   emit('step', '{}.stepN {}: {}, notches = {}', self.__class__.__name__, self.name, self._ringstellung, nNotches)
 
  def step(self)-> None:
   """
@@ -539,17 +636,40 @@ class Walze(Zusatzwalze):
   """
   notchFound = self._ringstellung in self._notches
   if notchFound:
-   if self._nextComponent and self._nextComponent.__class__.__name__ == 'Walze':
+   if self._nextComponent and self._nextComponent._isStepping:
     self._nextComponent.step()
   self._ringstellung = self._alphabet[(self._alphabet.index(self._ringstellung) + 1) % self._numberOfPositions]
-  if self.notify:
-   self.notify('{}.step {}: {}, notch = {}'.format(self.__class__.__name__, self.name, self._ringstellung, notchFound))
+  emit = self._emit
+  if emit is not None:
+   emit('step', '{}.step {}: {}, notch = {}', self.__class__.__name__, self.name, self._ringstellung, notchFound)
+
+ def __setstate__(self, state : Union[Dict[str, object], Tuple[Optional[Dict[str, object]], Dict[str, object]]]) -> None:
+  super(Walze, self).__setstate__(state)
+  # walzen pickled before ring settings have been introduced
+  if not hasattr(self, '_ringSetting'):
+   self._ringSetting = self._alphabet[0]
+
+ @property
+ def ringSetting(self) -> str:
+  """
+  :getter: Returns the ring setting
+  :setter: Sets the ring setting
+  """
+  return self._ringSetting
+
+ @ringSetting.setter
+ def ringSetting(self, ringSetting : str) -> None:
+  assert len(ringSetting) == 1, '{}.ringSetting {}: 1 character expected, {} got'.format(self.__class__.__name__, self._name, ringSetting)
+  assert ringSetting in self._alphabet, '{}.ringSetting {}: Character {} not in {}'.format(self.__class__.__name__, self._name, ringSetting, self._alphabet)
+  self._ringSetting = ringSetting
+  self._version = next(_versions)
 
  def __eq__(self, component : Component) -> bool:
+  # the ring setting is part of the Tagesschluessel, not of the Walze (see `Tagesschluessel.ringSettings`)
   return super(Walze, self).__eq__(component) and self._notches == component._notches
 
  def __repr__(self) -> str:
-  return super(Walze, self).__repr__() + '\nnotches: {}'.format(self._notches)
+  return super(Walze, self).__repr__() + '\nnotches: {}\nringSetting: {}'.format(self._notches, self._ringSetting)
 
  @property
  def notches(self) -> str:
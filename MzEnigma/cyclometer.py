@@ -0,0 +1,201 @@
+"""
+Cyclometer, i.e. the Steckerbrett invariant catalog of the Rejewski attack.
+
+The spruchschluessel of *k* letters is encoded twice, i.e. the letters *n* and
+*k + n* of the encoded spruchschluessel are the images of the same letter by the
+permutations *P[n]* and *P[k + n]* of the Tagesschluessel. With the traffic of a day,
+the products *P[k + n] P[n]^-1* (AD, BE, CF for 3 Walzen) are known completely.
+A Steckerbrett *S* changes the permutations to *S P S* and the products to conjugates
+*S P[k + n] P[n]^-1 S*, which have the same cycle lengths. The cycle lengths of the products
+(the *characteristic*) depend on the Walzen, Umkehrwalze, Zusatzwalze and
+tagesWalzenStellungen only, so a catalog indexed by the characteristic finds the
+candidates of a day by a single lookup, even for an engine with Steckerbrett.
+"""
+
+from __future__ import annotations
+from typing import Optional, Dict, List, Tuple, Any, Iterable
+
+import os
+import pickle
+
+import numpy
+
+import MzEnigma
+
+Characteristic = Tuple[Tuple[int, ...], ...]
+
+class CyclometerCatalog(object):
+ """Represents a catalog of Tagesschluessels indexed by their characteristic (see `cyclometer`)
+
+:param components: alphabet, enigma, umkehrwalzenList, walzenList and zusatzwalzenList referenced by the records (required)
+:param records: records with the IDs of umkehrwalze, walzen, zusatzwalze, tagesWalzenStellungen codes and characteristic (required)
+:param characteristics: characteristics referenced by the records (required)
+  """
+ def __init__(self, components : Dict[str, Any], records : numpy.ndarray, characteristics : List[Characteristic]) -> None:
+  self._components = components
+  self._alphabet : str = components['alphabet']
+  self._records = records
+  self._characteristics = list(characteristics)
+  self._characteristicIDs = {characteristic: n for n, characteristic in enumerate(self._characteristics)}
+  # index: record IDs sorted by characteristic
+  self._recordIDs = numpy.argsort(records['characteristic'], kind = 'stable')
+  self._offsets = numpy.zeros(len(self._characteristics) + 1, dtype = numpy.int64)
+  self._offsets[1:] = numpy.cumsum(numpy.bincount(records['characteristic'], minlength = len(self._characteristics)))
+
+ @staticmethod
+ def recordType(numberOfWalzen : int) -> numpy.dtype:
+  """Fixed-width record of a Tagesschluessel
+
+:param numberOfWalzen: number of walzen
+:returns: numpy record type
+  """
+  return numpy.dtype([('umkehrwalze', '<u2'), ('walzen', '<u2'), ('zusatzwalze', '<u2'),
+                                 ('tagesWalzenStellungen', 'u1', (numberOfWalzen, )), ('characteristic', '<u4')])
+
+ @staticmethod
+ def cycleLengths(products : numpy.ndarray) -> numpy.ndarray:
+  """Length of the cycle of each letter in many permutations at once
+
+:param products: integer array of permutations, the last axis are the letters
+:returns: integer array of the same shape
+  """
+  nPos = products.shape[-1]
+  start = numpy.broadcast_to(numpy.arange(nPos), products.shape)
+  actual = start
+  lengths = numpy.zeros(products.shape, dtype = numpy.intp)
+  for length in range(1, nPos + 1):
+   actual = numpy.take_along_axis(products, actual, axis = -1)
+   lengths[(actual == start) & (lengths == 0)] = length
+  return lengths
+
+ @staticmethod
+ def products(tables : numpy.ndarray) -> numpy.ndarray:
+  """Products P[k + n] P[n]^-1 of the permutations of a twice encoded spruchschluessel
+
+:param tables: integer array of shape (..., 2*k, len(alphabet)) (see `Scrambler.permutationTableBatch`)
+:returns: integer array of shape (..., k, len(alphabet)), product *n* maps letter *n* to letter *k + n* of an encoded spruchschluessel
+  """
+  k = tables.shape[-2] // 2
+  tables = numpy.asarray(tables, dtype = numpy.intp)
+  return numpy.take_along_axis(tables[..., k:, :], numpy.argsort(tables[..., :k, :], axis = -1), axis = -1)
+
+ @classmethod
+ def characteristic(cls,
+  encodedSpruchSchluesselList : Iterable[str],
+  alphabet : str = MzEnigma.stdAlphabet) -> Characteristic:
+  """Characteristic of the traffic of a day
+
+:param encodedSpruchSchluesselList: twice encoded spruchschluessels of a day (required)
+:param alphabet: alphabet of the spruchschluessels
+:returns: cycle lengths of the products in descending order, per position of the spruchschluessel
+  """
+  nPos = len(alphabet)
+  index = {c: n for n, c in enumerate(alphabet)}
+  products : Optional[List[List[int]]] = None
+  for encodedSpruchSchluessel in encodedSpruchSchluesselList:
+   k = len(encodedSpruchSchluessel) // 2
+   assert len(encodedSpruchSchluessel) == 2*k and all(c in index for c in encodedSpruchSchluessel), 'characteristic: {} is not a twice encoded spruchschluessel'.format(encodedSpruchSchluessel)
+   if products is None:
+    products = [nPos * [-1] for _ in range(k)]
+   assert len(products) == k, 'characteristic: {} does not match the length of the other spruchschluessels'.format(encodedSpruchSchluessel)
+   for n in range(k):
+    first, second = index[encodedSpruchSchluessel[n]], index[encodedSpruchSchluessel[k + n]]
+    assert products[n][first] in (-1, second), 'characteristic: {} contradicts the other spruchschluessels'.format(encodedSpruchSchluessel)
+    products[n][first] = second
+  assert products is not None, 'characteristic: at least one spruchschluessel required'
+  for n, product in enumerate(products):
+   missing = [alphabet[c] for c, v in enumerate(product) if v < 0]
+   assert not missing, 'characteristic: product {} incomplete, spruchschluessels starting with {} at position {} required'.format(n, ''.join(missing), n)
+   assert len(set(product)) == nPos, 'characteristic: product {} is not a permutation'.format(n)
+  return cls._characteristics(numpy.array(products, dtype = numpy.intp)[numpy.newaxis])[0]
+
+ @classmethod
+ def _characteristics(cls, products : numpy.ndarray) -> List[Characteristic]:
+  """Characteristics of many products of shape (nProducts, k, len(alphabet))
+  """
+  # the sorted cycle lengths per letter define the characteristic, i.e. the characteristics are derived for the distinct rows only
+  lengths = -numpy.sort(-cls.cycleLengths(products), axis = -1).reshape(len(products), -1)
+  distinct, inverse = numpy.unique(lengths, axis = 0, return_inverse = True)
+  k = products.shape[1]
+  characteristics = list()
+  for row in distinct.reshape(len(distinct), k, -1).tolist():
+   characteristic = list()
+   for letterLengths in row:
+    cycles = list()
+    n = 0
+    while n < len(letterLengths):
+     cycles.append(letterLengths[n])
+     n += letterLengths[n]
+    characteristic.append(tuple(cycles))
+   characteristics.append(tuple(characteristic))
+  return [characteristics[n] for n in inverse.ravel().tolist()]
+
+ @property
+ def alphabet(self) -> str:
+  """
+  :getter: Returns the alphabet
+  :setter: None
+  """
+  return self._alphabet
+
+ @property
+ def characteristics(self) -> List[Characteristic]:
+  """
+  :getter: Returns the distinct characteristics of the catalog
+  :setter: None
+  """
+  return list(self._characteristics)
+
+ def tagesschluessel(self, recordID : int) -> MzEnigma.Tagesschluessel:
+  """
+:param recordID: number of the record
+:returns: Tagesschluessel of the record, a Steckerbrett of the enigma is unconnected
+  """
+  record = self._records[recordID]
+  enigma = self._components['enigma']
+  zusatzwalzenList = self._components['zusatzwalzenList']
+  return MzEnigma.CompactTagesschluessel(enigma = enigma,
+                                                            umkehrwalze = self._components['umkehrwalzenList'][record['umkehrwalze']],
+                                                            walzen = self._components['walzenList'][record['walzen']],
+                                                            tagesWalzenStellungen = ''.join(self._alphabet[c] for c in record['tagesWalzenStellungen'].tolist()),
+                                                            steckerbrettWiring = None if enigma.steckerbrett is None else self._alphabet,
+                                                            zusatzwalze = zusatzwalzenList[record['zusatzwalze']] if zusatzwalzenList else None).toTagesschluessel()
+
+ def find(self, characteristic : Characteristic) -> List[MzEnigma.Tagesschluessel]:
+  """Finds the Tagesschluessels of a characteristic
+
+:param characteristic: characteristic (see `characteristic`)
+:returns: Tagesschluessels in the order of the records
+  """
+  characteristicID = self._characteristicIDs.get(tuple(tuple(v) for v in characteristic))
+  if characteristicID is None:
+   return list()
+  recordIDs = self._recordIDs[self._offsets[characteristicID]:self._offsets[characteristicID + 1]]
+  return [self.tagesschluessel(recordID) for recordID in recordIDs.tolist()]
+
+ def save(self, pickleFile : str) -> None:
+  """Saves the catalog
+
+:param pickleFile: pickle file to be created (required)
+  """
+  with open(os.path.normpath(pickleFile), 'wb') as f:
+   pickle.dump((self._components, self._records, self._characteristics), f, protocol = pickle.HIGHEST_PROTOCOL)
+
+ @classmethod
+ def load(cls, pickleFile : str) -> CyclometerCatalog:
+  """Loads a catalog (see `save`)
+
+:param pickleFile: pickle file (required)
+:returns: CyclometerCatalog object
+  """
+  pickleFile = os.path.normpath(pickleFile)
+  assert os.path.isfile(pickleFile), '{}.load: pickle file {} is not or not a file'.format(cls.__name__, pickleFile)
+  with open(pickleFile, 'rb') as f:
+   components, records, characteristics = pickle.load(f)
+  return cls(components, records, characteristics)
+
+ def __len__(self) -> int:
+  return len(self._records)
+
+ def __repr__(self) -> str:
+  return 'class: {}\nalphabet: {}\nrecords: {}\ncharacteristics: {}'.format(self.__class__.__name__, self._alphabet, len(self), len(self._characteristics))
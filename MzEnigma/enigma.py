@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Optional, Union, Callable, List, Tuple, Set, Dict
+from typing import Optional, Union, Callable, Sequence, List, Tuple, Set, Dict
 
 import copy
 import itertools
@@ -8,6 +8,8 @@ import csv
 import os
 import math
 
+import numpy
+
 import MzEnigma
 
 class SpruchScoring(object):
@@ -18,8 +20,12 @@ class SpruchScoring(object):
  :param language: language to be used for ngram scoring (required)
  :param normalize: normalize ngram values with respect to maxScore 
  :param logarithmic: 10*math.log10(ngramDict[score]/minScore)
+ :param floor: score of n-grams not found in the statistics
   """
- def __init__(self, language : str, normalize : bool = True, logarithmic : bool = False):
+ # lookup tables of the unicode values by alphabet (see `_toCodes`)
+ _codeLookups : Dict[str, numpy.ndarray] = dict()
+
+ def __init__(self, language : str, normalize : bool = True, logarithmic : bool = False, floor : float = 0.0):
   self.resPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Resources') 
   assert language in ['english', 'german'], "{}: Language {} not supported, use 'english' or 'german'".format(self.__class__.__name__, language)
   self.language = language
@@ -40,6 +46,9 @@ class SpruchScoring(object):
    del self.ngramDict[1]
    del self.ngramLimits[1]
   self.numberOfChars = max(self.ngramDict.keys())
+  self.floor = floor
+  # dense n-gram tables by (numberOfChars, alphabet), compiled on first use
+  self._ngramTables : Dict[Tuple[int, str], numpy.ndarray] = dict()
   self.saTemperature = 0.0
   self.saThreshold = 0.01
   
@@ -72,41 +81,152 @@ class SpruchScoring(object):
   self.saTemperature /=  10^8
   return self.saTemperature
 
- def ngramScore(self, spruch : str, numberOfChars : int = 0, validChars : str = MzEnigma.stdAlphabet) -> float:
-  """N-gram score of a spruch
+ def ngramTable(self, numberOfChars : int = 0, alphabet : str = MzEnigma.stdAlphabet) -> numpy.ndarray:
+  """Dense n-gram table, i.e. the score of an n-gram with the codes (c1, ..., cn) of the *alphabet*
+  is at index (...(c1 * N + c2) * N + ...) + cn, n-grams not found in the statistics are scored by *floor*
+ 
+ :param numberOfChars: n-gram dictionary to be used (default: longest n-grams) 
+ :param alphabet: alphabet of the integer codes (e.g. stdAlphabet or sgsAlphabet)
+ :returns: float array of length len(alphabet)**numberOfChars
+  """
+  numberOfChars = self._numberOfChars(numberOfChars, 'ngramTable')
+  key = (numberOfChars, alphabet)
+  if key not in self._ngramTables:
+   nPos = len(alphabet)
+   index = {c: n for n, c in enumerate(alphabet)}
+   table = numpy.full(nPos ** numberOfChars, self.floor, dtype = numpy.float64)
+   for ngram, score in self.ngramDict[numberOfChars].items():
+    if len(ngram) == numberOfChars and all(c in index for c in ngram):
+     code = 0
+     for c in ngram:
+      code = code * nPos + index[c]
+     table[code] = score
+   self._ngramTables[key] = table
+  return self._ngramTables[key]
+
+ def _numberOfChars(self, numberOfChars : int, method : str) -> int:
+  if numberOfChars < 1:
+   assert 'numberOfChars' in vars(self), '{}.{}: no ngrams loaded'.format(self.__class__.__name__, method)
+   return self.numberOfChars
+  assert numberOfChars in self.ngramDict, '{}.{}: ngramDict[{}] not found'.format(self.__class__.__name__, method, numberOfChars)
+  return numberOfChars
+
+ def ngramScore(self, spruch : str, numberOfChars : int = 0, validChars : str = MzEnigma.stdAlphabet, alphabet : str = MzEnigma.stdAlphabet) -> float:
+  """N-gram score of a spruch, n-grams without any character of *validChars* are scored by 0
+  and n-grams not found in the statistics are scored by *floor*
  
  :param spruch: spruch to be scored (required)
  :param numberOfChars: n-gram dictionary to be used (default: longest n-grams) 
- :param validChars: alphabet of the spruch
+ :param validChars: characters to be scored
+ :param alphabet: alphabet of the spruch (e.g. stdAlphabet or sgsAlphabet)
  :returns: N-gram score
   """
-  _score = 0
-  if numberOfChars < 1:
-   assert 'numberOfChars' in vars(self), '{}.ngramScore: no ngrams loaded'.format(self.__class__.__name__)
-   numberOfChars = self.numberOfChars
-  else:
-   assert numberOfChars in self.ngramDict, '{}.ngramScore: ngramDict[{}] not found'.format(self.__class__.__name__, numberOfChars)
-  nChars = len(list(self.ngramDict[numberOfChars].keys())[0])
-  for c in validChars:
-   assert c in self.ngramDict[numberOfChars], '{}.ngramScore: {} not in ngramDict[{}]'.format(self.__class__.__name__, c, numberOfChars)
-  for n in range(len(spruch) - nChars + 1):
-   ngram = spruch[n: n + nChars]
-   for c in ngram:
-    if c in validChars:
-     _score += self.ngramDict[numberOfChars][ngram]
-     break
-  return _score/(len(spruch) - nChars + 1)
+  codes = self._toCodes(spruch, alphabet)
+  assert codes is not None, '{}.ngramScore: characters of {} not in alphabet {}'.format(self.__class__.__name__, spruch, alphabet)
+  validCodes = self._toCodes(validChars, alphabet, ignoreInvalid = True)
+  return self.ngramScoreCodes(codes, numberOfChars, validCodes, alphabet)
+
+ @classmethod
+ def _toCodes(cls, spruch : str, alphabet : str, ignoreInvalid : bool = False) -> Optional[numpy.ndarray]:
+  """Converts a spruch to integer codes of the *alphabet* by a lookup of the unicode values
+
+ :returns: integer codes or None, if a character is not in the alphabet
+  """
+  if alphabet not in cls._codeLookups:
+   lookup = numpy.full(max(ord(c) for c in alphabet) + 2, -1, dtype = numpy.intp)
+   for n, c in enumerate(alphabet):
+    lookup[ord(c)] = n
+   cls._codeLookups[alphabet] = lookup
+  lookup = cls._codeLookups[alphabet]
+  ords = numpy.frombuffer(spruch.encode('utf-32-le'), dtype = numpy.uint32)
+  codes = lookup[numpy.minimum(ords, len(lookup) - 1)]
+  if ignoreInvalid:
+   return codes[codes >= 0]
+  return None if (codes < 0).any() else codes
+
+ def _ngramScores(self, 
+  codes : numpy.ndarray, 
+  numberOfChars : int, 
+  validCodes : Optional[Sequence[int]], 
+  alphabet : str) -> Tuple[numpy.ndarray, int]:
+  """Scores of all n-grams of integer coded sprueche, i.e. of the last axis of *codes*
+
+ :returns: scores of the n-grams and number of n-grams per spruch
+  """
+  numberOfChars = self._numberOfChars(numberOfChars, 'ngramScoreCodes')
+  table = self.ngramTable(numberOfChars, alphabet)
+  nPos = len(alphabet)
+  nNgrams = codes.shape[-1] - numberOfChars + 1
+  assert nNgrams > 0, '{}.ngramScoreCodes: at least {} characters required'.format(self.__class__.__name__, numberOfChars)
+  index = codes[..., :nNgrams]
+  for n in range(1, numberOfChars):
+   index = index * nPos + codes[..., n:n + nNgrams]
+  scores = table[index]
+  if validCodes is not None and len(validCodes) < nPos:
+   isValid = numpy.zeros(nPos, dtype = bool)
+   isValid[list(validCodes)] = True
+   isValid = isValid[codes]
+   hasValid = isValid[..., :nNgrams]
+   for n in range(1, numberOfChars):
+    hasValid = hasValid | isValid[..., n:n + nNgrams]
+   scores = numpy.where(hasValid, scores, 0.0)
+  return scores, nNgrams
+
+ def ngramScoreCodes(self, 
+  codes : Sequence[int], 
+  numberOfChars : int = 0, 
+  validCodes : Optional[Sequence[int]] = None, 
+  alphabet : str = MzEnigma.stdAlphabet) -> float:
+  """N-gram score of an integer coded spruch (see `ngramScore`)
+ 
+ :param codes: integer codes of the spruch (required)
+ :param numberOfChars: n-gram dictionary to be used (default: longest n-grams) 
+ :param validCodes: codes of the valid characters (default: all)
+ :param alphabet: alphabet of the integer codes
+ :returns: N-gram score
+  """
+  scores, nNgrams = self._ngramScores(numpy.asarray(codes, dtype = numpy.intp), numberOfChars, validCodes, alphabet)
+  # summed up in order, i.e. exactly like the characters of a spruch
+  return sum(scores.tolist())/nNgrams
 
- def newNgramScore(self, spruch : str, currentScore : float, validChars : str = MzEnigma.stdAlphabet) -> float:
+ def ngramScoreBatch(self, 
+  codes : numpy.ndarray, 
+  numberOfChars : int = 0, 
+  validCodes : Optional[Sequence[int]] = None, 
+  alphabet : str = MzEnigma.stdAlphabet) -> numpy.ndarray:
+  """N-gram scores of many integer coded sprueche of equal length at once (see `ngramScore`)
+ 
+ :param codes: integer array of shape (nSprueche, lenSpruch), each row an integer coded spruch (e.g. by `Scrambler.encodeBatch`)
+ :param numberOfChars: n-gram dictionary to be used (default: longest n-grams) 
+ :param validCodes: codes of the valid characters (default: all)
+ :param alphabet: alphabet of the integer codes
+ :returns: float array of shape (nSprueche, ) with the N-gram scores
+  """
+  codes = numpy.asarray(codes, dtype = numpy.intp)
+  assert codes.ndim == 2, '{}.ngramScoreBatch: array of shape (nSprueche, lenSpruch) required'.format(self.__class__.__name__)
+  scores, nNgrams = self._ngramScores(codes, numberOfChars, validCodes, alphabet)
+  return scores.sum(axis = 1)/nNgrams
+
+ def newNgramScore(self, spruch : str, currentScore : float, validChars : str = MzEnigma.stdAlphabet, alphabet : str = MzEnigma.stdAlphabet) -> float:
   """Compares the N-gram score of a spruch with the currentScore. 
   Uses simulated if enabled.
  
  :param spruch: spruch to be scored (required)
  :param currentScore: current score (required)
- :param validChars: alphabet of the spruch
+ :param validChars: characters to be scored
+ :param alphabet: alphabet of the spruch
  :returns: N-gram score
   """
-  score = self.ngramScore(spruch, validChars = validChars)
+  return self.acceptScore(self.ngramScore(spruch, validChars = validChars, alphabet = alphabet), currentScore)
+
+ def acceptScore(self, score : float, currentScore : float) -> float:
+  """Compares a score with the currentScore (see `newNgramScore`), e.g. for scores updated incrementally.
+  Uses simulated annealing if enabled.
+ 
+ :param score: score of the new candidate (required)
+ :param currentScore: current score (required)
+ :returns: accepted score
+  """
   diffScore = score - currentScore
   if diffScore >= 0:
    return score
@@ -127,16 +247,30 @@ class SpruchScoring(object):
  :param validChars: alphabet of the spruch
  :returns: index of coincidence
   """
-  nAlphabet = len(validChars)
   nSpruch = len(spruch)
-  iocList = nAlphabet * [0.0]
-  for c in spruch:
-   iocList[validChars.index(c)] += 1
+  iocList = [spruch.count(c) for c in validChars]
+  assert sum(iocList) == nSpruch, 'indexOfCoincidence: characters of {} not in {}'.format(spruch, validChars)
   ioc = 0
-  for n in range(nAlphabet):
-   ioc += iocList[n] * (iocList[n] - 1)
+  for n in iocList:
+   ioc += n * (n - 1)
   return ioc/(nSpruch * (nSpruch-1))
 
+ @staticmethod
+ def indexOfCoincidenceBatch(codes : numpy.ndarray, numberOfPositions : int = len(MzEnigma.stdAlphabet)) -> numpy.ndarray:
+  """index of coincidence of many sprueche of equal length at once (see `indexOfCoincidence`),
+  the characters of all sprueche are counted by a single bincount
+ 
+ :param codes: integer array of shape (nSprueche, lenSpruch), each row an integer coded spruch (e.g. by `Scrambler.encodeBatch`)
+ :param numberOfPositions: number of characters in the alphabet
+ :returns: float array of shape (nSprueche, ) with the indices of coincidence
+  """
+  codes = numpy.asarray(codes)
+  assert codes.ndim == 2, 'indexOfCoincidenceBatch: array of shape (nSprueche, lenSpruch) required'
+  nSprueche, nSpruch = codes.shape
+  offsets = numpy.arange(nSprueche, dtype = numpy.intp)[:, None] * numberOfPositions
+  iocList = numpy.bincount((codes + offsets).ravel(), minlength = nSprueche * numberOfPositions).reshape(nSprueche, numberOfPositions)
+  return (iocList * (iocList - 1)).sum(axis = 1) / (nSpruch * (nSpruch - 1))
+
  def _loadStatistics(self, statfile : str) -> Dict[str, float]:
   ngramDict : Dict[str, Union[float, int]] = dict()
   alphabet = set(MzEnigma.stdAlphabet) | set(MzEnigma.sgsAlphabet)
@@ -323,8 +457,15 @@ class Tagesschluessel(object):
 :param walzen: List of type 'Walze' (if undefined, randomly selecte(if undefined, randomly selected)
 :param zusatzwalze: 'Zusatzwalze' (if undefined, randomly selected)
 :param blank: replacement character for a blank
+:param compiled: use the compiled `Scrambler` for encoding and decoding
 :param notify: notification function (e.g. print)
+:param ringSettings: ring settings (Ringstellung of the key sheets), one character per Walze (if undefined, the ring settings of the walzen, see `Walze.ringSetting`)
   """
+ # defaults for Tagesschluessel objects pickled by previous versions
+ compiled : bool = False
+ _scrambler = None
+ _scramblerSignature = None
+
  def __init__(self,
   enigma : Optional[Enigma] = None,  
   umkehrwalze : Optional[MzEnigma.Umkehrwalze] = None, 
@@ -333,8 +474,13 @@ class Tagesschluessel(object):
   steckerbrett : Optional[MzEnigma.Steckerbrett] = None, 
   zusatzwalze : Optional[MzEnigma.Zusatzwalze] = None, 
   blank : str = '',  
-  notify : Optional[Callable[[str], None]] = None) -> None:
+  compiled : bool = False, 
+  notify : Optional[Callable[[str], None]] = None, 
+  ringSettings : Optional[str] = None) -> None:
   self.notify = notify
+  self.compiled = compiled
+  self._scrambler : Optional[MzEnigma.Scrambler] = None
+  self._scramblerSignature : Optional[Tuple] = None
   assert enigma, '{}: Enigma required'.format(self.__class__.__name__)
   self.enigma =enigma
   self.blank = blank
@@ -361,6 +507,8 @@ class Tagesschluessel(object):
    self.firstComponent = self.steckerbrett
   else:
    self.firstComponent = self.walzen[0]
+  if ringSettings is not None:
+   self.ringSettings = ringSettings
   if tagesWalzenStellungen:
    assert len(tagesWalzenStellungen) == len(walzen), '{}: Walzenstellung, number of characters must match the number of walzen'.format(self.__class__.__name__)
    assert all(v in alphabet for v in tagesWalzenStellungen), '{}: Walzenstellung, all characters must be in alphabet'.format(self.__class__.__name__)
@@ -397,7 +545,8 @@ class Tagesschluessel(object):
    umkehrwalze : Optional[MzEnigma.Umkehrwalze] = None, 
    walzen : List[MzEnigma.Walze] = None, 
    tagesWalzenStellungen : Optional[str] = None, 
-   zusatzwalze : Optional[MzEnigma.Zusatzwalze] = None) -> None:
+   zusatzwalze : Optional[MzEnigma.Zusatzwalze] = None, 
+   ringSettings : Optional[str] = None) -> None:
   """Changes certain elements of a Tagesschluessel
  
 :param currentTagesschluessel: current Tagesschluessel (required)
@@ -405,6 +554,7 @@ class Tagesschluessel(object):
 :param umkehrwalze: 'Umkehrwalze' (if undefined, used from currentTagesschluessel)
 :param walzen: List of type 'Walze' (if undefined, used from currentTagesschluessel)
 :param zusatzwalze: 'Zusatzwalze' (if undefined, used from currentTagesschluessel)
+:param ringSettings: ring settings, one character per Walze (if undefined, used from currentTagesschluessel)
 :returns: Tagesschluessel object
    """
   if umkehrwalze is None:
@@ -413,6 +563,9 @@ class Tagesschluessel(object):
    walzen = currentTagesschluessel.walzen
   if zusatzwalze is None:
    zusatzwalze = currentTagesschluessel.zusatzwalze
+  if ringSettings is None:
+   ringSettings = currentTagesschluessel.ringSettings
+   assert len(ringSettings) == len(walzen), '{}.changeWalzen: number of walzen changed, ringSettings required'.format(cls.__name__)
   return cls(
    enigma = currentTagesschluessel.enigma,  
    umkehrwalze = umkehrwalze, 
@@ -421,47 +574,32 @@ class Tagesschluessel(object):
    tagesWalzenStellungen = tagesWalzenStellungen, 
    zusatzwalze = zusatzwalze, 
    blank = currentTagesschluessel.blank,  
-   notify = currentTagesschluessel.notify)
-
- def findPatterns(self, substringList : List[str] = [''], encodedSpruchList : List[str] = []) -> Dict[str, Set[str]]:
-  """Find a list of substringList for any tagesWalzenStellungen at any positions
- 
-:param substringList: list of substrings
-:param encodedSpruchList: list of messages to be searched for substrings
-:return: dict(substring, set of tagesWalzenStellungen)
-  """
-  assert len(encodedSpruchList) > 0
-  maxSpruchlength = max(encodedSpruchList, key=len)
-  charSet = set()
-  for substring in substringList:
-   for c in substring:
-    assert c in self.alphabet, '{}: Character {} not in {}'.format(self.__class__.__name__, c, self.enigma.alphabet)
-    charSet.add(c)
-  savedTagesWalzenStellungen = self.tagesWalzenStellungen 
-  patternDict : Dict[str, Set[str]] = dict()
-  for tagesWalzenStellungenTuple in itertools.permutations(self.alphabet, len(savedTagesWalzenStellungen)):
-   self.tagesWalzenStellungen = ''.join(tagesWalzenStellungenTuple)
-   charEncodingDict = dict()
-   for c in charSet:
-    charEncodingDict[c] = self.encode(maxSpruchlength * c)
-   for encodedSpruch in encodedSpruchList:
-    lSpruch = len(encodedSpruch)
-    for substring in substringList:
-     isInSpruch = False
-     ls = lSpruch - len(substring)
-     for n, (c0, cExp) in enumerate(zip(encodedSpruch[:ls], charEncodingDict[substring[0]][:ls])):
-      if c0 == cExp:
-       for m, cm in enumerate(substring[1:]):
-        nm = n + m + 1
-        if cm == charEncodingDict[substring[m]][nm]:
-         if m == len(substring) - 2:
-          isInSpruch = True
-          break
-     if isInSpruch:
-      if substring not in patternDict:
-       patternDict[substring] = list()
-      patternDict[substring].add(self.tagesWalzenStellungen)
-  return patternDict
+   compiled = currentTagesschluessel.compiled, 
+   notify = currentTagesschluessel.notify, 
+   ringSettings = ringSettings)
+
+ def findPatterns(self,
+  substringList : List[str],
+  encodedSpruchList : List[str],
+  tagesWalzenStellungenList : Optional[Sequence[str]] = None,
+  workers : int = 1) -> Dict[str, Set[str]]:
+  """Find a list of substrings for any tagesWalzenStellungen at any positions (see `PatternSearch`),
+  i.e. the substring encoded at a position of a spruch starting at the tagesWalzenStellungen matches the encoded spruch.
+  By default, all tagesWalzenStellungen of `itertools.product` are examined. Previous versions examined `itertools.permutations` only, 
+  i.e. missed the tagesWalzenStellungen with a repeated character (e.g. 'AAB'), so the result may contain additional tagesWalzenStellungen.
+  The substrings and sprueche are required, there are no defaults anymore.
+
+:param substringList: list of substrings (required)
+:param encodedSpruchList: list of messages to be searched for substrings (required)
+:param tagesWalzenStellungenList: tagesWalzenStellungen to be examined (if undefined, all of them)
+:param workers: number of worker processes (1: no process pool, 0: number of CPUs)
+:return: dict(substring, set of tagesWalzenStellungen) of the substrings found
+  """
+  search = MzEnigma.PatternSearch(substringList, encodedSpruchList, self.alphabet)
+  if tagesWalzenStellungenList is None:
+   tagesWalzenStellungenList = [''.join(v) for v in itertools.product(self.alphabet, repeat = len(self.walzen))]
+  matchDict = search.run(self.scrambler(), tagesWalzenStellungenList, workers = workers)
+  return {substring: {tagesWalzenStellungen for tagesWalzenStellungen, _, _ in matches} for substring, matches in matchDict.items()}
 
  def findDoublets(self, first : int = 0, second : int = 3, all : bool = True) -> Union[List[List[str]], List[str]]:
   """Find doublets of any character at fixed positions
@@ -470,25 +608,8 @@ class Tagesschluessel(object):
 :param second: second position (> first)
 :return: IF ALL it returns a list of doublets for every position ELSE it returns a list of doublets
   """
-  assert first >= 0 and second > first
-  allDoubletsList = list()
-  if all:
-   shift = second - first
-  else:
-   shift = 1
-  ecList = list()
-  for nc, c in enumerate(self.alphabet):
-   ecList.append(list())
-   for cs in self.encode((second + shift) * c):
-    ecList[-1].append(cs)
-  for ns in range(shift):
-   doubletsList = list()
-   for n, c in enumerate(self.alphabet):
-    doubletsList.append(ecList[n][first+ns] + ecList[n][second+ns])
-   allDoubletsList.append(doubletsList)
-  if not all:
-   return doubletsList
-  return allDoubletsList
+  scrambler = self.scrambler()
+  return scrambler.doublets(scrambler.toCodes(self.tagesWalzenStellungen), first, second, all)
 
  def findTagesWalzenStellungen(self, rejewskiList : List[Dict[str, Set[str]]], twiceEncodedSpruchWalzenStellungen : Union[List[str], str] = '') -> List[str]:
   if isinstance(twiceEncodedSpruchWalzenStellungen, str):
@@ -517,26 +638,30 @@ class Tagesschluessel(object):
 :param spruchWalzenStellungen: see above
 :returns: encoded spruch
   """
+  if self.compiled:
+   return self._compiledEncode(spruch, spruchWalzenStellungen)
+  emit = MzEnigma.tracing.getTracer('tagesschluessel').emitter(MzEnigma.tracing.DEBUG, self.notify)
   for walze, ringstellung in zip(self.walzen, self.tagesWalzenStellungen):
    walze.ringstellung = ringstellung
-  out = str()
+  outList = list()
   if spruchWalzenStellungen:
    assert len(spruchWalzenStellungen) == len(self.tagesWalzenStellungen), '{}.encode: Walzenstellung, number of characters must match the number of walzen'.format(self.__class__.__name__)
    assert all(v in self.alphabet for v in spruchWalzenStellungen), '{}.encode: Walzenstellung, all characters must be in alphabet'.format(self.__class__.__name__)
    for n in range(2):
     for c in spruchWalzenStellungen:
-     out += self._encodeLetter(c)
+     outList.append(self._encodeLetter(c))
    for walze, ringstellung in zip(self.walzen, spruchWalzenStellungen):
     walze.ringstellung = ringstellung
-   if self.notify is not None:
-    self.notify('{}.encode/spruchWalzenStellungen: {} => {}'.format(self.__class__.__name__, spruchWalzenStellungen, out[:len(spruchWalzenStellungen)]))
+   if emit is not None:
+    emit('spruchWalzenStellungen', '{}.encode/spruchWalzenStellungen: {} => {}', self.__class__.__name__, spruchWalzenStellungen, ''.join(outList[:len(spruchWalzenStellungen)]))
   for c in spruch.upper():
    if c == ' ':
     c = self.blank
    if len(c) == 1:
-    out += self._encodeLetter(c)
-  if self.notify is not None:
-   self.notify('{}.encode: {} => {}'.format(self.__class__.__name__, spruch, out))
+    outList.append(self._encodeLetter(c))
+  out = ''.join(outList)
+  if emit is not None:
+   emit('encode', '{}.encode: {} => {}', self.__class__.__name__, spruch, out)
   for walze, ringstellung in zip(self.walzen, self.tagesWalzenStellungen):
    walze.ringstellung = ringstellung
   return out
@@ -547,12 +672,19 @@ class Tagesschluessel(object):
 :param msgLen: length of messages
 :returns: list of encoded messages
   """
-  ecList = list()
-  for nc, c in enumerate(self.enigma.alphabet):
-   ecList.append(list())
-   for cs in self.encode(msgLen * c):
-    ecList[-1].append(self.enigma.alphabet.index(cs))
-  return ecList
+  return self.permutationTable(msgLen).T.tolist()
+
+ def permutationTable(self, length : int, start : int = 0) -> numpy.ndarray:
+  """Permutations of the scrambler for a range of positions starting at the tagesWalzenStellungen
+  (see `Scrambler.permutationTable`), i.e. 
+  alphabet[table[n][alphabet.index(c)]] == encode((start + length) * c)[start + n]
+
+:param length: number of positions
+:param start: first position
+:returns: uint8 array of shape (length, len(alphabet))
+  """
+  scrambler = self.scrambler()
+  return scrambler.permutationTable(scrambler.toCodes(self.tagesWalzenStellungen), length, start)
 
  def decode(self, encodedSpruch : str, useSpruchWalzenStellungen : bool = False) -> str:
   """Runs backward through the enigma
@@ -565,6 +697,9 @@ class Tagesschluessel(object):
 :param useSpruchWalzenStellungen: see above
 :returns: decoded spruch
   """
+  if self.compiled:
+   return self._compiledDecode(encodedSpruch, useSpruchWalzenStellungen)
+  emit = MzEnigma.tracing.getTracer('tagesschluessel').emitter(MzEnigma.tracing.DEBUG, self.notify)
   for walze, ringstellung in zip(self.walzen, self.tagesWalzenStellungen):
    walze.ringstellung = ringstellung
   if useSpruchWalzenStellungen:
@@ -573,18 +708,79 @@ class Tagesschluessel(object):
    for c in encodedSpruch[:2*ls]:
     spruchWalzenStellungen += self._encodeLetter(c)
    assert spruchWalzenStellungen[:ls] == spruchWalzenStellungen[ls:], '{}.decode: Inconsistent Spruchschlüssel {}'.format(self.__class__.__name__, spruchWalzenStellungen)
-   if self.notify is not None:
-    self.notify('{}.decode/spruchWalzenStellungen: {} => {}'.format(self.__class__.__name__, encodedSpruch[:ls], spruchWalzenStellungen[:ls]))
+   if emit is not None:
+    emit('spruchWalzenStellungen', '{}.decode/spruchWalzenStellungen: {} => {}', self.__class__.__name__, encodedSpruch[:ls], spruchWalzenStellungen[:ls])
    for walze, ringstellung in zip(self.walzen, spruchWalzenStellungen[:ls]):
     walze.ringstellung = ringstellung
    encodedSpruch = encodedSpruch[2*ls:]
-  out = str()
-  for c in encodedSpruch:
-   out += self._encodeLetter(c)
+  out = ''.join([self._encodeLetter(c) for c in encodedSpruch])
   for walze, ringstellung in zip(self.walzen, self.tagesWalzenStellungen):
    walze.ringstellung = ringstellung
   return out
-     
+
+ def scrambler(self) -> MzEnigma.Scrambler:
+  """Returns the compiled scrambler of the Tagesschluessel.
+  The scrambler is compiled again, if a component or its version (see `Umkehrwalze.version`) has been changed since the last call.
+
+:returns: Scrambler object
+  """
+  signature = tuple(None if component is None else component.version for component in [self.steckerbrett, self.zusatzwalze, self.umkehrwalze] + self.walzen)
+  if self._scrambler is None or signature != self._scramblerSignature:
+   self._scrambler = MzEnigma.Scrambler.fromTagesschluessel(self)
+   self._scramblerSignature = signature
+  return self._scrambler
+
+ def walzenStellungenAt(self, n : int, walzenStellungen : Optional[str] = None) -> str:
+  """Walzenstellungen after n letters without stepping through the spruch (see `Scrambler.seek`)
+
+:param n: number of letters (>= 0)
+:param walzenStellungen: Walzenstellungen at the beginning (if undefined, the tagesWalzenStellungen)
+:returns: Walzenstellungen used to encode letter n + 1
+  """
+  if walzenStellungen is None:
+   walzenStellungen = self.tagesWalzenStellungen
+  assert len(walzenStellungen) == len(self.walzen), '{}.walzenStellungenAt: Walzenstellung, number of characters must match the number of walzen'.format(self.__class__.__name__)
+  scrambler = self.scrambler()
+  positions = scrambler.toCodes(walzenStellungen)
+  scrambler.seek(positions, n)
+  return scrambler.fromCodes(positions)
+
+ def _compiledEncode(self, spruch : str, spruchWalzenStellungen : Optional[str] = None) -> str:
+  """Compiled version of `encode`
+  """
+  emit = MzEnigma.tracing.getTracer('tagesschluessel').emitter(MzEnigma.tracing.DEBUG, self.notify)
+  scrambler = self.scrambler()
+  positions = scrambler.toCodes(self.tagesWalzenStellungen)
+  out = str()
+  if spruchWalzenStellungen:
+   assert len(spruchWalzenStellungen) == len(self.tagesWalzenStellungen), '{}.encode: Walzenstellung, number of characters must match the number of walzen'.format(self.__class__.__name__)
+   assert all(v in self.alphabet for v in spruchWalzenStellungen), '{}.encode: Walzenstellung, all characters must be in alphabet'.format(self.__class__.__name__)
+   out += scrambler.fromCodes(scrambler.encodeCodes(scrambler.toCodes(2 * spruchWalzenStellungen), positions))
+   positions = scrambler.toCodes(spruchWalzenStellungen)
+   if emit is not None:
+    emit('spruchWalzenStellungen', '{}.encode/spruchWalzenStellungen: {} => {}', self.__class__.__name__, spruchWalzenStellungen, out[:len(spruchWalzenStellungen)])
+  blank = self.blank if len(self.blank) == 1 else ''
+  out += scrambler.fromCodes(scrambler.encodeCodes(scrambler.toCodes(spruch.upper().replace(' ', blank)), positions))
+  if emit is not None:
+   emit('encode', '{}.encode: {} => {}', self.__class__.__name__, spruch, out)
+  return out
+
+ def _compiledDecode(self, encodedSpruch : str, useSpruchWalzenStellungen : bool = False) -> str:
+  """Compiled version of `decode`
+  """
+  emit = MzEnigma.tracing.getTracer('tagesschluessel').emitter(MzEnigma.tracing.DEBUG, self.notify)
+  scrambler = self.scrambler()
+  positions = scrambler.toCodes(self.tagesWalzenStellungen)
+  if useSpruchWalzenStellungen:
+   ls = len(self.tagesWalzenStellungen)
+   spruchWalzenStellungen = scrambler.fromCodes(scrambler.encodeCodes(scrambler.toCodes(encodedSpruch[:2*ls]), positions))
+   assert spruchWalzenStellungen[:ls] == spruchWalzenStellungen[ls:], '{}.decode: Inconsistent Spruchschlüssel {}'.format(self.__class__.__name__, spruchWalzenStellungen)
+   if emit is not None:
+    emit('spruchWalzenStellungen', '{}.decode/spruchWalzenStellungen: {} => {}', self.__class__.__name__, encodedSpruch[:ls], spruchWalzenStellungen[:ls])
+   positions = scrambler.toCodes(spruchWalzenStellungen[:ls])
+   encodedSpruch = encodedSpruch[2*ls:]
+  return scrambler.fromCodes(scrambler.encodeCodes(scrambler.toCodes(encodedSpruch), positions))
+
  def _encodeLetter(self, c : str) -> str:
   """Encodes a single character and steps the first Walze
   
@@ -652,18 +848,33 @@ class Tagesschluessel(object):
   """
   return self.enigma.alphabet
 
+ @property
+ def ringSettings(self) -> str:
+  """
+  :getter: Returns the ring settings of the walzen
+  :setter: Sets the ring settings of the walzen, one character per Walze
+  """
+  return ''.join(walze.ringSetting for walze in self.walzen)
+
+ @ringSettings.setter
+ def ringSettings(self, ringSettings : str) -> None:
+  assert len(ringSettings) == len(self.walzen), '{}: ring settings, number of characters must match the number of walzen'.format(self.__class__.__name__)
+  for walze, ringSetting in zip(self.walzen, ringSettings):
+   walze.ringSetting = ringSetting
+
  def __eq__(self, tagesschluessel : Tagesschluessel) -> bool:
   return self.enigma == tagesschluessel.enigma \
      and self.tagesWalzenStellungen == tagesschluessel.tagesWalzenStellungen \
      and self.umkehrwalze == tagesschluessel.umkehrwalze \
      and self.walzen == tagesschluessel.walzen \
+     and self.ringSettings == tagesschluessel.ringSettings \
      and self.steckerbrett == tagesschluessel.steckerbrett \
      and self.zusatzwalze == tagesschluessel.zusatzwalze
 
  def __repr__(self) -> str:
   content = 'class: {}\nmodel: {}\nalphabet: {}'.format(self.__class__.__name__, self.enigma.model, self.alphabet)
   for walze, ringstellung in zip(self.walzen, self.tagesWalzenStellungen):
-   content += '\nWalze {}, Stellung: {}, wiring: {}, notches: {}'.format(walze.name, ringstellung, walze.wiring, walze.notches)
+   content += '\nWalze {}, Stellung: {}, Ring: {}, wiring: {}, notches: {}'.format(walze.name, ringstellung, walze.ringSetting, walze.wiring, walze.notches)
   content += '\nUmkehrwalze: {}, wiring: {}'.format(self.umkehrwalze.name, self.umkehrwalze.wiring)
   if self.steckerbrett:
    content += '\nSteckerbrett {}, wiring: {}'.format(self.steckerbrett.name, self.steckerbrett.wiring)
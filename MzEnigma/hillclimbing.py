@@ -0,0 +1,177 @@
+"""
+Incremental scoring of Steckerbrett settings for hill climbing.
+
+For a fixed Tagesschluessel without Steckerbrett, letter *n* of a spruch is
+encoded by a permutation *P[n]*, which does not depend on the Steckerbrett.
+With a Steckerbrett *S*, the decoded letter is *S'(P[n](S(e[n])))*, i.e. a
+change of the wiring for some letters only affects the positions, where the
+encoded letter or the output of *P[n]* is one of these letters, and the n-grams
+overlapping them. A *SteckerbrettState* keeps the permutations, the decoded
+spruch and the n-gram scores and updates only the affected positions on every move.
+"""
+
+from __future__ import annotations
+from typing import Optional
+
+import numpy
+
+import MzEnigma
+
+class SteckerbrettState(object):
+ """Represents the decoded spruch and its n-gram score for a Steckerbrett wiring
+
+:param tagesschluessel: Tagesschluessel with Steckerbrett (required)
+:param encodedSpruch: encoded spruch (required)
+:param spruchScoring: 'SpruchScoring' (required)
+:param numberOfChars: n-gram dictionary to be used (default: longest n-grams)
+:param validChars: n-grams without any of these characters are scored by 0 (default: all)
+  """
+ def __init__(self,
+  tagesschluessel : MzEnigma.Tagesschluessel,
+  encodedSpruch : str,
+  spruchScoring : MzEnigma.SpruchScoring,
+  numberOfChars : int = 0,
+  validChars : Optional[str] = None) -> None:
+  assert tagesschluessel.steckerbrett is not None, '{}: steckerbrett is required'.format(self.__class__.__name__)
+  alphabet = tagesschluessel.alphabet
+  self._alphabet = alphabet
+  self._index = {c: n for n, c in enumerate(alphabet)}
+  # permutations P[n] of the scrambler without steckerbrett
+  scrambler = MzEnigma.Scrambler(alphabet = alphabet, walzen = tagesschluessel.walzen, umkehrwalze = tagesschluessel.umkehrwalze,
+                                              zusatzwalze = tagesschluessel.zusatzwalze)
+  self._encoded = numpy.array(scrambler.toCodes(encodedSpruch), dtype = numpy.intp)
+  self._table = scrambler.permutationTable(scrambler.toCodes(tagesschluessel.tagesWalzenStellungen), len(encodedSpruch)).astype(numpy.intp)
+  self._positions = numpy.arange(len(encodedSpruch), dtype = numpy.intp)
+  # scratch Steckerbrett for the moves, i.e. the Mark 3 settings behave exactly like in a Steckerbrett
+  self._steckerbrett = MzEnigma.Steckerbrett('SteckerbrettState', tagesschluessel.steckerbrett.wiring, alphabet)
+  self._fwd = numpy.array(scrambler.toCodes(self._steckerbrett.wiring), dtype = numpy.intp)
+  self._bwd = numpy.argsort(self._fwd)
+  self._inner = self._table[self._positions, self._fwd[self._encoded]]
+  self._decoded = self._bwd[self._inner]
+  self._spruchScoring = spruchScoring
+  self._numberOfChars = spruchScoring._numberOfChars(numberOfChars, self.__class__.__name__)
+  self._ngramTable = spruchScoring.ngramTable(self._numberOfChars, alphabet)
+  self._nNgrams = len(encodedSpruch) - self._numberOfChars + 1
+  assert self._nNgrams > 0, '{}: at least {} characters required'.format(self.__class__.__name__, self._numberOfChars)
+  self._isValid = None
+  self.validChars = validChars
+
+ @property
+ def alphabet(self) -> str:
+  """
+  :getter: Returns the alphabet
+  :setter: None
+  """
+  return self._alphabet
+
+ @property
+ def validChars(self) -> Optional[str]:
+  """
+  :getter: Returns the characters, at least one of them must be in a scored n-gram (None: all)
+  :setter: Sets the valid characters and scores all n-grams again
+  """
+  return self._validChars
+
+ @validChars.setter
+ def validChars(self, validChars : Optional[str]) -> None:
+  self._validChars = validChars
+  if validChars is None:
+   self._isValid = None
+  else:
+   self._isValid = numpy.zeros(len(self._alphabet), dtype = bool)
+   self._isValid[[self._index[c] for c in validChars if c in self._index]] = True
+  self._ngramScores = self._scoreNgrams(numpy.arange(self._nNgrams, dtype = numpy.intp))
+
+ @property
+ def wiring(self) -> str:
+  """
+  :getter: Returns the wiring of the Steckerbrett
+  :setter: Sets the wiring, only the positions affected by the change are decoded and scored again
+  """
+  return self._steckerbrett.wiring
+
+ @wiring.setter
+ def wiring(self, wiring : str) -> None:
+  if wiring != self._steckerbrett.wiring:
+   self._steckerbrett.wiring = wiring
+  self._update()
+
+ @property
+ def score(self) -> float:
+  """
+  :getter: Returns the n-gram score of the decoded spruch (see `SpruchScoring.ngramScore`)
+  :setter: None
+  """
+  # summed up in order, i.e. exactly like SpruchScoring.ngramScore
+  return sum(self._ngramScores.tolist())/self._nNgrams
+
+ @property
+ def decodedSpruch(self) -> str:
+  """
+  :getter: Returns the decoded spruch
+  :setter: None
+  """
+  alphabet = self._alphabet
+  return ''.join([alphabet[c] for c in self._decoded.tolist()])
+
+ def clearMark3Setting(self, c : str) -> None:
+  """See `Steckerbrett.clearMark3Setting`
+  """
+  self._steckerbrett.clearMark3Setting(c)
+  self._update()
+
+ def addMark3Setting(self, src : str, tgt : str) -> None:
+  """See `Steckerbrett.addMark3Setting`
+  """
+  self._steckerbrett.addMark3Setting(src, tgt)
+  self._update()
+
+ def exchangeMark3Setting(self, c1 : str, c2 : str) -> None:
+  """See `Steckerbrett.exchangeMark3Setting`
+  """
+  self._steckerbrett.exchangeMark3Setting(c1, c2)
+  self._update()
+
+ def _scoreNgrams(self, ngrams : numpy.ndarray) -> numpy.ndarray:
+  """Scores the n-grams starting at the positions *ngrams*
+  """
+  nPos = len(self._alphabet)
+  decoded = self._decoded
+  index = decoded[ngrams]
+  for n in range(1, self._numberOfChars):
+   index = index * nPos + decoded[ngrams + n]
+  scores = self._ngramTable[index]
+  if self._isValid is not None:
+   hasValid = self._isValid[decoded[ngrams]]
+   for n in range(1, self._numberOfChars):
+    hasValid = hasValid | self._isValid[decoded[ngrams + n]]
+   scores = numpy.where(hasValid, scores, 0.0)
+  return scores
+
+ def _update(self) -> None:
+  """Decodes and scores the positions affected by a change of the wiring
+  """
+  fwd = numpy.array([self._index[c] for c in self._steckerbrett.wiring], dtype = numpy.intp)
+  bwd = numpy.argsort(fwd)
+  changedFwd = fwd != self._fwd
+  changedBwd = bwd != self._bwd
+  if not changedFwd.any() and not changedBwd.any():
+   return
+  self._fwd = fwd
+  self._bwd = bwd
+  # positions with a changed input of P[n] or a changed backward wiring of the output of P[n]
+  affected = numpy.flatnonzero(changedFwd[self._encoded] | changedBwd[self._inner])
+  if len(affected) == 0:
+   return
+  self._inner[affected] = self._table[affected, fwd[self._encoded[affected]]]
+  self._decoded[affected] = bwd[self._inner[affected]]
+  # n-grams overlapping the affected positions
+  shift = self._numberOfChars - 1
+  isAffected = numpy.zeros(len(self._encoded) + shift, dtype = bool)
+  for n in range(self._numberOfChars):
+   isAffected[affected + shift - n] = True
+  ngrams = numpy.flatnonzero(isAffected[shift:shift + self._nNgrams])
+  self._ngramScores[ngrams] = self._scoreNgrams(ngrams)
+
+ def __repr__(self) -> str:
+  return 'class: {}\nwiring: {}\nscore: {}\ndecoded: {}'.format(self.__class__.__name__, self.wiring, self.score, self.decodedSpruch)
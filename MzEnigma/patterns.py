@@ -0,0 +1,167 @@
+"""
+Multi-pattern search of unencoded substrings in encoded sprueche.
+
+A substring *p* is found in an encoded spruch *c* at position *n* for a Walzenstellung,
+if every letter of the substring is encoded to the letter of the spruch, i.e. *P[n + m](p[m]) == c[n + m]*
+with the permutations *P* of the scrambler (see `Scrambler.permutationTableBatch`).
+A `PatternSearch` compiles the substrings into a trie once. For a chunk of Walzenstellungen,
+the comparisons *P[i](x) == c[i]* are computed once per letter *x* of the substrings and
+the trie is walked with a boolean array of the starting positions, which is narrowed letter by letter,
+i.e. the substrings sharing a prefix share the work and a branch without any match is dropped at once.
+"""
+
+from __future__ import annotations
+from typing import Optional, Sequence, List, Tuple, Dict, Any
+
+import concurrent.futures
+import math
+import os
+
+import numpy
+
+import MzEnigma
+
+class PatternSearch(object):
+ """Represents compiled substrings and encoded sprueche to be searched for any Walzenstellungen
+
+:param substringList: unencoded substrings (required)
+:param encodedSpruchList: encoded sprueche to be searched (required)
+:param alphabet: alphabet of the substrings and sprueche
+  """
+ def __init__(self,
+  substringList : Sequence[str],
+  encodedSpruchList : Sequence[str],
+  alphabet : str = MzEnigma.stdAlphabet) -> None:
+  assert len(encodedSpruchList) > 0, '{}: at least one encoded spruch required'.format(self.__class__.__name__)
+  index = {c: n for n, c in enumerate(alphabet)}
+  for substring in substringList:
+   assert len(substring) > 0, '{}: empty substring'.format(self.__class__.__name__)
+   for c in substring:
+    assert c in index, '{}: Character {} not in {}'.format(self.__class__.__name__, c, alphabet)
+  for encodedSpruch in encodedSpruchList:
+   for c in encodedSpruch:
+    assert c in index, '{}: Character {} not in {}'.format(self.__class__.__name__, c, alphabet)
+  self._alphabet = alphabet
+  self._substrings = list(dict.fromkeys(substringList))
+  self._encodedSpruchList = list(encodedSpruchList)
+  self._sprueche = [numpy.array([index[c] for c in encodedSpruch], dtype = numpy.uint8) for encodedSpruch in encodedSpruchList]
+  self._length = max(len(encodedSpruch) for encodedSpruch in encodedSpruchList)
+  # trie: node = (children by letter code, substring ending at the node)
+  self._trie : Tuple[Dict[int, Any], Optional[str]] = (dict(), None)
+  for substring in self._substrings:
+   node = self._trie
+   for n, c in enumerate(substring):
+    children = node[0]
+    if index[c] not in children:
+     children[index[c]] = (dict(), substring if n == len(substring) - 1 else None)
+    elif n == len(substring) - 1:
+     children[index[c]] = (children[index[c]][0], substring)
+    node = children[index[c]]
+  self._codes = sorted({index[c] for substring in self._substrings for c in substring})
+
+ @property
+ def alphabet(self) -> str:
+  """
+  :getter: Returns the alphabet
+  :setter: None
+  """
+  return self._alphabet
+
+ @property
+ def substrings(self) -> List[str]:
+  """
+  :getter: Returns the distinct substrings
+  :setter: None
+  """
+  return list(self._substrings)
+
+ @property
+ def encodedSpruchList(self) -> List[str]:
+  """
+  :getter: Returns the encoded sprueche
+  :setter: None
+  """
+  return list(self._encodedSpruchList)
+
+ def run(self,
+  scrambler : MzEnigma.Scrambler,
+  walzenStellungenList : Sequence[str],
+  chunkSize : int = 2048,
+  workers : int = 1) -> Dict[str, List[Tuple[str, int, int]]]:
+  """Searches all substrings in all sprueche for a list of Walzenstellungen.
+  With *workers* > 1, the Walzenstellungen are sharded across a process pool, the result does not depend on the number of workers.
+
+:param scrambler: 'Scrambler' of the Tagesschluessel (required)
+:param walzenStellungenList: Walzenstellungen at the beginning of the sprueche, each a string or a tuple of characters (required)
+:param chunkSize: number of Walzenstellungen examined at once
+:param workers: number of worker processes (1: no process pool, 0: number of CPUs)
+:returns: for each substring found, the Walzenstellungen, index of the spruch and position of each match
+  """
+  assert scrambler.alphabet == self._alphabet, '{}.run: alphabet of the scrambler must match'.format(self.__class__.__name__)
+  assert chunkSize > 0, '{}.run: chunkSize = {} > 0 required'.format(self.__class__.__name__, chunkSize)
+  assert workers >= 0, '{}.run: workers = {} >= 0 required'.format(self.__class__.__name__, workers)
+  if workers == 0:
+   workers = os.cpu_count() or 1
+  walzenStellungenList = [''.join(v) for v in walzenStellungenList]
+  tasks = [(start, min(start + chunkSize, len(walzenStellungenList))) for start in range(0, len(walzenStellungenList), chunkSize)]
+  if workers > 1 and len(tasks) > 1:
+   with concurrent.futures.ProcessPoolExecutor(max_workers = min(workers, len(tasks)), initializer = _initPatternWorker,
+                                                                   initargs = (self, scrambler, walzenStellungenList)) as executor:
+    hitsList = list(executor.map(_patternWorker, tasks, chunksize = max(1, math.ceil(len(tasks) / (4 * workers)))))
+  else:
+   hitsList = [self._hits(scrambler, walzenStellungenList, start, stop) for start, stop in tasks]
+  matchDict : Dict[str, List[Tuple[int, int, int]]] = dict()
+  for hits in hitsList:
+   for stellungID, spruchID, position, substring in hits:
+    matchDict.setdefault(substring, list()).append((stellungID, spruchID, position))
+  # in the order of the substrings, Walzenstellungen, sprueche and positions
+  patternDict : Dict[str, List[Tuple[str, int, int]]] = dict()
+  for substring in self._substrings:
+   if substring in matchDict:
+    patternDict[substring] = [(walzenStellungenList[stellungID], spruchID, position) for stellungID, spruchID, position in sorted(matchDict[substring])]
+  return patternDict
+
+ def _hits(self, scrambler : MzEnigma.Scrambler, walzenStellungenList : Sequence[str], start : int, stop : int) -> List[Tuple[int, int, int, str]]:
+  """Matches of a chunk of Walzenstellungen
+
+:returns: List[Tuple[index of the Walzenstellungen, index of the spruch, position, substring]]
+  """
+  positions = scrambler.walzenStellungenCodes(walzenStellungenList[start:stop])
+  tables = scrambler.permutationTableBatch(positions, self._length)
+  hits = list()
+  for spruchID, codes in enumerate(self._sprueche):
+   length = len(codes)
+   # isEncoded[x][s, i]: letter x is encoded to letter i of the spruch for Walzenstellungen s
+   isEncoded = {x: tables[:, :length, x] == codes for x in self._codes}
+   # depth first walk of the trie, mask[s, n]: the prefix of the node is found at position n
+   pending = [(self._trie, numpy.ones((len(positions), length + 1), dtype = bool), 0)]
+   while pending:
+    (children, _), mask, depth = pending.pop()
+    for x, child in children.items():
+     childMask = mask[:, :length - depth] & isEncoded[x][:, depth:]
+     if not childMask.any():
+      continue
+     if child[1] is not None:
+      for s, n in zip(*numpy.nonzero(childMask)):
+       hits.append((start + int(s), spruchID, int(n), child[1]))
+     if child[0]:
+      pending.append((child, childMask, depth + 1))
+  return hits
+
+ def __repr__(self) -> str:
+  return 'class: {}\nalphabet: {}\nsubstrings: {}\nsprueche: {}'.format(self.__class__.__name__, self._alphabet, self._substrings, len(self._sprueche))
+
+_patternWorkerContext : Dict[str, Any] = dict()
+
+def _initPatternWorker(search : PatternSearch, scrambler : MzEnigma.Scrambler, walzenStellungenList : List[str]) -> None:
+ _patternWorkerContext.clear()
+ _patternWorkerContext.update({'search': search, 'scrambler': scrambler, 'walzenStellungenList': walzenStellungenList})
+
+def _patternWorker(task : Tuple[int, int]) -> List[Tuple[int, int, int, str]]:
+ """Matches a chunk of Walzenstellungen in a worker process (see `PatternSearch.run`)
+
+:param task: start and stop of the chunk
+:returns: matches of the chunk
+ """
+ context = _patternWorkerContext
+ return context['search']._hits(context['scrambler'], context['walzenStellungenList'], task[0], task[1])
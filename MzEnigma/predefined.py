@@ -0,0 +1,249 @@
+"""
+Registry of the predefined components and engines.
+
+.. _json: https://docs.python.org/3/library/json.html
+
+Building all Walzen, Umkehrwalzen, Steckerbretter and Enigma engines at import
+time is expensive for short running processes (e.g. workers), which usually
+need a single engine. The registry holds factories only, a component is built
+on first access and shared afterwards, e.g.
+
+.. code-block:: python
+
+  enigma = MzEnigma.machines['Enigma_M3'] # builds I .. VIII, UKW_A .. UKW_C and MARK_3 only
+
+The module level names (e.g. MzEnigma.Enigma_M3) are resolved by the registry as well.
+
+The components and engines are defined by plain data (see *Resources/machines.json*),
+i.e. new engines are added without code and definitions are cheap to ship to
+other processes. A definition file (`json`_ or its pickled binary variant) holds
+
+.. code-block:: python
+
+  {
+   "format": "MzEnigma machines",
+   "version": 1,
+   "machines": {
+    "I": {"type": "Walze", "name": "I", "wiring": "EKMFLGDQVZNTOWYHXUSPAIBRCJ", "notches": "Q"},
+    "UKW_B": {"type": "Umkehrwalze", "name": "UKW-B", "wiring": "YRUHQSLDPXNGOKMIEBFZCWVJAT"},
+    "Beta": {"type": "Zusatzwalze", "name": "Beta", "wiring": "LEYJVCNIXWPBQMDRTAKZGFUHOS"},
+    "MARK_3": {"type": "Steckerbrett", "random": "Mark_3", "nConnections": 10},
+    "Enigma_M4": {"type": "Enigma", "model": "Enigma M4", "walzen": ["I", ...], "umkehrwalzen": ["UKW_B", ...],
+                  "numberOfWalzen": 4, "steckerbrett": "MARK_3", "zusatzwalzen": ["Beta", ...]}
+   }
+  }
+
+The optional keys are *alphabet* (default: stdAlphabet) and *ringstellung* of the components, *ringSetting* of a Walze,
+*wiring* of a Steckerbrett (default: unconnected) and *steckerbrett* and *zusatzwalzen* of the engines.
+"""
+
+from __future__ import annotations
+from typing import Optional, Callable, Dict, List, Iterator, Any
+
+import collections.abc
+import json
+import os
+import pickle
+
+import MzEnigma
+
+class MachineRegistry(collections.abc.Mapping):
+ """Represents a lazily populated mapping of names to components and engines.
+ The factories get the registry itself to resolve the components they depend on.
+ """
+ def __init__(self) -> None:
+  self._factories : Dict[str, Callable[[MachineRegistry], Any]] = dict()
+  self._definitions : Dict[str, Dict[str, Any]] = dict()
+  self._objects : Dict[str, Any] = dict()
+
+ def register(self, name : str, factory : Callable[[MachineRegistry], Any], replace : bool = False) -> None:
+  """Registers a factory
+
+:param name: name of the component or engine (e.g. 'Enigma_M3')
+:param factory: function building the object from the registry
+:param replace: replace a factory already registered
+  """
+  assert name, '{}.register: name required'.format(self.__class__.__name__)
+  assert replace or name not in self._factories, '{}.register: {} already registered'.format(self.__class__.__name__, name)
+  self._factories[name] = factory
+  self._definitions.pop(name, None)
+  self._objects.pop(name, None)
+
+ def registerDefinitions(self, definitions : Dict[str, Dict[str, Any]], replace : bool = False) -> None:
+  """Registers components and engines defined by plain data (see `loadDefinitions`)
+
+:param definitions: definitions of the components and engines by name
+:param replace: replace factories already registered
+  """
+  for name, definition in definitions.items():
+   self.register(name, createFactory(definition), replace)
+   self._definitions[name] = definition
+
+ def definitions(self, names : Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+  """Collects the definitions of components and engines including all components they depend on,
+  e.g. to rebuild a single engine in a worker process by `createRegistry`
+
+:param names: names of the components and engines (default: all)
+:returns: definitions by name
+  """
+  if names is None:
+   names = list(self._definitions.keys())
+  definitions : Dict[str, Dict[str, Any]] = dict()
+  pending = list(names)
+  while pending:
+   name = pending.pop()
+   if name in definitions:
+    continue
+   assert name in self._definitions, '{}.definitions: {} is not defined by plain data'.format(self.__class__.__name__, name)
+   definition = self._definitions[name]
+   definitions[name] = definition
+   if definition['type'] == 'Enigma':
+    pending.extend(definition['walzen'])
+    pending.extend(definition['umkehrwalzen'])
+    pending.extend(definition.get('zusatzwalzen') or list())
+    if definition.get('steckerbrett'):
+     pending.append(definition['steckerbrett'])
+  return definitions
+
+ def isBuilt(self, name : str) -> bool:
+  """
+:param name: name of the component or engine
+:returns: indicator, if the object has been built already
+  """
+  return name in self._objects
+
+ def __getitem__(self, name : str) -> Any:
+  if name not in self._objects:
+   self._objects[name] = self._factories[name](self)
+  return self._objects[name]
+
+ def __iter__(self) -> Iterator[str]:
+  return iter(self._factories)
+
+ def __len__(self) -> int:
+  return len(self._factories)
+
+ def __repr__(self) -> str:
+  return 'class: {}\nregistered: {}\nbuilt: {}'.format(self.__class__.__name__, len(self._factories), len(self._objects))
+
+
+FORMAT : str = 'MzEnigma machines'
+VERSION : int = 1
+
+def createFactory(definition : Dict[str, Any]) -> Callable[[MachineRegistry], Any]:
+ """Creates the factory of a component or engine defined by plain data
+
+:param definition: definition of a component or engine (see `predefined`)
+:returns: function building the object from a registry
+ """
+ kind = definition.get('type')
+ alphabet = definition.get('alphabet', MzEnigma.stdAlphabet)
+ if kind == 'Walze':
+  return lambda machines: MzEnigma.Walze(name = definition['name'], wiring = definition['wiring'],
+                                                            ringstellung = definition.get('ringstellung'), notches = definition['notches'], alphabet = alphabet,
+                                                            ringSetting = definition.get('ringSetting'))
+ elif kind == 'Zusatzwalze':
+  return lambda machines: MzEnigma.Zusatzwalze(name = definition['name'], wiring = definition['wiring'],
+                                                                   ringstellung = definition.get('ringstellung'), alphabet = alphabet)
+ elif kind == 'Umkehrwalze':
+  return lambda machines: MzEnigma.Umkehrwalze(name = definition['name'], wiring = definition['wiring'], alphabet = alphabet)
+ elif kind == 'Steckerbrett':
+  if 'random' in definition:
+   assert definition['random'] in ['Mark_1', 'Mark_2', 'Mark_3'], "createFactory: random Steckerbrett {} not supported, use 'Mark_1', 'Mark_2' or 'Mark_3'".format(definition['random'])
+   if definition['random'] == 'Mark_3':
+    return lambda machines: MzEnigma.Steckerbrett.Mark_3(nConnections = definition.get('nConnections', 10), alphabet = alphabet)
+   return lambda machines: getattr(MzEnigma.Steckerbrett, definition['random'])(alphabet = alphabet)
+  return lambda machines: MzEnigma.Steckerbrett(definition['name'], definition.get('wiring', alphabet), alphabet)
+ elif kind == 'Enigma':
+  def factory(machines : MachineRegistry) -> MzEnigma.Enigma:
+   steckerbrett = definition.get('steckerbrett')
+   zusatzwalzen = definition.get('zusatzwalzen')
+   return MzEnigma.Enigma(model = definition['model'],
+                                     walzen = [machines[v] for v in definition['walzen']],
+                                     umkehrwalzen = [machines[v] for v in definition['umkehrwalzen']],
+                                     steckerbrett = machines[steckerbrett] if steckerbrett else None,
+                                     zusatzwalzen = [machines[v] for v in zusatzwalzen] if zusatzwalzen else None,
+                                     numberOfWalzen = definition['numberOfWalzen'])
+  return factory
+ assert False, "createFactory: type {} not supported, use 'Walze', 'Zusatzwalze', 'Umkehrwalze', 'Steckerbrett' or 'Enigma'".format(kind)
+
+def createDefinitions(objects : Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+ """Creates the plain definitions of components and engines (see `createFactory`), 
+ e.g. to rebuild them in a worker process by `createRegistry` instead of pickling the objects.
+ The components of an engine are defined as well, named by the engine and their position, e.g. 'Enigma_I/walzen/0'
+
+:param objects: components and engines by name
+:returns: definitions by name
+ """
+ definitions : Dict[str, Dict[str, Any]] = dict()
+ for name, obj in objects.items():
+  if isinstance(obj, MzEnigma.Enigma):
+   definition : Dict[str, Any] = {'type': 'Enigma', 'model': obj.model, 'numberOfWalzen': obj.numberOfWalzen}
+   for kind in ['walzen', 'umkehrwalzen', 'zusatzwalzen']:
+    components = getattr(obj, kind) or list()
+    definition[kind] = ['{}/{}/{}'.format(name, kind, n) for n in range(len(components))]
+    definitions.update(createDefinitions(dict(zip(definition[kind], components))))
+   definition['steckerbrett'] = None
+   if obj.steckerbrett is not None:
+    definition['steckerbrett'] = '{}/steckerbrett'.format(name)
+    definitions.update(createDefinitions({definition['steckerbrett']: obj.steckerbrett}))
+  elif isinstance(obj, MzEnigma.Walze):
+   definition = {'type': 'Walze', 'name': obj.name, 'wiring': obj.wiring, 'notches': obj.notches, 
+                      'ringstellung': obj.ringstellung, 'ringSetting': obj.ringSetting, 'alphabet': obj.alphabet}
+  elif isinstance(obj, MzEnigma.Zusatzwalze):
+   definition = {'type': 'Zusatzwalze', 'name': obj.name, 'wiring': obj.wiring, 'ringstellung': obj.ringstellung, 'alphabet': obj.alphabet}
+  elif isinstance(obj, MzEnigma.Steckerbrett):
+   definition = {'type': 'Steckerbrett', 'name': obj.name, 'wiring': obj.wiring, 'alphabet': obj.alphabet}
+  elif isinstance(obj, MzEnigma.Umkehrwalze):
+   definition = {'type': 'Umkehrwalze', 'name': obj.name, 'wiring': obj.wiring, 'alphabet': obj.alphabet}
+  else:
+   assert False, 'createDefinitions: {} is not a component or engine'.format(name)
+  definitions[name] = definition
+ return definitions
+
+def loadDefinitions(definitionFile : str) -> Dict[str, Dict[str, Any]]:
+ """Loads definitions of components and engines.
+ Files with the extension *.json* are json files, any other file is a binary (pickled) definition file
+
+:param definitionFile: definition file (required)
+:returns: definitions by name
+ """
+ definitionFile = os.path.normpath(definitionFile)
+ assert os.path.isfile(definitionFile), 'loadDefinitions: definition file {} is not or not a file'.format(definitionFile)
+ if os.path.splitext(definitionFile)[1].lower() == '.json':
+  with open(definitionFile, encoding = 'utf-8') as f:
+   content = json.load(f)
+ else:
+  with open(definitionFile, 'rb') as f:
+   content = pickle.load(f)
+ assert isinstance(content, dict) and content.get('format') == FORMAT, 'loadDefinitions: {} is not a definition file'.format(definitionFile)
+ assert content.get('version', 0) <= VERSION, 'loadDefinitions: version {} of {} not supported'.format(content.get('version'), definitionFile)
+ return content['machines']
+
+def saveDefinitions(definitions : Dict[str, Dict[str, Any]], definitionFile : str) -> None:
+ """Saves definitions of components and engines (e.g. from `MachineRegistry.definitions`).
+ Files with the extension *.json* are json files, any other file is a binary (pickled) definition file
+
+:param definitions: definitions by name
+:param definitionFile: definition file (required)
+ """
+ definitionFile = os.path.normpath(definitionFile)
+ content = {'format': FORMAT, 'version': VERSION, 'machines': definitions}
+ if os.path.splitext(definitionFile)[1].lower() == '.json':
+  with open(definitionFile, 'w', encoding = 'utf-8') as f:
+   json.dump(content, f, ensure_ascii = False, indent = 1)
+ else:
+  with open(definitionFile, 'wb') as f:
+   pickle.dump(content, f, protocol = pickle.HIGHEST_PROTOCOL)
+
+def createRegistry(definitions : Optional[Dict[str, Dict[str, Any]]] = None) -> MachineRegistry:
+ """Creates a registry of components and engines
+
+:param definitions: definitions by name (default: the predefined components and engines of *Resources/machines.json*)
+:returns: MachineRegistry object
+ """
+ if definitions is None:
+  definitions = loadDefinitions(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Resources', 'machines.json'))
+ machines = MachineRegistry()
+ machines.registerDefinitions(definitions)
+ return machines
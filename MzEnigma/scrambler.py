@@ -0,0 +1,655 @@
+"""
+Compiled, integer coded representation of a Tagesschluessel.
+
+The components in `component` are linked objects working on characters,
+i.e. every letter walks recursively through the chain of components and
+searches the alphabet several times. A *Scrambler* compiles the
+components of a Tagesschluessel once into integer wiring tables
+(the ring offsets are already included) and encodes in a flat loop.
+
+The encryption is identical to the encryption of the linked components.
+For brute force attacks, `Scrambler.encodeBatch` encrypts a spruch for many
+Walzenstellungen at once using `numpy`_ gather operations.
+
+.. _numpy: https://numpy.org/
+"""
+
+from __future__ import annotations
+from typing import Optional, Iterable, List, Tuple, Union, Sequence, Callable
+
+import copy
+import functools
+
+import numpy
+
+import MzEnigma
+
+# default of the arguments of `CompactTagesschluessel.rebind` to be kept, None is a valid value
+_KEEP : object = object()
+
+@functools.lru_cache(maxsize = 256)
+def _offsetTables(alphabet : str, wiring : str) -> Tuple[List[List[int]], List[List[int]]]:
+ """Wiring tables of a wiring for every ringstellung (see `Scrambler._offsetTables`), 
+ the tables of the recently used wirings are cached (e.g. the Walzen of a brute force attack)
+ """
+ nPos = len(alphabet)
+ index = {c: n for n, c in enumerate(alphabet)}
+ fwd = [index[c] for c in wiring]
+ bwd = nPos * [0]
+ for n, m in enumerate(fwd):
+  bwd[m] = n
+ fwdTable = list()
+ bwdTable = list()
+ for state in range(nPos):
+  fwdTable.append([fwd[(x + state) % nPos] for x in range(nPos)])
+  bwdTable.append([(bwd[x] - state) % nPos for x in range(nPos)])
+ return fwdTable, bwdTable
+
+class Scrambler(object):
+ """Represents the compiled scrambler of a Tagesschluessel.
+    The Walzenstellungen are not part of the scrambler, they are handed over
+    as list of integer codes (position in the alphabet) to the encoding methods.
+
+:param alphabet: unencoded alphabet to be used (required)
+:param walzen: List of type 'Walze', the first Walze is stepped at each letter (required)
+:param umkehrwalze: 'Umkehrwalze' (if undefined, the encryption is forward only)
+:param steckerbrett: 'Steckerbrett' or its wiring (if any)
+:param zusatzwalze: 'Zusatzwalze' (if any)
+:param ringSettings: ring settings, one character per Walze (if undefined, the ring settings of the walzen, see `Walze.ringSetting`)
+  """
+ def __init__(self,
+  alphabet : str = MzEnigma.stdAlphabet,
+  walzen : Optional[List[MzEnigma.Walze]] = None,
+  umkehrwalze : Optional[MzEnigma.Umkehrwalze] = None,
+  steckerbrett : Optional[Union[MzEnigma.Steckerbrett, str]] = None,
+  zusatzwalze : Optional[MzEnigma.Zusatzwalze] = None,
+  ringSettings : Optional[str] = None) -> None:
+  assert alphabet, '{}: At least 1 character in alphabet required'.format(self.__class__.__name__)
+  assert walzen, '{}: At least 1 walze required'.format(self.__class__.__name__)
+  if ringSettings is None:
+   ringSettings = ''.join(walze.ringSetting for walze in walzen)
+  assert len(ringSettings) == len(walzen) and all(c in alphabet for c in ringSettings), '{}: ring settings {} must match the walzen and the alphabet'.format(self.__class__.__name__, ringSettings)
+  self._alphabet = alphabet
+  self._numberOfPositions = len(alphabet)
+  self._index = {c: n for n, c in enumerate(alphabet)}
+  identity = list(range(self._numberOfPositions))
+  if isinstance(steckerbrett, str):
+   self._steckerFwd, self._steckerBwd = self._wiringCodes(steckerbrett)
+  elif steckerbrett is not None:
+   assert steckerbrett.alphabet == alphabet, '{}: Alphabet in steckerbrett must match'.format(self.__class__.__name__)
+   self._steckerFwd, self._steckerBwd = self._wiringCodes(steckerbrett.wiring)
+  else:
+   self._steckerFwd, self._steckerBwd = identity, identity
+  self._walzenFwd : List[List[List[int]]] = list()
+  self._walzenBwd : List[List[List[int]]] = list()
+  self._notches : List[frozenset] = list()
+  for walze, ringSetting in zip(walzen, ringSettings):
+   assert walze.alphabet == alphabet, '{}: Alphabet in all walzen must match'.format(self.__class__.__name__)
+   fwd, bwd = self._offsetTables(walze)
+   # the tables are indexed by the Walzenstellung, the wiring is shifted by the Walzenstellung relative to the ring setting
+   ring = self._index[ringSetting]
+   self._walzenFwd.append(fwd[-ring:] + fwd[:-ring] if ring else fwd)
+   self._walzenBwd.append(bwd[-ring:] + bwd[:-ring] if ring else bwd)
+   self._notches.append(frozenset(self._index[c] for c in walze.notches))
+  if zusatzwalze is not None:
+   assert zusatzwalze.alphabet == alphabet, '{}: Alphabet in zusatzwalze must match'.format(self.__class__.__name__)
+   fwd, bwd = self._offsetTables(zusatzwalze)
+   state = self._index[zusatzwalze.ringstellung]
+   self._zusatzFwd : Optional[List[int]] = fwd[state]
+   self._zusatzBwd : Optional[List[int]] = bwd[state]
+  else:
+   self._zusatzFwd, self._zusatzBwd = None, None
+  if umkehrwalze is not None:
+   assert umkehrwalze.alphabet == alphabet, '{}: Alphabet in umkehrwalze must match'.format(self.__class__.__name__)
+   self._umkehrFwd : Optional[List[int]] = self._wiringCodes(umkehrwalze.wiring)[0]
+  else:
+   self._umkehrFwd = None
+  self._arrays : Optional[Tuple] = None
+
+ @classmethod
+ def fromTagesschluessel(cls, tagesschluessel : MzEnigma.Tagesschluessel) -> Scrambler:
+  """Compiles the components of a Tagesschluessel
+
+:param tagesschluessel: Tagesschluessel to be compiled (required)
+:returns: Scrambler object
+  """
+  return cls(
+   alphabet = tagesschluessel.alphabet,
+   walzen = tagesschluessel.walzen,
+   umkehrwalze = tagesschluessel.umkehrwalze,
+   steckerbrett = tagesschluessel.steckerbrett,
+   zusatzwalze = tagesschluessel.zusatzwalze,
+   ringSettings = tagesschluessel.ringSettings)
+
+ def _wiringCodes(self, wiring : str) -> Tuple[List[int], List[int]]:
+  assert len(wiring) == self._numberOfPositions and all(c in self._index for c in wiring), '{}: wiring {} does not match the alphabet'.format(self.__class__.__name__, wiring)
+  fwd = [self._index[c] for c in wiring]
+  bwd = self._numberOfPositions * [0]
+  for n, m in enumerate(fwd):
+   bwd[m] = n
+  return fwd, bwd
+
+ def _offsetTables(self, component : MzEnigma.Component) -> Tuple[List[List[int]], List[List[int]]]:
+  """Creates the wiring tables for every ringstellung (see `Umkehrwalze.encode`).
+  The tables are never modified, i.e. they are shared by all scramblers using the same wiring
+  """
+  assert len(component.wiring) == self._numberOfPositions and all(c in self._index for c in component.wiring), '{}: wiring {} does not match the alphabet'.format(self.__class__.__name__, component.wiring)
+  return _offsetTables(self._alphabet, component.wiring)
+
+ @property
+ def alphabet(self) -> str:
+  """
+  :getter: Returns the alphabet of the scrambler
+  :setter: None
+  """
+  return self._alphabet
+
+ @property
+ def numberOfWalzen(self) -> int:
+  """
+  :getter: Returns the number of Walzen
+  :setter: None
+  """
+  return len(self._walzenFwd)
+
+ def toCodes(self, spruch : str) -> List[int]:
+  """Converts a spruch to integer codes
+
+:param spruch: characters of the alphabet
+:returns: list of integer codes
+  """
+  assert all(c in self._index for c in spruch), '{}.toCodes: characters of {} not in alphabet'.format(self.__class__.__name__, spruch)
+  return [self._index[c] for c in spruch]
+
+ def fromCodes(self, codes : Iterable[int]) -> str:
+  """Converts integer codes to a spruch
+
+:param codes: integer codes
+:returns: spruch
+  """
+  alphabet = self._alphabet
+  return ''.join([alphabet[x] for x in codes])
+
+ def _stepWalze(self, positions : List[int], n : int) -> None:
+  """Steps Walze *n* and all following Walzen with a notch (see `Walze.step`)
+  """
+  nWalzen = len(positions)
+  nPos = self._numberOfPositions
+  while n < nWalzen:
+   notchFound = positions[n] in self._notches[n]
+   positions[n] = (positions[n] + 1) % nPos
+   if not notchFound:
+    break
+   n += 1
+
+ def doublets(self, positions : List[int], first : int = 0, second : int = 3, all : bool = True) -> Union[List[List[str]], List[str]]:
+  """Doublets of any character at fixed positions (see `Tagesschluessel.findDoublets`)
+
+:param positions: integer codes of the Walzenstellungen at the beginning
+:param first: first position
+:param second: second position (> first)
+:param all: doublets for all positions (first + n, second + n) with n < second - first
+:returns: IF ALL a list of doublets for every position ELSE a list of doublets
+  """
+  assert first >= 0 and second > first
+  alphabet = self._alphabet
+  shift = second - first if all else 1
+  table = self.permutationTable(list(positions), second + shift).tolist()
+  allDoubletsList = list()
+  for ns in range(shift):
+   allDoubletsList.append([alphabet[c1] + alphabet[c2] for c1, c2 in zip(table[first+ns], table[second+ns])])
+  if not all:
+   return allDoubletsList[0]
+  return allDoubletsList
+
+ def seek(self, positions : List[int], n : int) -> None:
+  """Sets the Walzenstellungen to the state after *n* letters without stepping through them.
+  Each Walze steps the following Walze once per notch passed, 
+  i.e. the number of steps of all Walzen is derived from the notches in closed form.
+
+:param positions: integer codes of the Walzenstellungen, updated in place
+:param n: number of letters (>= 0)
+  """
+  assert len(positions) == len(self._notches), '{}.seek: number of positions must match the number of walzen'.format(self.__class__.__name__)
+  assert n >= 0, '{}.seek: n == {} < 0'.format(self.__class__.__name__, n)
+  nPos = self._numberOfPositions
+  for w, notches in enumerate(self._notches):
+   if n == 0:
+    break
+   position = positions[w]
+   nCycles, nRest = divmod(n, nPos)
+   positions[w] = (position + n) % nPos
+   n = nCycles * len(notches) + sum(1 for notch in notches if (notch - position) % nPos < nRest)
+
+ def _innerPermutation(self, positions : List[int]) -> List[int]:
+  """Permutation of all components behind the first Walze,
+  i.e. the first Walze and the Steckerbrett excluded
+  """
+  innerList = list()
+  walzenFwd = [table[state] for table, state in zip(self._walzenFwd[1:], positions[1:])]
+  walzenBwd = [table[state] for table, state in zip(self._walzenBwd[1:], positions[1:])]
+  walzenBwd.reverse()
+  for x in range(self._numberOfPositions):
+   for fwd in walzenFwd:
+    x = fwd[x]
+   if self._zusatzFwd is not None:
+    x = self._zusatzFwd[x]
+   if self._umkehrFwd is not None:
+    x = self._umkehrFwd[x]
+    if self._zusatzBwd is not None:
+     x = self._zusatzBwd[x]
+    for bwd in walzenBwd:
+     x = bwd[x]
+   innerList.append(x)
+  return innerList
+
+ def encodeCodes(self, codes : Iterable[int], positions : List[int]) -> List[int]:
+  """Encodes integer codes, the first Walze is stepped before every letter
+
+:param codes: integer codes to be encoded
+:param positions: integer codes of the Walzenstellungen, updated in place
+:returns: encoded integer codes
+  """
+  assert len(positions) == len(self._walzenFwd), '{}.encodeCodes: number of positions must match the number of walzen'.format(self.__class__.__name__)
+  nPos = self._numberOfPositions
+  fwd0 = self._walzenFwd[0]
+  bwd0 = self._walzenBwd[0]
+  notches0 = self._notches[0]
+  steckerFwd = self._steckerFwd
+  steckerBwd = self._steckerBwd
+  reflected = self._umkehrFwd is not None
+  inner = self._innerPermutation(positions)
+  p0 = positions[0]
+  out = list()
+  append = out.append
+  for x in codes:
+   if p0 in notches0 and len(positions) > 1:
+    self._stepWalze(positions, 1)
+    inner = self._innerPermutation(positions)
+   p0 = (p0 + 1) % nPos
+   x = inner[fwd0[p0][steckerFwd[x]]]
+   if reflected:
+    x = steckerBwd[bwd0[p0][x]]
+   append(x)
+  positions[0] = p0
+  return out
+
+ def encode(self, spruch : str, walzenStellungen : str) -> str:
+  """Encodes a spruch starting at the walzenStellungen
+
+:param spruch: characters of the alphabet
+:param walzenStellungen: Walzenstellungen, one character per Walze
+:returns: encoded spruch
+  """
+  positions = self.toCodes(walzenStellungen)
+  return self.fromCodes(self.encodeCodes(self.toCodes(spruch), positions))
+
+ def permutationTable(self, positions : List[int], length : int, start : int = 0) -> numpy.ndarray:
+  """Permutations of the scrambler for a range of positions in a spruch, created in a single stepping pass.
+  Row *n* holds the encoded codes of all letters at position *start + n*, 
+  i.e. table[n][x] == encodeCodes(len * [x], positions)[start + n]
+
+:param positions: integer codes of the Walzenstellungen at the beginning of the spruch, updated in place
+:param length: number of positions
+:param start: first position
+:returns: uint8 array of shape (length, len(alphabet))
+  """
+  assert len(positions) == len(self._walzenFwd), '{}.permutationTable: number of positions must match the number of walzen'.format(self.__class__.__name__)
+  assert start >= 0 and length >= 0, '{}.permutationTable: start = {} >= 0 and length = {} >= 0 required'.format(self.__class__.__name__, start, length)
+  nPos = self._numberOfPositions
+  self.seek(positions, start)
+  fwd0 = self._walzenFwd[0]
+  bwd0 = self._walzenBwd[0]
+  notches0 = self._notches[0]
+  steckerFwd = self._steckerFwd
+  steckerBwd = self._steckerBwd
+  reflected = self._umkehrFwd is not None
+  inner = self._innerPermutation(positions)
+  p0 = positions[0]
+  table = list()
+  for _ in range(length):
+   if p0 in notches0 and len(positions) > 1:
+    self._stepWalze(positions, 1)
+    inner = self._innerPermutation(positions)
+   p0 = (p0 + 1) % nPos
+   fwd = fwd0[p0]
+   if reflected:
+    bwd = bwd0[p0]
+    table.append([steckerBwd[bwd[inner[fwd[x]]]] for x in steckerFwd])
+   else:
+    table.append([inner[fwd[x]] for x in steckerFwd])
+  positions[0] = p0
+  return numpy.array(table, dtype = numpy.uint8).reshape(length, nPos)
+
+ def _numpyArrays(self) -> Tuple:
+  """Wiring and notch tables as numpy arrays (created on first use)
+  """
+  if self._arrays is None:
+   nPos = self._numberOfPositions
+   walzenFwd = [numpy.array(table, dtype = numpy.intp) for table in self._walzenFwd]
+   walzenBwd = [numpy.array(table, dtype = numpy.intp) for table in self._walzenBwd]
+   notches = list()
+   for notchSet in self._notches:
+    isNotch = numpy.zeros(nPos, dtype = bool)
+    isNotch[list(notchSet)] = True
+    notches.append(isNotch)
+   perm = lambda codes: None if codes is None else numpy.array(codes, dtype = numpy.intp)
+   self._arrays = (walzenFwd, walzenBwd, notches, perm(self._steckerFwd), perm(self._steckerBwd),
+                          perm(self._zusatzFwd), perm(self._zusatzBwd), perm(self._umkehrFwd))
+  return self._arrays
+
+ def walzenStellungenCodes(self, walzenStellungenList : Sequence[Union[str, Sequence[str]]]) -> numpy.ndarray:
+  """Converts Walzenstellungen to an integer array
+
+:param walzenStellungenList: list of Walzenstellungen, each a string or a tuple of characters
+:returns: array of shape (len(walzenStellungenList), numberOfWalzen)
+  """
+  positions = numpy.array([[self._index[c] for c in walzenStellungen] for walzenStellungen in walzenStellungenList], dtype = numpy.intp)
+  assert positions.ndim == 2 and positions.shape[1] == len(self._walzenFwd), '{}.walzenStellungenCodes: number of characters must match the number of walzen'.format(self.__class__.__name__)
+  return positions
+
+ def stepBatch(self, positions : numpy.ndarray, length : int) -> numpy.ndarray:
+  """Walzenstellungen of many starting positions for all letters of a spruch
+
+:param positions: integer array of shape (nPositions, numberOfWalzen), the starting positions
+:param length: number of letters
+:returns: integer array of shape (length, nPositions, numberOfWalzen) with the Walzenstellungen used for every letter
+  """
+  nPos = self._numberOfPositions
+  notches = self._numpyArrays()[2]
+  positions = numpy.array(positions, dtype = numpy.intp)
+  nWalzen = positions.shape[1]
+  positionsList = numpy.empty((length, ) + positions.shape, dtype = numpy.intp)
+  for n in range(length):
+   carry = None
+   for w in range(nWalzen):
+    if carry is None:
+     notchFound = notches[w][positions[:, w]]
+     positions[:, w] += 1
+    else:
+     notchFound = notches[w][positions[:, w]] & carry
+     positions[:, w] += carry
+    positions[:, w] %= nPos
+    carry = notchFound
+    if not carry.any():
+     break
+   positionsList[n] = positions
+  return positionsList
+
+ def encodeBatch(self, codes : Union[Sequence[int], numpy.ndarray], positions : numpy.ndarray, rings : Optional[numpy.ndarray] = None) -> numpy.ndarray:
+  """Encodes (or decodes) a single spruch for many starting Walzenstellungen at once.
+  The Walzenstellungen are stepped exactly like `encodeCodes` does.
+
+:param codes: integer codes of the spruch (see `toCodes`)
+:param positions: integer array of shape (nPositions, numberOfWalzen), the starting positions (see `walzenStellungenCodes`)
+:param rings: integer array of shape (nPositions, numberOfWalzen), ring settings added to the ring settings of the scrambler (if any)
+:returns: uint8 array of shape (nPositions, len(codes)), each row is the encoded spruch
+  """
+  return self.encodeSegmentBatch(codes, positions, rings)[0]
+
+ def encodeSegmentBatch(self, codes : Union[Sequence[int], numpy.ndarray], positions : numpy.ndarray, rings : Optional[numpy.ndarray] = None) -> Tuple[numpy.ndarray, numpy.ndarray]:
+  """Encodes (or decodes) a segment of a spruch for many Walzenstellungen at once (see `encodeBatch`),
+  i.e. a long spruch is encoded segment by segment starting with the Walzenstellungen returned for the previous segment.
+
+:param codes: integer codes of the segment (see `toCodes`)
+:param positions: integer array of shape (nPositions, numberOfWalzen), the Walzenstellungen before the first letter of the segment
+:param rings: integer array of shape (nPositions, numberOfWalzen), ring settings added to the ring settings of the scrambler (if any),
+  i.e. the Walzen are stepped by the Walzenstellungen and the wiring is shifted by the Walzenstellungen relative to the rings
+:returns: uint8 array of shape (nPositions, len(codes)) and the Walzenstellungen after the last letter of the segment
+  """
+  walzenFwd = self._numpyArrays()[0]
+  codes = numpy.asarray(codes, dtype = numpy.intp)
+  positions = numpy.asarray(positions, dtype = numpy.intp)
+  assert positions.ndim == 2 and positions.shape[1] == len(walzenFwd), '{}.encodeBatch: positions of shape (nPositions, {}) required'.format(self.__class__.__name__, len(walzenFwd))
+  nPositions = positions.shape[0]
+  if len(codes) == 0:
+   return numpy.empty((nPositions, 0), dtype = numpy.uint8), positions.copy()
+  # Walzenstellungen for each (letter, position)
+  stepped = self.stepBatch(positions, len(codes))
+  states = stepped if rings is None else (stepped - numpy.asarray(rings, dtype = numpy.intp)) % self._numberOfPositions
+  encoded = self._scrambleBatch(numpy.broadcast_to(codes, (nPositions, len(codes))), states.transpose(1, 0, 2)).astype(numpy.uint8)
+  return encoded, stepped[-1]
+
+ def permutationTableBatch(self, positions : numpy.ndarray, length : int) -> numpy.ndarray:
+  """Permutations of the scrambler (see `permutationTable`) for many starting Walzenstellungen at once
+
+:param positions: integer array of shape (nPositions, numberOfWalzen), the starting positions (see `walzenStellungenCodes`)
+:param length: number of letters
+:returns: uint8 array of shape (nPositions, length, len(alphabet)), i.e. table[s] == permutationTable(positions[s], length)
+  """
+  nPos = self._numberOfPositions
+  positions = numpy.asarray(positions, dtype = numpy.intp)
+  assert positions.ndim == 2 and positions.shape[1] == len(self._walzenFwd), '{}.permutationTableBatch: positions of shape (nPositions, {}) required'.format(self.__class__.__name__, len(self._walzenFwd))
+  stepped = self.stepBatch(positions, length).transpose(1, 0, 2)[:, :, numpy.newaxis, :]
+  codes = numpy.broadcast_to(numpy.arange(nPos, dtype = numpy.intp), (positions.shape[0], length, nPos))
+  return self._scrambleBatch(codes, stepped).astype(numpy.uint8)
+
+ def _scrambleBatch(self, x : numpy.ndarray, stepped : numpy.ndarray) -> numpy.ndarray:
+  """Encodes integer codes with the Walzenstellungen *stepped*, the last axis of *stepped* are the walzen
+  and the other axes are broadcasted against *x*
+  """
+  walzenFwd, walzenBwd, _, steckerFwd, steckerBwd, zusatzFwd, zusatzBwd, umkehrFwd = self._numpyArrays()
+  x = steckerFwd[x]
+  for w, table in enumerate(walzenFwd):
+   x = table[stepped[..., w], x]
+  if zusatzFwd is not None:
+   x = zusatzFwd[x]
+  if umkehrFwd is not None:
+   x = umkehrFwd[x]
+   if zusatzBwd is not None:
+    x = zusatzBwd[x]
+   for w in range(len(walzenBwd) - 1, -1, -1):
+    x = walzenBwd[w][stepped[..., w], x]
+   x = steckerBwd[x]
+  return x
+
+ def __repr__(self) -> str:
+  return 'class: {}\nalphabet: {}\nnumber of Walzen: {}\nreflected: {}'.format(
+              self.__class__.__name__, self._alphabet, len(self._walzenFwd), self._umkehrFwd is not None)
+
+class CompactTagesschluessel(object):
+ """Lightweight Tagesschluessel for brute force attacks. 
+    The components are not copied, they are shared with the enigma and compiled only once (see `Scrambler`). 
+    Umkehrwalze, Walzen, Zusatzwalze, tagesWalzenStellungen and Steckerbrett wiring are rebound in place, 
+    a full `Tagesschluessel` is created only for results to be kept (see `toTagesschluessel`).
+
+:param enigma: model of the Enigma (required)
+:param umkehrwalze: 'Umkehrwalze' (if any)
+:param walzen: List of type 'Walze' (required)
+:param tagesWalzenStellungen: Tageswalzenstellungen (required)
+:param steckerbrettWiring: wiring of the Steckerbrett (if any)
+:param zusatzwalze: 'Zusatzwalze' (if any)
+:param blank: replacement character for a blank
+:param ringSettings: ring settings, one character per Walze (if undefined, the ring settings of the walzen)
+  """
+ __slots__ = ('enigma', 'umkehrwalze', 'walzen', 'tagesWalzenStellungen', 'steckerbrettWiring', 'zusatzwalze', 'blank', 'ringSettings', '_scrambler')
+
+ def __init__(self,
+  enigma : MzEnigma.Enigma,
+  umkehrwalze : Optional[MzEnigma.Umkehrwalze] = None,
+  walzen : Sequence[MzEnigma.Walze] = (),
+  tagesWalzenStellungen : str = '',
+  steckerbrettWiring : Optional[str] = None,
+  zusatzwalze : Optional[MzEnigma.Zusatzwalze] = None,
+  blank : str = '',
+  ringSettings : Optional[str] = None) -> None:
+  assert enigma, '{}: Enigma required'.format(self.__class__.__name__)
+  assert len(tagesWalzenStellungen) == len(walzen), '{}: Walzenstellung, number of characters must match the number of walzen'.format(self.__class__.__name__)
+  assert ringSettings is None or len(ringSettings) == len(walzen), '{}: ring settings, number of characters must match the number of walzen'.format(self.__class__.__name__)
+  self.enigma = enigma
+  self.umkehrwalze = umkehrwalze
+  self.walzen = tuple(walzen)
+  self.tagesWalzenStellungen = tagesWalzenStellungen
+  self.steckerbrettWiring = steckerbrettWiring
+  self.zusatzwalze = zusatzwalze
+  self.blank = blank
+  self.ringSettings = ringSettings
+  self._scrambler : Optional[Scrambler] = None
+
+ @classmethod
+ def fromTagesschluessel(cls, tagesschluessel : MzEnigma.Tagesschluessel) -> CompactTagesschluessel:
+  """Creates a CompactTagesschluessel from a Tagesschluessel
+
+:param tagesschluessel: Tagesschluessel (required)
+:returns: CompactTagesschluessel object
+  """
+  return cls(
+   enigma = tagesschluessel.enigma,
+   umkehrwalze = tagesschluessel.umkehrwalze,
+   walzen = tagesschluessel.walzen,
+   tagesWalzenStellungen = tagesschluessel.tagesWalzenStellungen,
+   steckerbrettWiring = None if tagesschluessel.steckerbrett is None else tagesschluessel.steckerbrett.wiring,
+   zusatzwalze = tagesschluessel.zusatzwalze,
+   blank = tagesschluessel.blank,
+   ringSettings = tagesschluessel.ringSettings)
+
+ def rebind(self,
+  umkehrwalze : Optional[MzEnigma.Umkehrwalze] = _KEEP,
+  walzen : Sequence[MzEnigma.Walze] = _KEEP,
+  tagesWalzenStellungen : str = _KEEP,
+  steckerbrettWiring : Optional[str] = _KEEP,
+  zusatzwalze : Optional[MzEnigma.Zusatzwalze] = _KEEP,
+  ringSettings : Optional[str] = _KEEP) -> CompactTagesschluessel:
+  """Changes certain elements in place, elements not passed are kept,
+  i.e. None removes the umkehrwalze, the Steckerbrett, the zusatzwalze or the ring settings (see `CompactTagesschluessel`).
+  The scrambler is compiled again only if a component has been changed.
+
+:returns: self
+  """
+  if umkehrwalze is not _KEEP and umkehrwalze is not self.umkehrwalze:
+   self.umkehrwalze = umkehrwalze
+   self._scrambler = None
+  if walzen is not _KEEP:
+   walzen = tuple(walzen)
+   if len(walzen) != len(self.walzen) or any(w1 is not w2 for w1, w2 in zip(walzen, self.walzen)):
+    self.walzen = walzen
+    self._scrambler = None
+  if zusatzwalze is not _KEEP and zusatzwalze is not self.zusatzwalze:
+   self.zusatzwalze = zusatzwalze
+   self._scrambler = None
+  if steckerbrettWiring is not _KEEP and steckerbrettWiring != self.steckerbrettWiring:
+   self.steckerbrettWiring = steckerbrettWiring
+   self._scrambler = None
+  if ringSettings is not _KEEP and ringSettings != self.ringSettings:
+   self.ringSettings = ringSettings
+   self._scrambler = None
+  if tagesWalzenStellungen is not _KEEP:
+   self.tagesWalzenStellungen = tagesWalzenStellungen
+  assert self.ringSettings is None or len(self.ringSettings) == len(self.walzen), '{}.rebind: ring settings, number of characters must match the number of walzen'.format(self.__class__.__name__)
+  assert len(self.tagesWalzenStellungen) == len(self.walzen), '{}.rebind: Walzenstellung, number of characters must match the number of walzen'.format(self.__class__.__name__)
+  return self
+
+ def copy(self) -> CompactTagesschluessel:
+  """Shallow copy, the compiled scrambler is shared
+
+:returns: CompactTagesschluessel object
+  """
+  other = CompactTagesschluessel.__new__(CompactTagesschluessel)
+  for name in CompactTagesschluessel.__slots__:
+   setattr(other, name, getattr(self, name))
+  return other
+
+ def scrambler(self) -> Scrambler:
+  """
+:returns: the compiled scrambler of the components
+  """
+  if self._scrambler is None:
+   self._scrambler = Scrambler(
+    alphabet = self.enigma.alphabet,
+    walzen = self.walzen,
+    umkehrwalze = self.umkehrwalze,
+    steckerbrett = self.steckerbrettWiring,
+    zusatzwalze = self.zusatzwalze,
+    ringSettings = self.ringSettings)
+  return self._scrambler
+
+ def positions(self) -> List[int]:
+  """
+:returns: integer codes of the tagesWalzenStellungen
+  """
+  return self.scrambler().toCodes(self.tagesWalzenStellungen)
+
+ def encode(self, spruch : str) -> str:
+  """Encodes a spruch using the tagesWalzenStellungen
+
+:param spruch: message to be encoded
+:returns: encoded spruch
+  """
+  blank = self.blank if len(self.blank) == 1 else ''
+  return self.scrambler().encode(spruch.upper().replace(' ', blank), self.tagesWalzenStellungen)
+
+ def decode(self, encodedSpruch : str) -> str:
+  """Decodes a spruch using the tagesWalzenStellungen
+
+:param encodedSpruch: message to be decoded
+:returns: decoded spruch
+  """
+  return self.scrambler().encode(encodedSpruch, self.tagesWalzenStellungen)
+
+ def permutationTable(self, length : int, start : int = 0) -> numpy.ndarray:
+  """See `Tagesschluessel.permutationTable`
+  """
+  return self.scrambler().permutationTable(self.positions(), length, start)
+
+ def findDoublets(self, first : int = 0, second : int = 3, all : bool = True) -> Union[List[List[str]], List[str]]:
+  """See `Tagesschluessel.findDoublets`
+  """
+  return self.scrambler().doublets(self.positions(), first, second, all)
+
+ def toTagesschluessel(self, 
+  steckerbrett : Optional[MzEnigma.Steckerbrett] = None, 
+  compiled : bool = False, 
+  notify : Optional[Callable[[str], None]] = None) -> MzEnigma.Tagesschluessel:
+  """Creates a full Tagesschluessel
+
+:param steckerbrett: 'Steckerbrett' to be used (if undefined, created from the steckerbrettWiring)
+:param compiled: see `Tagesschluessel`
+:param notify: notification function (e.g. print)
+:returns: Tagesschluessel object
+  """
+  if steckerbrett is not None:
+   assert self.steckerbrettWiring is None or steckerbrett.wiring == self.steckerbrettWiring, '{}.toTagesschluessel: steckerbrett wiring does not match'.format(self.__class__.__name__)
+  elif self.enigma.steckerbrett is not None:
+   # without a wiring the Steckerbrett of the enigma is kept unplugged
+   steckerbrett = copy.deepcopy(self.enigma.steckerbrett)
+   steckerbrett.wiring = self.enigma.alphabet if self.steckerbrettWiring is None else self.steckerbrettWiring
+  elif self.steckerbrettWiring is None:
+   steckerbrett = None
+  else:
+   steckerbrett = MzEnigma.Steckerbrett('Steckerbrett', self.steckerbrettWiring, self.enigma.alphabet)
+  tagesschluessel = MzEnigma.Tagesschluessel(
+   enigma = self.enigma,
+   umkehrwalze = self.umkehrwalze,
+   walzen = list(self.walzen),
+   tagesWalzenStellungen = self.tagesWalzenStellungen,
+   steckerbrett = steckerbrett,
+   zusatzwalze = self.zusatzwalze,
+   blank = self.blank,
+   compiled = compiled,
+   notify = notify,
+   ringSettings = self.ringSettings)
+  if steckerbrett is not None:
+   steckerbrett.notify = notify
+  return tagesschluessel
+
+ def __eq__(self, other : CompactTagesschluessel) -> bool:
+  return self.enigma is other.enigma \
+     and self.umkehrwalze is other.umkehrwalze \
+     and self.walzen == other.walzen \
+     and self.tagesWalzenStellungen == other.tagesWalzenStellungen \
+     and self.steckerbrettWiring == other.steckerbrettWiring \
+     and self.zusatzwalze is other.zusatzwalze \
+     and self.ringSettings == other.ringSettings
+
+ def __repr__(self) -> str:
+  content = 'class: {}\nmodel: {}\nWalzen: {}, Stellungen: {}'.format(
+   self.__class__.__name__, self.enigma.model, [walze.name for walze in self.walzen], self.tagesWalzenStellungen)
+  if self.umkehrwalze is not None:
+   content += '\nUmkehrwalze: {}'.format(self.umkehrwalze.name)
+  if self.steckerbrettWiring is not None:
+   content += '\nSteckerbrett wiring: {}'.format(self.steckerbrettWiring)
+  if self.zusatzwalze is not None:
+   content += '\nZusatzwalze: {}'.format(self.zusatzwalze.name)
+  if self.ringSettings is not None:
+   content += '\nRing settings: {}'.format(self.ringSettings)
+  return content
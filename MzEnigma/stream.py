@@ -0,0 +1,158 @@
+"""
+Streaming encryption of long sprueche.
+
+`Tagesschluessel.encode` and `Tagesschluessel.decode` reset the Walzen
+at the end of each call, i.e. a spruch cannot be split across calls.
+An *EnigmaStream* keeps the Walzenstellungen between chunks, so
+archives of intercepts can be pushed through the compiled scrambler
+(see `Scrambler`) chunk by chunk with constant memory.
+As the encryption is symmetric, the same stream decodes as well.
+"""
+
+from __future__ import annotations
+from typing import Optional, Union, Iterable, Iterator, IO
+
+import codecs
+
+import MzEnigma
+
+class _CodeTable(dict):
+ """Translation table for str.translate, characters not in the table are mapped to *invalid*
+ """
+ def __init__(self, invalid : str) -> None:
+  super(_CodeTable, self).__init__()
+  self.invalid = invalid
+
+ def __missing__(self, key : int) -> str:
+  return self.invalid
+
+class EnigmaStream(object):
+ """Represents a stateful encryption of a stream of chunks
+
+:param tagesschluessel: 'Tagesschluessel' or 'CompactTagesschluessel' (required)
+:param walzenStellungen: Walzenstellungen at the beginning (if undefined, the tagesWalzenStellungen)
+:param skipInvalid: skip characters not in the alphabet (e.g. line feeds) instead of raising an error
+  """
+ def __init__(self,
+  tagesschluessel : Union[MzEnigma.Tagesschluessel, MzEnigma.CompactTagesschluessel],
+  walzenStellungen : Optional[str] = None,
+  skipInvalid : bool = False) -> None:
+  assert tagesschluessel is not None, '{}: Tagesschluessel required'.format(self.__class__.__name__)
+  self._scrambler = tagesschluessel.scrambler()
+  self._alphabet = tagesschluessel.alphabet if isinstance(tagesschluessel, MzEnigma.Tagesschluessel) else tagesschluessel.enigma.alphabet
+  if walzenStellungen is None:
+   walzenStellungen = tagesschluessel.tagesWalzenStellungen
+  assert len(walzenStellungen) == self._scrambler.numberOfWalzen, '{}: Walzenstellung, number of characters must match the number of walzen'.format(self.__class__.__name__)
+  self._startWalzenStellungen = walzenStellungen
+  self._positions = self._scrambler.toCodes(walzenStellungen)
+  self.skipInvalid = skipInvalid
+  # characters are mapped to the codes by str.translate, a blank is replaced like in Tagesschluessel.encode
+  self._invalid = chr(len(self._alphabet))
+  self._codeTable = _CodeTable(self._invalid)
+  self._codeTable.update({ord(c): chr(n) for n, c in enumerate(self._alphabet)})
+  blank = tagesschluessel.blank
+  if len(blank) == 1 and blank in self._alphabet:
+   self._codeTable[ord(' ')] = chr(self._alphabet.index(blank))
+  else:
+   self._codeTable[ord(' ')] = None
+  self._numberOfLetters = 0
+
+ @property
+ def walzenStellungen(self) -> str:
+  """
+  :getter: Returns the current Walzenstellungen
+  :setter: None
+  """
+  return self._scrambler.fromCodes(self._positions)
+
+ @property
+ def numberOfLetters(self) -> int:
+  """
+  :getter: Returns the number of letters encoded since the last reset
+  :setter: None
+  """
+  return self._numberOfLetters
+
+ def reset(self, walzenStellungen : Optional[str] = None) -> None:
+  """Resets the Walzenstellungen
+
+:param walzenStellungen: Walzenstellungen (if undefined, the Walzenstellungen at the beginning)
+  """
+  if walzenStellungen is None:
+   walzenStellungen = self._startWalzenStellungen
+  assert len(walzenStellungen) == self._scrambler.numberOfWalzen, '{}.reset: Walzenstellung, number of characters must match the number of walzen'.format(self.__class__.__name__)
+  self._positions = self._scrambler.toCodes(walzenStellungen)
+  self._numberOfLetters = 0
+
+ def encodeChunk(self, chunk : str) -> str:
+  """Encodes (or decodes) a chunk, the Walzenstellungen are kept for the next chunk
+
+:param chunk: part of the spruch
+:returns: encoded chunk
+  """
+  codes = chunk.upper().translate(self._codeTable)
+  if self._invalid in codes:
+   assert self.skipInvalid, '{}.encodeChunk: characters of {} not in alphabet'.format(self.__class__.__name__, chunk)
+   codes = codes.replace(self._invalid, '')
+  self._numberOfLetters += len(codes)
+  return self._scrambler.fromCodes(self._scrambler.encodeCodes([ord(c) for c in codes], self._positions))
+
+ def encodeChunks(self, chunks : Iterable[str]) -> Iterator[str]:
+  """Encodes (or decodes) an iterable of chunks
+
+:param chunks: parts of the spruch
+:returns: iterator of encoded chunks
+  """
+  for chunk in chunks:
+   yield self.encodeChunk(chunk)
+
+ def encodeFileChunks(self,
+  src : IO,
+  chunkSize : int = 1 << 16,
+  encoding : str = 'utf-8') -> Iterator[str]:
+  """Encodes (or decodes) a text or binary file chunk by chunk, nothing is read until the iterator is consumed
+
+:param src: file object opened for reading
+:param chunkSize: number of characters (bytes) to be read at once
+:param encoding: encoding of a binary file
+:returns: iterator of encoded chunks
+  """
+  assert chunkSize > 0, '{}.encodeFileChunks: chunkSize = {} > 0 required'.format(self.__class__.__name__, chunkSize)
+  decoder = None
+  while True:
+   data = src.read(chunkSize)
+   if isinstance(data, bytes):
+    if decoder is None:
+     decoder = codecs.getincrementaldecoder(encoding)()
+    chunk = decoder.decode(data, final = not data)
+   else:
+    chunk = data
+   encodedChunk = self.encodeChunk(chunk) if chunk else ''
+   if encodedChunk:
+    yield encodedChunk
+   if not data:
+    break
+
+ def encodeFile(self,
+  src : IO,
+  dst : IO,
+  chunkSize : int = 1 << 16,
+  encoding : str = 'utf-8') -> int:
+  """Encodes (or decodes) a text or binary file chunk by chunk into a text file (see `encodeFileChunks`)
+
+:param src: file object opened for reading
+:param dst: text file object, the encoded chunks are written to (required)
+:param chunkSize: number of characters (bytes) to be read at once
+:param encoding: encoding of a binary file
+:returns: number of encoded characters written
+  """
+  assert dst is not None, '{}.encodeFile: dst required'.format(self.__class__.__name__)
+  numberOfChars = 0
+  for encodedChunk in self.encodeFileChunks(src, chunkSize, encoding):
+   dst.write(encodedChunk)
+   numberOfChars += len(encodedChunk)
+  return numberOfChars
+
+ def __repr__(self) -> str:
+  return 'class: {}\nalphabet: {}\nWalzenstellungen: {}\nnumber of letters: {}'.format(
+              self.__class__.__name__, self._alphabet, self.walzenStellungen, self._numberOfLetters)
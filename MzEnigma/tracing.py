@@ -0,0 +1,177 @@
+"""
+Structured tracing of the Enigma operation and analysis.
+
+Every subsystem (e.g. *component*, *tagesschluessel*, *analysis*) owns a
+`Tracer` with a level, a sampling rate and a list of sinks.
+The hot paths never format messages or check levels themselves: they ask
+their tracer once for an *emitter* before the loop and call it only if
+it is not None, i.e. a disabled tracer costs a single local test.
+Objects keeping an emitter (e.g. the components) subscribe to their tracer and
+are called to resolve it again whenever the tracer changes, i.e. `configure` takes effect at runtime
+without any test on the hot paths. The sinks of a tracer are a tuple, i.e. they are changed by assignment only.
+
+.. csv-table:: Levels
+   :header: "Level", "Events"
+   :widths: 15, 45
+
+   *INFO*, progress of analysis methods (e.g. Walzen examined) and results
+   *DEBUG*, candidates (e.g. Walzenstellungen) and encoded sprueche
+   *TRACE*, single letters and steps of the components
+
+The `notify` functions of the objects are sinks receiving the formatted message,
+any other sink receives the `TraceEvent` itself, e.g.
+
+.. code-block:: python
+
+  MzEnigma.tracing.configure(levels = {'analysis': MzEnigma.tracing.INFO}, sinks = {'analysis': [events.append]})
+"""
+
+from __future__ import annotations
+from typing import Optional, Callable, Dict, List, Tuple
+
+import weakref
+
+OFF : int = 0
+INFO : int = 1
+DEBUG : int = 2
+TRACE : int = 3
+
+class TraceEvent(object):
+ """Represents a single event, the message is formatted on demand
+
+:param subsystem: name of the subsystem
+:param kind: type of the event (e.g. 'encode', 'candidate')
+:param level: level of the event
+:param template: format string of the message
+:param args: arguments of the format string
+ """
+ __slots__ = ('subsystem', 'kind', 'level', 'template', 'args')
+
+ def __init__(self, subsystem : str, kind : str, level : int, template : str, args : Tuple) -> None:
+  self.subsystem = subsystem
+  self.kind = kind
+  self.level = level
+  self.template = template
+  self.args = args
+
+ @property
+ def message(self) -> str:
+  """
+  :getter: Returns the formatted message
+  :setter: None
+  """
+  return self.template.format(*self.args)
+
+ def __str__(self) -> str:
+  return self.message
+
+ def __repr__(self) -> str:
+  return 'class: {}\nsubsystem: {}\nkind: {}\nlevel: {}\nmessage: {}'.format(
+              self.__class__.__name__, self.subsystem, self.kind, self.level, self.message)
+
+class Tracer(object):
+ """Represents the tracing of a subsystem
+
+:param subsystem: name of the subsystem
+:param level: maximum level of the events to be emitted
+:param sampling: only every *sampling*-th event of a kind above INFO is emitted
+ """
+ def __init__(self, subsystem : str, level : int = TRACE, sampling : int = 1) -> None:
+  assert subsystem, '{}: subsystem required'.format(self.__class__.__name__)
+  self.subsystem = subsystem
+  self.level = level
+  self.sampling = sampling
+  self.sinks : Tuple[Callable[[TraceEvent], None], ...] = tuple()
+  # by id, the components are not hashable
+  self._subscribers : weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+ def __setattr__(self, name : str, value : object) -> None:
+  if name == 'sinks':
+   value = tuple(value)
+  object.__setattr__(self, name, value)
+  if '_subscribers' in vars(self):
+   for subscriber in list(self._subscribers.values()):
+    subscriber.resolveEmitter(self)
+
+ def subscribe(self, subscriber : object) -> None:
+  """Subscribes an object keeping an emitter, its method resolveEmitter(tracer) is called at once
+  and again whenever the tracer changes. The subscriber is referenced weakly.
+
+:param subscriber: object with a method resolveEmitter
+  """
+  self._subscribers[id(subscriber)] = subscriber
+  subscriber.resolveEmitter(self)
+
+ def isEnabled(self, level : int) -> bool:
+  """
+:param level: level of an event
+:returns: indicator, if events of this level pass the tracer level
+  """
+  return level <= self.level
+
+ def emitter(self, level : int, notify : Optional[Callable[[str], None]] = None) -> Optional[Callable[..., None]]:
+  """Creates an emitter for events of a level.
+  The emitter is resolved once (e.g. at the beginning of a method) and called as
+  emit(kind, template, \\*args), the message is formatted only for a notify function.
+
+:param level: level of the events
+:param notify: notification function of the calling object (e.g. print), if any
+:returns: emitter or None, if the level is disabled or there is no sink at all
+  """
+  if level > self.level or level <= OFF:
+   return None
+  sinks = list(self.sinks)
+  if notify is not None:
+   sinks.append(lambda event: notify(event.message))
+  if not sinks:
+   return None
+  subsystem = self.subsystem
+  sampling = self.sampling if level > INFO else 1
+  counter : Dict[str, int] = dict()
+
+  def emit(kind : str, template : str, *args) -> None:
+   if sampling > 1:
+    n = counter.get(kind, 0)
+    counter[kind] = n + 1
+    if n % sampling:
+     return
+   event = TraceEvent(subsystem, kind, level, template, args)
+   for sink in sinks:
+    sink(event)
+  return emit
+
+ def __repr__(self) -> str:
+  return 'class: {}\nsubsystem: {}\nlevel: {}\nsampling: {}\nsinks: {}'.format(
+              self.__class__.__name__, self.subsystem, self.level, self.sampling, len(self.sinks))
+
+_tracers : Dict[str, Tracer] = dict()
+
+def getTracer(subsystem : str) -> Tracer:
+ """Returns the tracer of a subsystem, created on first use
+
+:param subsystem: name of the subsystem (e.g. 'component', 'tagesschluessel', 'analysis')
+:returns: Tracer object
+ """
+ if subsystem not in _tracers:
+  _tracers[subsystem] = Tracer(subsystem)
+ return _tracers[subsystem]
+
+def configure(
+ levels : Optional[Dict[str, int]] = None,
+ sampling : Optional[Dict[str, int]] = None,
+ sinks : Optional[Dict[str, List[Callable[[TraceEvent], None]]]] = None) -> None:
+ """Configures the tracers of several subsystems.
+ The emitters kept by the subscribers (e.g. components) are resolved again at once (see `Tracer.subscribe`),
+ emitters resolved by a running method are not affected.
+
+:param levels: level per subsystem
+:param sampling: sampling rate per subsystem
+:param sinks: sinks per subsystem, replacing the current sinks
+ """
+ for subsystem, level in (levels or dict()).items():
+  getTracer(subsystem).level = level
+ for subsystem, rate in (sampling or dict()).items():
+  assert rate > 0, 'configure: sampling rate {} of {} > 0 required'.format(rate, subsystem)
+  getTracer(subsystem).sampling = rate
+ for subsystem, sinkList in (sinks or dict()).items():
+  getTracer(subsystem).sinks = tuple(sinkList)
@@ -17,12 +17,6 @@ with open(os.path.join(packageDirectory,'readme.rst'), 'r', encoding = 'utf-8')
 import MzEnigma
 pkgVersion = MzEnigma.__version__
 
-pythonVersion = sys.version_info[0] + 0.1 * sys.version_info[1]
-if pythonVersion < 3.9:
- networkx = 'networkx>=2.2'
-else:
- networkx = 'networkx>=2.5'
-
 # Required to ensure a clean environment
 shutil.rmtree(os.path.join(fileDirectory, 'build'), ignore_errors = True)
 
@@ -33,13 +27,13 @@ setup(name = package,
   version = pkgVersion,
   packages = [package],
   options={'bdist_wheel':{'universal':True}},
-  package_data = {package: ['*.txt', '*.gpl3', '*.rst', 'Resources/*.txt'] }, 
+  package_data = {package: ['*.txt', '*.gpl3', '*.rst', 'Resources/*.txt', 'Resources/*.json'] }, 
   description = 'A Simulator for Enigma operation and analysis',
   long_description = long_description, 
   long_description_content_type="text/x-rst",
   author  ='Reinhard Maerz',
   python_requires = '>=3.7', 
-  install_requires = [ networkx ],
+  install_requires = [ 'numpy' ],
   setup_requires=['wheel'], 
   classifiers = [
     'Programming Language :: Python', 
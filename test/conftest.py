@@ -3,6 +3,7 @@ import platform
 if platform.system() == 'Windows':
  import winreg
 import os, os.path
+import re
 import pytest
 
 # e.g. 
@@ -24,6 +25,16 @@ def pytest_addoption(parser):
 def notify(pytestconfig): 
  return [None, print][pytestconfig.getoption('notify')]
 
+@pytest.helpers.register
+def machines(pattern, cls = object): 
+ """Predefined components and engines of type *cls* with a name matching the regular expression *pattern*,
+ at least one of them is required, i.e. a mistyped pattern fails instead of testing nothing
+ """
+ import MzEnigma
+ matched = [(name, machine) for name, machine in MzEnigma.machines.items() if isinstance(machine, cls) and re.fullmatch(pattern, name)]
+ assert matched, 'No predefined component or enigma matches {}'.format(pattern)
+ return matched
+
 @pytest.helpers.register
 def message(pytestconfig): 
  rawMsg = pytestconfig.getoption('message')
@@ -2,11 +2,16 @@
 from typing import Optional, Callable, Dict, List, Tuple, Set
 import pytest
 
+import copy
 import itertools
 import os, os.path
+import pickle
 import re
 import random
 import string
+
+import numpy
+
 import MzEnigma
 
 defaultMsg = 'DIEENIGMAISTEINEROTORSCHLUESSELMASCHINEDIEIMZWEITENWELTKRIEGZURVERSCHLUESSELUNGDESNACHRICHTENVERKEHRSDERWEHRMACHTVERWENDETWURDEXAUCHPOLIZEIGEHEIMDIENSTEDIPLOMATISCHEDIENSTESDSSREICHSPOSTUNDREICHSBAHNSETZTENSIEZURGEHEIMENKOMMUNIKATIONEINXTROTZMANNIGFALTIGERVORUNDWAEHRENDDESKRIEGESEINGEFUEHRTERVERBESSERUNGENDERVERSCHLUESSELUNGSQUALITAETGELANGESDENALLIIERTENMITHOHEMPERSONELLENUNDMASCHINELLENAUFWANDDIEDEUTSCHENFUNKSPRUECHENAHEZUKONTINUIERLICHZUENTZIFFERNX'
@@ -97,11 +102,121 @@ def test_turingAttack(pytestconfig):
  pattern = pytestconfig.getoption('component')
  if pattern:
   print('\n--- test_turingAttack ---\n')
-  for name, enigma in vars(MzEnigma).items():
-   if isinstance(enigma, MzEnigma.Enigma) and re.fullmatch(pattern, name) and enigma.steckerbrett is not None:
+  for name, enigma in pytest.helpers.machines(pattern, MzEnigma.Enigma):
+   if enigma.steckerbrett is not None:
     runTuringAttack(enigma, name, msg, crib, 
                            notify = pytest.helpers.notify(pytestconfig))
   
+def describeStops(validCandidates : List[Tuple[MzEnigma.Tagesschluessel, List[Tuple[str, List[Dict[str, str]]]]]]) -> List[Tuple[Tuple[str, ...], List[Tuple[str, List[List[Tuple[str, str]]]]]]]:
+ return [(tuple(walze.name for walze in tagesschluessel.walzen), [(tws, sorted(sorted(wiring.items()) for wiring in wirings)) for tws, wirings in tws2wiringList if wirings]) 
+              for tagesschluessel, tws2wiringList in validCandidates]
+
+def test_bombe(pytestconfig, tmp_path):
+ print('\n--- test_bombe ---')
+ rnd = random.Random(22)
+ enigma = MzEnigma.Enigma_I
+ enigmaSetting = MzEnigma.Tagesschluessel(enigma, 
+                                                            umkehrwalze = MzEnigma.UKW_B, 
+                                                            walzen = [MzEnigma.I, MzEnigma.II, MzEnigma.III], 
+                                                            tagesWalzenStellungen = 'KDO', 
+                                                            steckerbrett = MzEnigma.Steckerbrett('Mark 3', 'ARDCEFTIHXPSVQOKNBLGUMYJWZ'), 
+                                                            notify = None)
+ eMsg = enigmaSetting.encode(defaultMsg[:60])
+ assert eMsg == 'MAFCFBMAOVTZXBTZUKAXYPFXJKUZMZEIGCVUGWLSZNVFSPMDRVDCNEFIKBRP', 'Encoding failed: {}'.format(eMsg)
+ tagesWalzenStellungenList = [''.join(rnd.choice(enigma.alphabet) for _ in range(3)) for _ in range(30)] + ['KDO']
+ sRange = MzEnigma.TagesschluesselRange(enigma, 
+  walzenList = [[MzEnigma.I, MzEnigma.II, MzEnigma.III], [MzEnigma.II, MzEnigma.I, MzEnigma.III]], 
+  tagesWalzenStellungenList = tagesWalzenStellungenList, 
+  umkehrwalzenList = [MzEnigma.UKW_B], 
+  zusatzwalzenList = [], 
+  spruchScoring = None, 
+  notify = None) 
+ crib = defaultCrib[:16]
+ expected = describeStops(sRange.turingAttack(eMsg, crib))
+ # stops of the former graph based attack: Walzen order, Tageswalzenstellungen and number of wirings
+ reference = [(('I', 'II', 'III'), [('EHA', 2), ('TOF', 2), ('WDX', 2), ('CHI', 1), ('BKT', 1), ('FRV', 2), ('XNW', 1), ('SIJ', 3), ('NGF', 1), ('DSQ', 1), ('XYS', 3), ('BWK', 1), 
+                                                ('TKI', 1), ('YUQ', 1), ('VWF', 1), ('NBK', 4), ('RBN', 1), ('IQJ', 2), ('QNM', 2), ('SLM', 1), ('SAJ', 1), ('STR', 3), ('RQN', 3), ('YVQ', 2), ('KDO', 1)]), 
+                    (('II', 'I', 'III'), [('EHA', 1), ('TOF', 1), ('ULZ', 1), ('FRV', 1), ('XNW', 1), ('SIJ', 2), ('DSQ', 1), ('XYS', 1), ('BWK', 1), ('YUQ', 2), ('EII', 2), ('VWF', 2), 
+                                                ('NBK', 2), ('IQJ', 1), ('QNM', 1), ('VFJ', 2), ('SLM', 1), ('RQN', 1), ('YVQ', 1), ('NCC', 2), ('KDO', 1)])]
+ result = [(walzen, [(tws, len(wirings)) for tws, wirings in stops]) for walzen, stops in expected]
+ assert result == reference, 'Stops of the bombe differ from the reference: {}'.format(result)
+ steckerbrettWiring = enigmaSetting.steckerbrett.wiringToDict(False)
+ for tws, wirings in expected[0][1]:
+  if tws == 'KDO':
+   assert all(steckerbrettWiring[src] == tgt for src, tgt in wirings[0]), 'Improper wiring of the correct stop: {}'.format(wirings[0])
+ result = describeStops(sRange.turingAttack(eMsg, crib, workers = 2))
+ assert result == expected, 'Stops with workers = 2 differ: {}'.format(result)
+ # the workers get plain definitions of the components only
+ assert b'MzEnigma' not in pickle.dumps(sRange._componentDefinitions()), 'Components pickled for the workers'
+ startingPosition = next(n for n in range(1, 40) if all(cc != ec for cc, ec in zip(defaultMsg[n:n + 16], eMsg[n:n + 16])))
+ shiftedCrib = defaultMsg[startingPosition:startingPosition + 16]
+ result = describeStops(sRange.turingAttack(eMsg, shiftedCrib, startingPosition = startingPosition, workers = 2))
+ assert result == describeStops(sRange.turingAttack(eMsg, shiftedCrib, startingPosition = startingPosition)), 'Stops at position {} with workers = 2 differ: {}'.format(startingPosition, result)
+ checkpointDir = str(tmp_path / 'turing')
+ sRange.turingAttack(eMsg, crib, workers = 2, checkpointDir = checkpointDir)
+ shardFiles = sorted(v for v in os.listdir(checkpointDir) if v.startswith('shard-'))
+ assert len(shardFiles) == 2, 'Turing checkpoint without shards: {}'.format(shardFiles)
+ os.remove(os.path.join(checkpointDir, shardFiles[1]))
+ result = describeStops(sRange.turingAttack(eMsg, crib, workers = 2, checkpointDir = checkpointDir, resume = True))
+ assert result == expected, 'Stops resumed differ: {}'.format(result)
+ print('- Enigma_I completed')
+
+def test_cribMenu(pytestconfig):
+ print('\n--- test_cribMenu ---')
+ # edges A-B, B-C, C-A, A-D, D-E, E-A, B-D, the test register A connects 4 letters
+ crib, encodedCrib = 'ABCADEB', 'BCADEAD'
+ # spanning tree of A by the positions 0 (B), 2 (C), 3 (D), 5 (E), each other position closes a loop back to its start
+ expected = {3: ((1, 2, 0), ), 
+                   5: ((1, 2, 0), ), 
+                   6: ((1, 2, 0), (4, 5, 3)), 
+                   7: ((1, 2, 0), (4, 5, 3), (6, 3, 0))}
+ falseStopRate = None
+ for length, loops in expected.items():
+  menu = MzEnigma.CribMenu(encodedCrib[:length], crib[:length])
+  assert menu.testRegister == 'A', 'Test register {} of {}'.format(menu.testRegister, crib[:length])
+  assert menu.loops == loops, 'Loops of {}: {} != {}'.format(crib[:length], menu.loops, loops)
+  edges = {pos: {src, tgt} for src, tgt, pos in menu.edges}
+  for loop in menu.loops:
+   # consecutive edges of a loop share a letter, the last edge returns to the first one
+   assert all(edges[pos] & edges[loop[(n + 1) % len(loop)]] for n, pos in enumerate(loop)), 'Loop {} of {} not closed'.format(loop, crib[:length])
+  assert menu.falseStopRate == pytest.approx(26.0 ** (1 - len(loops))), 'False stop rate {} of {}'.format(menu.falseStopRate, crib[:length])
+  if falseStopRate is not None:
+   # a further loop reduces the rate, a further edge of the tree does not
+   assert menu.falseStopRate < falseStopRate if len(loops) > numberOfLoops else menu.falseStopRate == falseStopRate, 'False stop rate of {} not decreasing'.format(crib[:length])
+  falseStopRate, numberOfLoops = menu.falseStopRate, len(loops)
+ print('- {} loops completed'.format(len(expected[7])))
+
+def test_diagonalBoard(pytestconfig):
+ print('\n--- test_diagonalBoard ---')
+ rnd = random.Random(16)
+ enigma = MzEnigma.Enigma_I
+ enigmaSetting = MzEnigma.Tagesschluessel(enigma, 
+                                                            umkehrwalze = MzEnigma.UKW_B, 
+                                                            walzen = [MzEnigma.I, MzEnigma.II, MzEnigma.III], 
+                                                            tagesWalzenStellungen = 'KDO', 
+                                                            steckerbrett = MzEnigma.Steckerbrett('Mark 3', 'ARDCEFTIHXPSVQOKNBLGUMYJWZ'), 
+                                                            notify = None)
+ eMsg = enigmaSetting.encode(defaultMsg[:60])
+ sRange = MzEnigma.TagesschluesselRange(enigma, 
+  walzenList = [[MzEnigma.I, MzEnigma.II, MzEnigma.III]], 
+  tagesWalzenStellungenList = [''.join(rnd.choice(enigma.alphabet) for _ in range(3)) for _ in range(400)] + ['KDO'], 
+  umkehrwalzenList = [MzEnigma.UKW_B], 
+  zusatzwalzenList = [], 
+  spruchScoring = None, 
+  notify = None)
+ # a short crib with few loops, i.e. many false stops without diagonal board
+ crib = defaultCrib[:14]
+ stops = dict()
+ for diagonalBoard in [False, True]:
+  stops[diagonalBoard] = {tws: wirings for _, tws2wiringList in describeStops(sRange.turingAttack(eMsg, crib, diagonalBoard = diagonalBoard)) for tws, wirings in tws2wiringList}
+ assert len(stops[True]) < len(stops[False]) // 10, 'Diagonal board removes too few stops: {} of {}'.format(len(stops[True]), len(stops[False]))
+ # the stops of the diagonal board know more settings of the Steckerbrett, but are found without the board as well
+ assert set(stops[True]) <= set(stops[False]), 'Diagonal board adds stops: {}'.format(set(stops[True]) - set(stops[False]))
+ steckerbrettWiring = enigmaSetting.steckerbrett.wiringToDict(False)
+ for diagonalBoard in [False, True]:
+  assert any(all(steckerbrettWiring[src] == tgt for src, tgt in wiring) for wiring in stops[diagonalBoard].get('KDO', list())), 'Correct stop missing, diagonalBoard = {}'.format(diagonalBoard)
+ print('- {} of {} stops kept by the diagonal board'.format(len(stops[True]), len(stops[False])))
+
 def runGilloglyAttack(enigma : MzEnigma.Enigma, name : str, msg : str, phase2Method : str = 'Mz', notify : Optional[Callable[[str], None]] = None):
  assert enigma.steckerbrett is not None
  print('Starting engine {}'.format(name))
@@ -160,12 +275,168 @@ def test_gilloglyAttack(pytestconfig):
  phase2Method = 'Mz'
  if pattern:
   print('\n--- test_gilloglyAttack ---\n')
-  for name, enigma in vars(MzEnigma).items():
-   if isinstance(enigma, MzEnigma.Enigma) and re.fullmatch(pattern, name) and enigma.steckerbrett is not None:
+  for name, enigma in pytest.helpers.machines(pattern, MzEnigma.Enigma):
+   if enigma.steckerbrett is not None:
     runGilloglyAttack(enigma, name, msg, 
                            phase2Method = phase2Method,  
                            notify = pytest.helpers.notify(pytestconfig))
 
+def describeTagesschluessel(tagesschluessel : MzEnigma.Tagesschluessel) -> Tuple[str, Tuple[str, ...], str]:
+ return (tagesschluessel.umkehrwalze.name, tuple(walze.name for walze in tagesschluessel.walzen), tagesschluessel.tagesWalzenStellungen)
+
+def test_gilloglyAttackPhase1(pytestconfig, tmp_path):
+ print('\n--- test_gilloglyAttackPhase1 ---')
+ rnd = random.Random(11)
+ enigma = MzEnigma.Enigma_I
+ enigmaSetting = MzEnigma.Tagesschluessel(enigma, 
+                                                            umkehrwalze = MzEnigma.UKW_B, 
+                                                            walzen = [MzEnigma.II, MzEnigma.I, MzEnigma.III], 
+                                                            tagesWalzenStellungen = 'QXB', 
+                                                            steckerbrett = MzEnigma.Steckerbrett('Unconnected', enigma.alphabet), 
+                                                            notify = None)
+ eMsg = enigmaSetting.encode(defaultMsg[:150])
+ tagesWalzenStellungenList = [''.join(rnd.choice(enigma.alphabet) for _ in range(3)) for _ in range(40)] + ['QXB']
+ sRange = MzEnigma.TagesschluesselRange(enigma, 
+  walzenList = [[MzEnigma.I, MzEnigma.II, MzEnigma.III], [MzEnigma.II, MzEnigma.I, MzEnigma.III], [MzEnigma.III, MzEnigma.I, MzEnigma.II]], 
+  tagesWalzenStellungenList = tagesWalzenStellungenList, 
+  umkehrwalzenList = [MzEnigma.UKW_A, MzEnigma.UKW_B], 
+  spruchScoring = None, 
+  notify = None) 
+ sRange.steckerbrett.wiring = enigma.alphabet
+ serial = sRange.gilloglyAttackPhase1(eMsg)
+ assert describeTagesschluessel(serial) == describeTagesschluessel(enigmaSetting), 'Phase 1 failed: {}'.format(describeTagesschluessel(serial))
+ expected = [(describeTagesschluessel(v), score) for v, score in sRange.gilloglyAttackPhase1(eMsg, topK = 5)]
+ assert expected[0][0] == describeTagesschluessel(enigmaSetting), 'Phase 1 with topK failed: {}'.format(expected[0][0])
+ variants = {'workers = 2': dict(workers = 2), 
+                  'chunkSize = 7': dict(workers = 2, chunkSize = 7), 
+                  'earlyAbort = 0': dict(earlyAbort = 0), 
+                  'earlyAbort = 0, workers = 2': dict(earlyAbort = 0, workers = 2)}
+ for variant, kwargs in variants.items():
+  result = [(describeTagesschluessel(v), score) for v, score in sRange.gilloglyAttackPhase1(eMsg, topK = 5, **kwargs)]
+  assert result == expected, 'Phase 1 with {} differs: {} != {}'.format(variant, result, expected)
+  print('- {} completed'.format(variant))
+ # the bound of earlyAbort = 0 never drops a candidate, i.e. the ranking of all candidates is the same as without bound
+ nCandidates = 2 * 3 * len(tagesWalzenStellungenList)
+ unbounded = [(describeTagesschluessel(v), score) for v, score in sRange.gilloglyAttackPhase1(eMsg, topK = nCandidates)]
+ assert [(describeTagesschluessel(v), score) for v, score in sRange.gilloglyAttackPhase1(eMsg, topK = nCandidates, earlyAbort = 0)] == unbounded, 'Phase 1 with earlyAbort = 0 drops candidates'
+ assert describeTagesschluessel(sRange.gilloglyAttackPhase1(eMsg, earlyAbort = 0)) == describeTagesschluessel(serial), 'Phase 1 with earlyAbort = 0 failed'
+ # earlyAbort > 0 may drop candidates, the scores of the candidates kept are exact
+ scores = dict(unbounded)
+ for v, score in sRange.gilloglyAttackPhase1(eMsg, topK = 5, earlyAbort = 1):
+  assert score == scores[describeTagesschluessel(v)], 'Score of {} with earlyAbort = 1 differs'.format(describeTagesschluessel(v))
+ checkpointDir = str(tmp_path / 'phase1')
+ result = [(describeTagesschluessel(v), score) for v, score in sRange.gilloglyAttackPhase1(eMsg, topK = 5, checkpointDir = checkpointDir)]
+ assert result == expected, 'Phase 1 with checkpoint differs: {} != {}'.format(result, expected)
+ shardFiles = sorted(v for v in os.listdir(checkpointDir) if v.startswith('shard-'))
+ assert len(shardFiles) > 1, 'Phase 1 checkpoint without shards: {}'.format(shardFiles)
+ os.remove(os.path.join(checkpointDir, shardFiles[0]))
+ result = [(describeTagesschluessel(v), score) for v, score in sRange.gilloglyAttackPhase1(eMsg, topK = 5, checkpointDir = checkpointDir, resume = True)]
+ assert result == expected, 'Phase 1 resumed differs: {} != {}'.format(result, expected)
+ print('- checkpoint and resume completed')
+
+def test_candidateHeap(pytestconfig):
+ print('\n--- test_candidateHeap ---')
+ rnd = random.Random(13)
+ # candidates in the order of examination, few distinct scores, i.e. many ties
+ candidates = list(itertools.product(range(2), range(3), range(10), range(2)))
+ scores = [rnd.choice([0.03, 0.04, 0.05, 0.06]) for _ in candidates]
+ for topK in [1, 7, 20, len(candidates), len(candidates) + 5]:
+  expected = sorted(zip(scores, candidates), key = lambda v: -v[0])[:topK]
+  heap = MzEnigma.analyzeEnigma._CandidateHeap(topK)
+  for score, candidate in zip(scores, candidates):
+   heap.push(score, candidate)
+  assert heap.ranked() == expected, 'Heap with topK = {} differs: {} != {}'.format(topK, heap.ranked()[:5], expected[:5])
+  assert heap.threshold == (expected[-1][0] if topK <= len(candidates) else 0), 'Threshold with topK = {} differs'.format(topK)
+  # the ranking of equal scores is independent of the order of pushing
+  shuffled = list(zip(scores, candidates))
+  rnd.shuffle(shuffled)
+  heap = MzEnigma.analyzeEnigma._CandidateHeap(topK)
+  for score, candidate in shuffled:
+   heap.push(score, candidate)
+  assert heap.ranked() == expected, 'Heap with topK = {} depends on the order of pushing'.format(topK)
+  # scores of the tagesWalzenStellungen (rows) and zusatzwalzen (columns) of each Umkehrwalze and Walzen order
+  heap = MzEnigma.analyzeEnigma._CandidateHeap(topK)
+  for umkehrwalzeID, walzenID in itertools.product(range(2), range(3)):
+   first = (umkehrwalzeID * 3 + walzenID) * 20
+   for start in [0, 4]:
+    block = numpy.array(scores[first + 2 * start:first + 20 if start else first + 8])
+    heap.pushScores(block, umkehrwalzeID, walzenID, start, 2)
+  assert heap.ranked() == expected, 'Heap of pushScores with topK = {} differs'.format(topK)
+  print('- topK = {} completed'.format(topK))
+
+def test_gilloglyRingSearch(pytestconfig):
+ print('\n--- test_gilloglyRingSearch ---')
+ rnd = random.Random(25)
+ spruchScoring = MzEnigma.SpruchScoring('german')
+ for name in ['Enigma_I', 'Enigma_D']:
+  enigma = MzEnigma.machines[name]
+  alphabet = enigma.alphabet
+  msg = ''.join(c for c in defaultMsg if c in alphabet)
+  walzen = enigma.walzen[:enigma.numberOfWalzen]
+  if enigma.steckerbrett is not None:
+   steckerbrett = MzEnigma.Steckerbrett('Mark 3', 'ARDCEFTIHXPSVQOKNBLGUMYJWZ')
+  else:
+   steckerbrett = None
+  sRange = MzEnigma.TagesschluesselRange(enigma, 
+   walzenList = [walzen], 
+   umkehrwalzenList = [enigma.umkehrwalzen[0]], 
+   zusatzwalzenList = [], 
+   spruchScoring = spruchScoring, 
+   notify = None) 
+  for _ in range(2):
+   ringSettings = ''.join(rnd.choice(alphabet[1:]) for _ in range(enigma.numberOfWalzen))
+   tagesWalzenStellungen = ''.join(rnd.choice(alphabet) for _ in range(enigma.numberOfWalzen))
+   enigmaSetting = MzEnigma.Tagesschluessel(enigma, walzen = walzen, umkehrwalze = enigma.umkehrwalzen[0], tagesWalzenStellungen = tagesWalzenStellungen, 
+                                                              steckerbrett = copy.deepcopy(steckerbrett), ringSettings = ringSettings, notify = None)
+   eMsg = enigmaSetting.encode(msg)
+   # phase 1 finds the Walzenstellungen relative to the rings 'A..'
+   phase1TagesWalzenStellungen = ''.join(alphabet[(alphabet.index(v) - alphabet.index(r)) % len(alphabet)] for v, r in zip(tagesWalzenStellungen, ringSettings))
+   phase1EnigmaSetting = MzEnigma.Tagesschluessel(enigma, walzen = walzen, umkehrwalze = enigma.umkehrwalzen[0], tagesWalzenStellungen = phase1TagesWalzenStellungen, 
+                                                                     steckerbrett = copy.deepcopy(steckerbrett), zusatzwalze = enigmaSetting.zusatzwalze, notify = None)
+   assert phase1EnigmaSetting.decode(eMsg) != msg, 'Ring settings {} ignored on enigma {}'.format(ringSettings, name)
+   ringEnigmaSetting = sRange.gilloglyRingSearch(phase1EnigmaSetting, eMsg, useNgrams = True)
+   assert ringEnigmaSetting.decode(eMsg) == msg, 'Ring search of {} failed for ring settings {}: {}'.format(name, ringSettings, ringEnigmaSetting.ringSettings)
+   ringEnigmaSetting = sRange.gilloglyRingSearch(phase1EnigmaSetting, eMsg)
+   candidates = sRange.gilloglyRingSearch(phase1EnigmaSetting, eMsg, topK = 3)
+   assert len(candidates) == 3 and candidates[0][0].decode(eMsg) == ringEnigmaSetting.decode(eMsg), 'Ring search of {} with topK differs for ring settings {}'.format(name, ringSettings)
+  print('- {} completed'.format(name))
+
+def test_steckerbrettState(pytestconfig):
+ print('\n--- test_steckerbrettState ---')
+ rnd = random.Random(15)
+ enigma = MzEnigma.Enigma_I
+ alphabet = enigma.alphabet
+ spruchScoring = MzEnigma.SpruchScoring('german')
+ enigmaSetting = MzEnigma.Tagesschluessel(enigma, 
+                                                            umkehrwalze = MzEnigma.UKW_B, 
+                                                            walzen = [MzEnigma.I, MzEnigma.II, MzEnigma.III], 
+                                                            tagesWalzenStellungen = 'QEV', 
+                                                            steckerbrett = MzEnigma.Steckerbrett('Mark 3', 'ARDCEFTIHXPSVQOKNBLGUMYJWZ'), 
+                                                            notify = None)
+ eMsg = enigmaSetting.encode(defaultMsg[:200])
+ for numberOfChars, validChars in [(0, None), (1, None), (2, 'ENR')]:
+  state = MzEnigma.SteckerbrettState(enigmaSetting, eMsg, spruchScoring, numberOfChars = numberOfChars, validChars = validChars)
+  for _ in range(100):
+   wiring = state.wiring
+   connected = [c for n, c in enumerate(alphabet) if wiring[n] != c]
+   unconnected = [c for n, c in enumerate(alphabet) if wiring[n] == c]
+   # exchanges may leave connections, which are not pairs
+   paired = [c for c in connected if wiring[alphabet.index(wiring[alphabet.index(c)])] == c]
+   move = rnd.choice(['clear', 'add', 'exchange'])
+   if move == 'clear' and paired:
+    state.clearMark3Setting(rnd.choice(paired))
+   elif move == 'add' and len(unconnected) > 1:
+    state.addMark3Setting(*rnd.sample(unconnected, 2))
+   elif len(connected) > 2:
+    c1 = rnd.choice(connected)
+    state.exchangeMark3Setting(c1, rnd.choice([c for c in connected if c not in (c1, wiring[alphabet.index(c1)])]))
+   enigmaSetting.steckerbrett.wiring = state.wiring
+   decodedMsg = enigmaSetting.decode(eMsg)
+   assert state.decodedSpruch == decodedMsg, 'Decoded spruch of {} differs: {} != {}'.format(state.wiring, state.decodedSpruch, decodedMsg)
+   score = spruchScoring.ngramScore(decodedMsg, numberOfChars, validChars = alphabet if validChars is None else validChars)
+   assert state.score == score, 'Score of {} differs: {} != {}'.format(state.wiring, state.score, score)
+  print('- numberOfChars = {}, validChars = {} completed'.format(numberOfChars, validChars))
+
 def runRejewskiAttack(enigma : MzEnigma.Enigma, name : str, usePickleFile : bool = True, notify : Optional[Callable[[str], None]] = None):
  assert enigma.steckerbrett is None
  print('Starting engine {}'.format(name))
@@ -205,12 +476,82 @@ def runRejewskiAttack(enigma : MzEnigma.Enigma, name : str, usePickleFile : bool
    found = 'improper'
   print('tagesWalzenStellungen = {}, spruchschluessel = {} -> {} '.format(setting.tagesWalzenStellungen, spruchschluessel, found))
 
+def test_rejewskiCatalog(pytestconfig, tmp_path):
+ print('\n--- test_rejewskiCatalog ---')
+ rnd = random.Random(18)
+ for name in ['Enigma_D', 'Enigma_A']:
+  enigma = MzEnigma.machines[name]
+  enigmaSetting = MzEnigma.Tagesschluessel(enigma, 
+   walzen = enigma.walzen[:enigma.numberOfWalzen], 
+   umkehrwalze = enigma.umkehrwalzen[0], notify = None)
+  tagesWalzenStellungenList = [''.join(rnd.choice(enigma.alphabet) for _ in range(enigma.numberOfWalzen)) for _ in range(150)] + [enigmaSetting.tagesWalzenStellungen]
+  sRange = MzEnigma.TagesschluesselRange(enigma, 
+   walzenList = [list(v) for v in itertools.permutations(enigma.walzen[:enigma.numberOfWalzen])][:3], 
+   tagesWalzenStellungenList = tagesWalzenStellungenList, 
+   umkehrwalzenList = [enigmaSetting.umkehrwalze], 
+   zusatzwalzenList = [], 
+   spruchScoring = None, 
+   notify = None) 
+  catalogFile = str(tmp_path / '{}.rej'.format(name))
+  parallelCatalogFile = str(tmp_path / '{}-parallel.rej'.format(name))
+  catalogs = {'list': sRange.createRejewskiCatalog(), 
+                   'indexed': sRange.createRejewskiCatalog(catalogFile = catalogFile), 
+                   'reloaded': MzEnigma.TagesschluesselRange.loadRejewskiCatalog(catalogFile), 
+                   'workers = 3': sRange.createRejewskiCatalog(catalogFile = parallelCatalogFile, workers = 3)}
+  with open(catalogFile, 'rb') as f1, open(parallelCatalogFile, 'rb') as f2:
+   assert f1.read() == f2.read(), 'Parallel catalog file of {} differs'.format(name)
+  for _ in range(10):
+   msg = ''.join(rnd.sample(enigma.alphabet, enigma.numberOfWalzen))
+   eMsg = enigmaSetting.encode(msg + msg)
+   expected = None
+   for catalogName, catalog in catalogs.items():
+    result = [(v.tagesWalzenStellungen, tuple(walze.name for walze in v.walzen), spruchschluessel) for v, spruchschluessel in MzEnigma.TagesschluesselRange.rejewskiAttack(catalog, eMsg)]
+    if expected is None:
+     expected = result
+     assert (enigmaSetting.tagesWalzenStellungen, tuple(walze.name for walze in enigmaSetting.walzen), msg) in expected, 'Rejewski attack of {} failed for {}'.format(name, msg)
+    assert result == expected, 'Rejewski attack of {} with the {} catalog differs: {} != {}'.format(name, catalogName, result, expected)
+  for catalogName in ['indexed', 'reloaded', 'workers = 3']:
+   catalogs[catalogName].close()
+  print('- {} completed'.format(name))
+
+def test_cyclometerAttack(pytestconfig, tmp_path):
+ print('\n--- test_cyclometerAttack ---')
+ rnd = random.Random(19)
+ enigma = MzEnigma.Enigma_I
+ walzenList = [[MzEnigma.I, MzEnigma.II, MzEnigma.III], [MzEnigma.III, MzEnigma.II, MzEnigma.I]]
+ tagesWalzenStellungenList = [''.join(rnd.choice(enigma.alphabet) for _ in range(3)) for _ in range(200)]
+ sRange = MzEnigma.TagesschluesselRange(enigma, 
+  walzenList = walzenList, 
+  tagesWalzenStellungenList = tagesWalzenStellungenList, 
+  umkehrwalzenList = [MzEnigma.UKW_B], 
+  zusatzwalzenList = [], 
+  spruchScoring = None, 
+  notify = None) 
+ pickleFile = str(tmp_path / 'cyclometer.pickle')
+ sRange.createCyclometerCatalog(pickleFile = pickleFile)
+ catalog = MzEnigma.CyclometerCatalog.load(pickleFile)
+ for walzen, tagesWalzenStellungen in [(walzenList[0], tagesWalzenStellungenList[17]), (walzenList[1], tagesWalzenStellungenList[123])]:
+  enigmaSetting = MzEnigma.Tagesschluessel(enigma, 
+                                                             umkehrwalze = MzEnigma.UKW_B, 
+                                                             walzen = walzen, 
+                                                             tagesWalzenStellungen = tagesWalzenStellungen, 
+                                                             steckerbrett = MzEnigma.Steckerbrett('Mark 3', 'ARDCEFTIHXPSVQOKNBLGUMYJWZ'), 
+                                                             notify = None)
+  encodedSpruchSchluesselList = list()
+  for _ in range(300):
+   spruchschluessel = ''.join(rnd.choice(enigma.alphabet) for _ in range(3))
+   encodedSpruchSchluesselList.append(enigmaSetting.encode(spruchschluessel + spruchschluessel))
+  candidates = MzEnigma.TagesschluesselRange.cyclometerAttack(catalog, encodedSpruchSchluesselList)
+  found = [v for v in candidates if v.tagesWalzenStellungen == tagesWalzenStellungen and [walze.name for walze in v.walzen] == [walze.name for walze in walzen]]
+  assert found, 'Cyclometer attack failed for {} {}, {} candidates'.format([walze.name for walze in walzen], tagesWalzenStellungen, len(candidates))
+  print('- {} {}: {} candidates'.format([walze.name for walze in walzen], tagesWalzenStellungen, len(candidates)))
+
 def test_rejewskiAttack(pytestconfig):
  pattern = pytestconfig.getoption('component')
  if pattern:
   print('\n--- test_rejewskiAttack ---\n')
-  for name, enigma in vars(MzEnigma).items():
-   if isinstance(enigma, MzEnigma.Enigma) and re.fullmatch(pattern, name) and enigma.steckerbrett is None:
+  for name, enigma in pytest.helpers.machines(pattern, MzEnigma.Enigma):
+   if enigma.steckerbrett is None:
     runRejewskiAttack(enigma, name, notify = pytest.helpers.notify(pytestconfig))
                             
 if __name__ == "__main__":
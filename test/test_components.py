@@ -7,14 +7,14 @@ import MzEnigma
 
 def test_steckerbrett(pytestconfig):
  if pytestconfig.getoption('wiring'):
-  for name, cls in vars(MzEnigma).items():
+  for name, cls in pytest.helpers.machines('.+', MzEnigma.Steckerbrett):
    if cls.__class__ == MzEnigma.Steckerbrett:
     print('\n -{}'.format(cls))
     
 def test_ringstellung(pytestconfig):
  if pytestconfig.getoption('wiring'):
   print('\n--- test_ringstellung ---')
-  for name, cls in vars(MzEnigma).items():
+  for name, cls in pytest.helpers.machines('.+', MzEnigma.Walze):
    if isinstance(cls, MzEnigma.Walze):
     encoded = str()
     for c in cls.alphabet:
@@ -26,17 +26,17 @@ def test_ringstellung(pytestconfig):
 def test_wiring(pytestconfig):
  if pytestconfig.getoption('wiring'):
   print('\n--- test_wiring ---')
-  for name, cls in vars(MzEnigma).items():
+  for name, cls in pytest.helpers.machines('.+', MzEnigma.Steckerbrett):
    if isinstance(cls, MzEnigma.Steckerbrett):
     cls.notify = pytest.helpers.notify(pytestconfig)
     alphabet = cls.alphabet
     pos = 17
-    if '_ringstellung' in vars(cls):
+    if isinstance(cls, MzEnigma.Zusatzwalze):
      cls.ringstellung = alphabet[pos]
     encoded = str()
     for c in alphabet:
      encoded += cls.encode(c, True, componentOnly = True)
-    if '_ringstellung' in vars(cls):
+    if isinstance(cls, MzEnigma.Zusatzwalze):
      expectedWiring = cls.wiring[pos:] + cls.wiring[:pos]
     else:
      expectedWiring = cls.wiring
@@ -50,7 +50,7 @@ def test_wiring(pytestconfig):
 def test_step(pytestconfig):
  if pytestconfig.getoption('wiring'):
   print('\n--- test_step ---')
-  for name, cls1 in vars(MzEnigma).items():
+  for name, cls1 in pytest.helpers.machines('.+', MzEnigma.Walze):
    if isinstance(cls1, MzEnigma.Walze):
     cls1.ringstellung = cls1.alphabet[0]
     cls2 = copy.deepcopy(cls1)
@@ -64,10 +64,66 @@ def test_step(pytestconfig):
      assert cls1.alphabet[ringstellung1] == cls1.ringstellung and cls1.alphabet[ringstellung2] == cls2.ringstellung, 'Stepping of component {} failed'.format(cls1.name)
     print('- {} completed'.format(cls1.name))
 
+def test_tracing(pytestconfig):
+ print('\n--- test_tracing ---')
+ events = list()
+ messages = list()
+ walze = copy.deepcopy(MzEnigma.I)
+ walze.notify = None
+ notifiedWalze = copy.deepcopy(MzEnigma.II)
+ notifiedWalze.notify = messages.append
+ try:
+  # configured after the construction of the components
+  MzEnigma.tracing.configure(levels = {'component': MzEnigma.tracing.TRACE}, sinks = {'component': [events.append]})
+  walze.encode(walze.alphabet[0], True, componentOnly = True)
+  assert [event.kind for event in events] == ['encode'], 'Events of the configured tracer missing: {}'.format(events)
+  MzEnigma.tracing.configure(levels = {'component': MzEnigma.tracing.OFF})
+  walze.encode(walze.alphabet[0], True, componentOnly = True)
+  walze.step()
+  notifiedWalze.encode(walze.alphabet[0], True, componentOnly = True)
+  assert len(events) == 1 and not messages, 'Events of the disabled tracer: {}, {}'.format(events, messages)
+  MzEnigma.tracing.configure(levels = {'component': MzEnigma.tracing.TRACE}, sinks = {'component': []})
+  walze.step()
+  notifiedWalze.encode(walze.alphabet[0], True, componentOnly = True)
+  assert len(events) == 1 and len(messages) == 1, 'Events of the enabled tracer: {}, {}'.format(events, messages)
+  # the sinks are changed by assignment only, the components are notified at once
+  tracer = MzEnigma.tracing.getTracer('component')
+  with pytest.raises(AttributeError):
+   tracer.sinks.append(events.append)
+  tracer.sinks += (events.append, )
+  walze.step()
+  assert [event.kind for event in events] == ['encode', 'step'], 'Events of the added sink missing: {}'.format(events)
+  tracer.level = MzEnigma.tracing.OFF
+  assert walze._emit is None and notifiedWalze._emit is None, 'Emitters of the disabled tracer kept'
+ finally:
+  MzEnigma.tracing.configure(levels = {'component': MzEnigma.tracing.TRACE}, sinks = {'component': []})
+
+def test_definitions(pytestconfig, tmp_path):
+ print('\n--- test_definitions ---')
+ definitions = MzEnigma.machines.definitions()
+ for definitionFile in ['machines.json', 'machines.pickle']:
+  definitionFile = str(tmp_path / definitionFile)
+  MzEnigma.saveDefinitions(definitions, definitionFile)
+  loaded = MzEnigma.loadDefinitions(definitionFile)
+  assert loaded == definitions, 'Definitions of {} differ'.format(definitionFile)
+  machines = MzEnigma.createRegistry(loaded)
+  assert sorted(machines) == sorted(MzEnigma.machines), 'Names of {} differ'.format(definitionFile)
+  for name in machines:
+   machine, expected = machines[name], MzEnigma.machines[name]
+   assert type(machine) == type(expected), 'Type of {} from {} differs'.format(name, definitionFile)
+   if isinstance(machine, MzEnigma.Enigma):
+    # the random Steckerbretter are created again
+    assert machine.model == expected.model and machine.numberOfWalzen == expected.numberOfWalzen \
+       and machine.walzen == expected.walzen and machine.umkehrwalzen == expected.umkehrwalzen and machine.zusatzwalzen == expected.zusatzwalzen \
+       and (machine.steckerbrett is None) == (expected.steckerbrett is None), 'Enigma {} from {} differs'.format(name, definitionFile)
+   elif 'random' not in definitions[name]:
+    assert machine == expected, 'Component {} from {} differs'.format(name, definitionFile)
+  print('- {} completed'.format(definitionFile))
+
 if __name__ == "__main__":
  import sys
  pattern = 'I_.+'
- for name, cls in vars(MzEnigma).items():
+ for name, cls in MzEnigma.machines.items():
   if isinstance(cls, MzEnigma.Umkehrwalze) and re.fullmatch(pattern, name):
    print('\n{}'.format(cls))
  pytest.main([__file__])  
@@ -2,8 +2,12 @@
 import pytest
 
 import copy
+import io
 import random
 import re
+
+import numpy
+
 import MzEnigma
 
 notify = [None, print]
@@ -18,11 +22,10 @@ def test_print(pytestconfig):
  pattern = pytestconfig.getoption('component')
  if pattern:
   print('\n--- test_print: pattern = {} ---'.format(pattern))
-  for name, cls in vars(MzEnigma).items():
-   if (isinstance(cls, MzEnigma.Umkehrwalze) \
+  for name, cls in pytest.helpers.machines(pattern):
+   if isinstance(cls, MzEnigma.Umkehrwalze) \
     or isinstance(cls, MzEnigma.Enigma) \
-    or isinstance(cls, MzEnigma.Tagesschluessel)) \
-    and re.fullmatch(pattern, name):
+    or isinstance(cls, MzEnigma.Tagesschluessel):
     print('\n -{}'.format(cls))
 
 def test_basicencode(pytestconfig):
@@ -41,8 +44,8 @@ def test_chain(pytestconfig):
  pattern = pytestconfig.getoption('component')
  if pattern:
   print('\n--- test_chain ---\nmessage: {}'.format(msg))
-  for name, enigma in vars(MzEnigma).items():
-   if isinstance(enigma, MzEnigma.Enigma) and re.fullmatch(pattern, name):
+  for name, enigma in pytest.helpers.machines(pattern, MzEnigma.Enigma):
+   if isinstance(enigma, MzEnigma.Enigma):
     enigmaSetting = MzEnigma.Tagesschluessel(enigma, notify = pytest.helpers.notify(pytestconfig))
     enigmaSetting.chain()
     print('- {} completed'.format(name))
@@ -52,8 +55,8 @@ def test_encode(pytestconfig):
  pattern = pytestconfig.getoption('component')
  if pattern:
   print('\n--- test_encode ---\n')
-  for name, enigma in vars(MzEnigma).items():
-   if isinstance(enigma, MzEnigma.Enigma) and re.fullmatch(pattern, name):
+  for name, enigma in pytest.helpers.machines(pattern, MzEnigma.Enigma):
+   if isinstance(enigma, MzEnigma.Enigma):
     enigmaSetting = MzEnigma.Tagesschluessel(enigma, notify = pytest.helpers.notify(pytestconfig))
     setWorstTagesWalzenStellungen(enigmaSetting)
     print(enigmaSetting)
@@ -71,8 +74,8 @@ def test_encode2(pytestconfig):
  pattern = pytestconfig.getoption('component')
  if pattern:
   print('\n--- test_encode2 (using Spruchschluessel) ---\n')
-  for name, enigma in vars(MzEnigma).items():
-   if isinstance(enigma, MzEnigma.Enigma) and re.fullmatch(pattern, name):
+  for name, enigma in pytest.helpers.machines(pattern, MzEnigma.Enigma):
+   if isinstance(enigma, MzEnigma.Enigma):
     enigmaSetting = MzEnigma.Tagesschluessel(enigma, notify = pytest.helpers.notify(pytestconfig))
     setWorstTagesWalzenStellungen(enigmaSetting)
     print(enigmaSetting)
@@ -86,9 +89,253 @@ def test_encode2(pytestconfig):
     assert actMsg == newMsg, 'Encoding of msg {} failed on enigma {}'.format(actMsg, enigma.model)
     print('- {} completed'.format(name))
 
+def test_compiled(pytestconfig):
+ print('\n--- test_compiled ---')
+ rnd = random.Random(1)
+ for name, enigma in pytest.helpers.machines('.+', MzEnigma.Enigma):
+  for _ in range(6):
+   if enigma.steckerbrett is not None:
+    steckerbrett = rnd.choice([MzEnigma.Steckerbrett.Mark_1, MzEnigma.Steckerbrett.Mark_2, MzEnigma.Steckerbrett.Mark_3])(alphabet = enigma.alphabet)
+   else:
+    steckerbrett = None
+   linked = MzEnigma.Tagesschluessel(enigma, 
+                                                    walzen = rnd.sample(enigma.walzen, enigma.numberOfWalzen), 
+                                                    tagesWalzenStellungen = ''.join(rnd.choice(enigma.alphabet) for _ in range(enigma.numberOfWalzen)), 
+                                                    steckerbrett = steckerbrett, 
+                                                    notify = None)
+   compiled = copy.deepcopy(linked)
+   compiled.compiled = True
+   msg = ''.join(rnd.choice(enigma.alphabet) for _ in range(rnd.randint(1, 300)))
+   spruchWalzenStellungen = ''.join(rnd.choice(enigma.alphabet) for _ in range(enigma.numberOfWalzen))
+   assert compiled.encode(msg) == linked.encode(msg), 'Compiled encoding of msg {} differs on enigma {}'.format(msg, name)
+   eMsg = linked.encode(msg, spruchWalzenStellungen = spruchWalzenStellungen)
+   assert compiled.encode(msg, spruchWalzenStellungen = spruchWalzenStellungen) == eMsg, 'Compiled encoding with spruchWalzenStellungen {} differs on enigma {}'.format(spruchWalzenStellungen, name)
+   if enigma.umkehrwalzen:
+    assert compiled.decode(eMsg, useSpruchWalzenStellungen = True) == linked.decode(eMsg, useSpruchWalzenStellungen = True) == msg, 'Compiled decoding of {} differs on enigma {}'.format(eMsg, name)
+   assert compiled.encodeMatrix(30) == linked.encodeMatrix(30), 'Compiled encodeMatrix differs on enigma {}'.format(name)
+   assert compiled.findDoublets(0, enigma.numberOfWalzen) == linked.findDoublets(0, enigma.numberOfWalzen), 'Compiled findDoublets differs on enigma {}'.format(name)
+  print('- {} completed'.format(name))
+
+def test_ringSettings(pytestconfig):
+ print('\n--- test_ringSettings ---')
+ rnd = random.Random(25)
+ for name in ['Enigma_I', 'Enigma_D', 'Enigma_M4', 'Enigma_A']:
+  enigma = MzEnigma.machines[name]
+  n = enigma.numberOfWalzen
+  for _ in range(3):
+   msg = ''.join(rnd.choice(enigma.alphabet) for _ in range(200))
+   ringSettings = ''.join(rnd.choice(enigma.alphabet[1:]) for _ in range(n))
+   walzen = rnd.sample(enigma.walzen, n)
+   tagesWalzenStellungen = ''.join(rnd.choice(enigma.alphabet) for _ in range(n))
+   linked = MzEnigma.Tagesschluessel(enigma, walzen = walzen, umkehrwalze = enigma.umkehrwalzen[0], tagesWalzenStellungen = tagesWalzenStellungen, 
+                                                    ringSettings = ringSettings, notify = None)
+   eMsg = linked.encode(msg)
+   assert linked.decode(eMsg) == msg, 'Decoding with ring settings {} failed on enigma {}'.format(ringSettings, name)
+   compiled = MzEnigma.Tagesschluessel(enigma, walzen = walzen, umkehrwalze = enigma.umkehrwalzen[0], tagesWalzenStellungen = tagesWalzenStellungen, 
+                                                         steckerbrett = copy.deepcopy(linked.steckerbrett), zusatzwalze = linked.zusatzwalze, 
+                                                         ringSettings = ringSettings, compiled = True, notify = None)
+   assert compiled.encode(msg) == eMsg, 'Compiled encoding with ring settings {} differs on enigma {}'.format(ringSettings, name)
+   assert MzEnigma.CompactTagesschluessel.fromTagesschluessel(linked).encode(msg) == eMsg, 'Compact encoding with ring settings {} differs on enigma {}'.format(ringSettings, name)
+   # the rings of encodeBatch are added to the rings 'A..' of the scrambler
+   unringed = MzEnigma.Tagesschluessel(enigma, walzen = walzen, umkehrwalze = enigma.umkehrwalzen[0], tagesWalzenStellungen = tagesWalzenStellungen, 
+                                                         steckerbrett = copy.deepcopy(linked.steckerbrett), zusatzwalze = linked.zusatzwalze, notify = None)
+   scrambler = unringed.scrambler()
+   positions = scrambler.walzenStellungenCodes([tagesWalzenStellungen])
+   rings = scrambler.walzenStellungenCodes([ringSettings])
+   encoded = scrambler.encodeBatch(scrambler.toCodes(msg), positions, rings)
+   assert scrambler.fromCodes(encoded[0]) == eMsg, 'encodeBatch with ring settings {} differs on enigma {}'.format(ringSettings, name)
+   assert unringed.encode(msg) != eMsg, 'Ring settings {} ignored on enigma {}'.format(ringSettings, name)
+   # the Walzen are equal independent of their rings, the Tagesschluessels are not
+   ringed = copy.deepcopy(walzen[0])
+   ringed.ringSetting = ringSettings[0]
+   assert linked.walzen == unringed.walzen and ringed in walzen, 'Walzen with ring settings {} differ on enigma {}'.format(ringSettings, name)
+   assert linked != unringed, 'Tagesschluessels with ring settings {} equal on enigma {}'.format(ringSettings, name)
+   changed = MzEnigma.Tagesschluessel.changeWalzen(linked, walzen = walzen[::-1], tagesWalzenStellungen = tagesWalzenStellungen)
+   assert changed.ringSettings == ringSettings, 'Ring settings {} not kept by changeWalzen on enigma {}'.format(ringSettings, name)
+   if n > 1:
+    with pytest.raises(AssertionError):
+     MzEnigma.Tagesschluessel.changeWalzen(linked, walzen = walzen[1:])
+  print('- {} completed'.format(name))
+
+def test_rebind(pytestconfig):
+ print('\n--- test_rebind ---')
+ rnd = random.Random(5)
+ # Enigma I and M3 are used with a zusatzwalze of the M4, a Tagesschluessel of the M4 always has a zusatzwalze
+ zusatzwalze = MzEnigma.Enigma_M4.zusatzwalzen[0]
+ for name in ['Enigma_I', 'Enigma_M3']:
+  enigma = MzEnigma.machines[name]
+  n = enigma.numberOfWalzen
+  msg = ''.join(rnd.choice(enigma.alphabet) for _ in range(100))
+  steckerbrettWiring = enigma.alphabet[1] + enigma.alphabet[0] + enigma.alphabet[2:]
+  compact = MzEnigma.CompactTagesschluessel(enigma, umkehrwalze = enigma.umkehrwalzen[0], walzen = enigma.walzen[:n], tagesWalzenStellungen = enigma.alphabet[:n], 
+                                                                   steckerbrettWiring = steckerbrettWiring, zusatzwalze = zusatzwalze, ringSettings = 'B' * n)
+  compact.encode(msg)
+  walzen = rnd.sample(enigma.walzen, n)
+  tagesWalzenStellungen = ''.join(rnd.choice(enigma.alphabet) for _ in range(n))
+  # None removes the Steckerbrett wiring, the zusatzwalze and the ring settings, the umkehrwalze is kept
+  compact.rebind(walzen = walzen, tagesWalzenStellungen = tagesWalzenStellungen, steckerbrettWiring = None, zusatzwalze = None, ringSettings = None)
+  assert compact.steckerbrettWiring is None and compact.zusatzwalze is None and compact.ringSettings is None, 'Elements not removed by rebind on enigma {}'.format(name)
+  # a Tagesschluessel without a Steckerbrett uses the Steckerbrett of the enigma, it is left unplugged
+  fresh = MzEnigma.Tagesschluessel(enigma, umkehrwalze = enigma.umkehrwalzen[0], walzen = walzen, tagesWalzenStellungen = tagesWalzenStellungen, 
+                                                    steckerbrett = MzEnigma.Steckerbrett(enigma.steckerbrett.name, enigma.alphabet, enigma.alphabet), notify = None)
+  assert compact.toTagesschluessel() == fresh, 'Rebound Tagesschluessel differs from a fresh Tagesschluessel on enigma {}'.format(name)
+  assert compact.encode(msg) == fresh.encode(msg), 'Rebound encoding differs from a fresh Tagesschluessel on enigma {}'.format(name)
+  # elements not passed are kept
+  compact.rebind(steckerbrettWiring = steckerbrettWiring, zusatzwalze = zusatzwalze)
+  fresh = MzEnigma.Tagesschluessel(enigma, umkehrwalze = enigma.umkehrwalzen[0], walzen = walzen, tagesWalzenStellungen = tagesWalzenStellungen, 
+                                                    steckerbrett = MzEnigma.Steckerbrett(enigma.steckerbrett.name, steckerbrettWiring, enigma.alphabet), zusatzwalze = zusatzwalze, notify = None)
+  assert compact.toTagesschluessel() == fresh, 'Rebound Tagesschluessel with Steckerbrett differs from a fresh Tagesschluessel on enigma {}'.format(name)
+  assert compact.encode(msg) == fresh.encode(msg), 'Rebound encoding with Steckerbrett differs from a fresh Tagesschluessel on enigma {}'.format(name)
+  print('- {} completed'.format(name))
+
+def test_seek(pytestconfig):
+ print('\n--- test_seek ---')
+ rnd = random.Random(4)
+ # Enigma_M3/M4 with the walzen VI..VIII and Enigma_T/G312 have several notches per Walze
+ for name in ['Enigma_I', 'Enigma_M3', 'Enigma_M4', 'Enigma_T', 'Enigma_G312']:
+  enigma = MzEnigma.machines[name]
+  n = enigma.numberOfWalzen
+  for trial in range(4):
+   walzen = rnd.sample(enigma.walzen, n)
+   if trial == 0:
+    # the first and the middle Walze stand at their notches, i.e. the first letter steps three Walzen at once (the fourth Walze of the M4 does not step)
+    walzenStellungen = walzen[0].notches[0] + walzen[1].notches[0] + ''.join(rnd.choice(enigma.alphabet) for _ in range(n - 2))
+   else:
+    walzenStellungen = ''.join(rnd.choice(enigma.alphabet) for _ in range(n))
+   enigmaSetting = MzEnigma.Tagesschluessel(enigma, walzen = walzen, tagesWalzenStellungen = walzenStellungen, notify = None)
+   # step letter by letter
+   stepped = list()
+   for walze, ringstellung in zip(enigmaSetting.walzen, walzenStellungen):
+    walze.ringstellung = ringstellung
+   for _ in range(2000):
+    stepped.append(''.join(walze.ringstellung for walze in enigmaSetting.walzen))
+    enigmaSetting.walzen[0].step()
+   if trial == 0:
+    assert all(a != b for a, b in zip(stepped[0][:3], stepped[1][:3])), 'Not all Walzen stepped on enigma {}: {}'.format(name, stepped[:2])
+   for k in list(range(100)) + rnd.sample(range(100, len(stepped)), 100):
+    assert enigmaSetting.walzenStellungenAt(k, walzenStellungen) == stepped[k], 'walzenStellungenAt({}) = {} != {} on enigma {}'.format(k, enigmaSetting.walzenStellungenAt(k, walzenStellungen), stepped[k], name)
+  print('- {} completed'.format(name))
+
+def test_permutationTable(pytestconfig):
+ print('\n--- test_permutationTable ---')
+ rnd = random.Random(3)
+ for name in ['Enigma_I', 'Enigma_M4', 'Enigma_T', 'Enigma_A']:
+  enigma = MzEnigma.machines[name]
+  n = enigma.numberOfWalzen
+  enigmaSetting = MzEnigma.Tagesschluessel(enigma, walzen = rnd.sample(enigma.walzen, n), 
+                                                            tagesWalzenStellungen = ''.join(rnd.choice(enigma.alphabet) for _ in range(n)), notify = None)
+  for start, length in [(0, 50), (17, 40), (700, 30)]:
+   table = enigmaSetting.permutationTable(length, start)
+   assert table.shape == (length, len(enigma.alphabet)), 'Shape {} of permutationTable on enigma {}'.format(table.shape, name)
+   for x, c in enumerate(enigma.alphabet):
+    encoded = enigmaSetting.encode((start + length) * c)[start:]
+    assert ''.join(enigma.alphabet[y] for y in table[:, x]) == encoded, 'permutationTable({}, {}) of {} differs on enigma {}'.format(length, start, c, name)
+  print('- {} completed'.format(name))
+
+def test_encodeBatch(pytestconfig):
+ print('\n--- test_encodeBatch ---')
+ rnd = random.Random(2)
+ for name in ['Enigma_I', 'Enigma_M4', 'Enigma_G312', 'Enigma_A']:
+  enigma = MzEnigma.machines[name]
+  n = enigma.numberOfWalzen
+  enigmaSetting = MzEnigma.Tagesschluessel(enigma, walzen = rnd.sample(enigma.walzen, n), notify = None)
+  scrambler = enigmaSetting.scrambler()
+  msg = ''.join(rnd.choice(enigma.alphabet) for _ in range(300))
+  walzenStellungenList = [''.join(rnd.choice(enigma.alphabet) for _ in range(n)) for _ in range(20)]
+  encoded = scrambler.encodeBatch(scrambler.toCodes(msg), scrambler.walzenStellungenCodes(walzenStellungenList))
+  assert encoded.shape == (len(walzenStellungenList), len(msg)), 'Shape {} of encodeBatch on enigma {}'.format(encoded.shape, name)
+  for walzenStellungen, row in zip(walzenStellungenList, encoded):
+   enigmaSetting.tagesWalzenStellungen = walzenStellungen
+   assert scrambler.fromCodes(row) == enigmaSetting.encode(msg), 'encodeBatch at {} differs on enigma {}'.format(walzenStellungen, name)
+  print('- {} completed'.format(name))
+
+def test_scramblerVersions(pytestconfig):
+ print('\n--- test_scramblerVersions ---')
+ enigma = MzEnigma.Enigma_M4
+ enigmaSetting = MzEnigma.Tagesschluessel(enigma, walzen = enigma.walzen[:4], umkehrwalze = enigma.umkehrwalzen[0], 
+                                                            zusatzwalze = enigma.zusatzwalzen[0], tagesWalzenStellungen = 'ABCD', notify = None, 
+                                                            steckerbrett = MzEnigma.Steckerbrett(enigma.steckerbrett.name, enigma.alphabet, enigma.alphabet))
+ msg = 'DIEENIGMAISTEINEROTORSCHLUESSELMASCHINE'
+ scrambler = enigmaSetting.scrambler()
+ enigmaSetting.encode(msg)
+ assert enigmaSetting.scrambler() is scrambler, 'Scrambler compiled again without any change'
+ changes = {'steckerbrett': lambda: enigmaSetting.steckerbrett.addMark3Setting('A', 'Z'), 
+                  'ringSettings': lambda: setattr(enigmaSetting, 'ringSettings', 'BBBB'), 
+                  'zusatzwalze': lambda: setattr(enigmaSetting.zusatzwalze, 'ringstellung', 'Q'), 
+                  'walzen': lambda: setattr(enigmaSetting.walzen[1], 'wiring', enigmaSetting.walzen[1].wiring[1:] + enigmaSetting.walzen[1].wiring[0])}
+ for change, function in changes.items():
+  function()
+  expected = copy.deepcopy(enigmaSetting)
+  expected.compiled = False
+  assert enigmaSetting.scrambler() is not scrambler, 'Scrambler not compiled again after a change of {}'.format(change)
+  scrambler = enigmaSetting.scrambler()
+  assert scrambler.encode(msg, 'ABCD') == expected.encode(msg), 'Scrambler differs after a change of {}'.format(change)
+  print('- {} completed'.format(change))
+
+def test_stream(pytestconfig):
+ print('\n--- test_stream ---')
+ rnd = random.Random(6)
+ enigma = MzEnigma.Enigma_I
+ enigmaSetting = MzEnigma.Tagesschluessel(enigma, 
+                                                            umkehrwalze = MzEnigma.UKW_B, 
+                                                            walzen = [MzEnigma.I, MzEnigma.II, MzEnigma.III], 
+                                                            tagesWalzenStellungen = 'QEV', 
+                                                            steckerbrett = MzEnigma.Steckerbrett('Mark 3', 'ARDCEFTIHXPSVQOKNBLGUMYJWZ'), 
+                                                            notify = None)
+ msg = ''.join(rnd.choice(enigma.alphabet) for _ in range(2000))
+ eMsg = enigmaSetting.encode(msg)
+ # chunks of any length, including empty chunks and single letters
+ cuts = sorted(rnd.sample(range(len(msg)), 40) + [0, 1, 1, len(msg)])
+ parts = [msg[start:stop] for start, stop in zip(cuts[:-1], cuts[1:])]
+ stream = MzEnigma.EnigmaStream(enigmaSetting)
+ assert ''.join(stream.encodeChunks(parts)) == eMsg, 'Encoding of chunks differs'
+ assert stream.numberOfLetters == len(msg), 'Number of letters {} != {}'.format(stream.numberOfLetters, len(msg))
+ stream.reset()
+ assert ''.join(stream.encodeChunks([eMsg])) == msg, 'Decoding of the stream failed'
+ # utf-8 text with characters not in the alphabet, multibyte characters split between the chunks
+ text = ''.join(c + rnd.choice(['', '', 'ä', 'Ö\n', ' ']) for c in msg.lower())
+ for chunkSize in [1, 7, 4096]:
+  stream = MzEnigma.EnigmaStream(enigmaSetting, skipInvalid = True)
+  assert ''.join(stream.encodeFileChunks(io.BytesIO(text.encode('utf-8')), chunkSize = chunkSize)) == eMsg, 'Encoding of bytes with chunkSize = {} differs'.format(chunkSize)
+  stream = MzEnigma.EnigmaStream(enigmaSetting, skipInvalid = True)
+  dst = io.StringIO()
+  numberOfChars = stream.encodeFile(io.StringIO(text), dst, chunkSize = chunkSize)
+  assert numberOfChars == len(eMsg) and dst.getvalue() == eMsg, 'Encoding of a file with chunkSize = {} differs'.format(chunkSize)
+ print('- Enigma_I completed')
+
+def test_findPatterns(pytestconfig):
+ print('\n--- test_findPatterns ---')
+ rnd = random.Random(24)
+ substringList = ['WETTER', 'WET', 'X', 'BERICHT', 'ZZZZQQQ']
+ for name in ['Enigma_I', 'Enigma_D', 'Enigma_M4']:
+  enigma = MzEnigma.machines[name]
+  enigmaSetting = MzEnigma.Tagesschluessel(enigma, walzen = enigma.walzen[:enigma.numberOfWalzen], umkehrwalze = enigma.umkehrwalzen[0], notify = None)
+  tagesWalzenStellungen = enigmaSetting.tagesWalzenStellungen
+  encodedSpruchList = [enigmaSetting.encode('ABCDEFWETTERGHIJ'), enigmaSetting.encode('BERICHTQAAAAAAAAAAX')]
+  tagesWalzenStellungenList = [''.join(rnd.choice(enigma.alphabet) for _ in range(enigma.numberOfWalzen)) for _ in range(50)] + [tagesWalzenStellungen]
+  # brute force: encode the substring at any position for any tagesWalzenStellungen
+  expected = dict()
+  for v in tagesWalzenStellungenList:
+   enigmaSetting.tagesWalzenStellungen = v
+   for encodedSpruch in encodedSpruchList:
+    for substring in substringList:
+     for n in range(len(encodedSpruch) - len(substring) + 1):
+      if enigmaSetting.encode(enigma.alphabet[0] * n + substring)[n:] == encodedSpruch[n:n + len(substring)]:
+       expected.setdefault(substring, set()).add(v)
+  enigmaSetting.tagesWalzenStellungen = tagesWalzenStellungen
+  assert all(tagesWalzenStellungen in expected[v] for v in ['WETTER', 'WET', 'BERICHT', 'X']), 'Brute force search of {} failed'.format(name)
+  for workers in [1, 2]:
+   result = enigmaSetting.findPatterns(substringList, encodedSpruchList, tagesWalzenStellungenList, workers = workers)
+   assert result == expected, 'findPatterns of {} with workers = {} differs: {} != {}'.format(name, workers, result, expected)
+  search = MzEnigma.PatternSearch(substringList, encodedSpruchList, enigma.alphabet)
+  matchDict = search.run(enigmaSetting.scrambler(), tagesWalzenStellungenList)
+  assert {substring: {v for v, _, _ in matches} for substring, matches in matchDict.items()} == expected, 'PatternSearch of {} differs'.format(name)
+  assert search.run(enigmaSetting.scrambler(), tagesWalzenStellungenList, chunkSize = 16, workers = 3) == matchDict, 'PatternSearch of {} with workers = 3 differs'.format(name)
+  print('- {} completed'.format(name))
+
 if __name__ == "__main__":
  pattern = '.+'
- for name, enigma in vars(MzEnigma).items():
+ for name, enigma in MzEnigma.machines.items():
   if isinstance(enigma, MzEnigma.Enigma) and re.fullmatch(pattern, name):
    enigmaSetting = MzEnigma.Tagesschluessel(enigma,  notify = None)
    spruchWalzenStellungen = ''.join(random.sample(enigma.alphabet, enigma.numberOfWalzen))
@@ -96,3 +343,45 @@ if __name__ == "__main__":
    print('{}/{} -> {}: decoded = {}'.format(enigmaSetting.tagesWalzenStellungen, spruchWalzenStellungen + spruchWalzenStellungen, twiceEncodedSpruchWalzenStellungen, enigmaSetting.decode(twiceEncodedSpruchWalzenStellungen)))
    break
 
+
+def test_ngramScore(pytestconfig):
+ print('\n--- test_ngramScore ---')
+ rnd = random.Random(14)
+ for language, floor in [('german', 0.0), ('english', -0.5)]:
+  spruchScoring = MzEnigma.SpruchScoring(language, floor = floor)
+  for alphabet in [MzEnigma.stdAlphabet, MzEnigma.sgsAlphabet]:
+   sprueche = [''.join(rnd.choice(alphabet) for _ in range(80)) for _ in range(5)]
+   for numberOfChars in spruchScoring.ngramDict:
+    for validChars in [alphabet, alphabet[:10]]:
+     validCodes = [alphabet.index(c) for c in validChars]
+     expected = list()
+     for spruch in sprueche:
+      # dict based score, n-grams not found in the statistics are scored by floor
+      score = 0
+      for n in range(len(spruch) - numberOfChars + 1):
+       ngram = spruch[n:n + numberOfChars]
+       if any(c in validChars for c in ngram):
+        score += spruchScoring.ngramDict[numberOfChars].get(ngram, floor)
+      expected.append(score/(len(spruch) - numberOfChars + 1))
+      assert spruchScoring.ngramScore(spruch, numberOfChars, validChars, alphabet) == pytest.approx(expected[-1]), 'ngramScore of {} differs ({}, {})'.format(spruch, language, numberOfChars)
+      codes = [alphabet.index(c) for c in spruch]
+      assert spruchScoring.ngramScoreCodes(codes, numberOfChars, validCodes, alphabet) == pytest.approx(expected[-1]), 'ngramScoreCodes of {} differs ({}, {})'.format(spruch, language, numberOfChars)
+     codes = numpy.array([[alphabet.index(c) for c in spruch] for spruch in sprueche])
+     assert spruchScoring.ngramScoreBatch(codes, numberOfChars, validCodes, alphabet).tolist() == pytest.approx(expected), 'ngramScoreBatch differs ({}, {})'.format(language, numberOfChars)
+  # characters of the spruch outside of validChars are scored by 0 only
+  spruch = ''.join(rnd.choice(MzEnigma.stdAlphabet) for _ in range(80))
+  assert spruchScoring.ngramScore(spruch, 1, validChars = 'ENR') == sum(spruchScoring.ngramDict[1][c] for c in spruch if c in 'ENR')/len(spruch), 'ngramScore with validChars ENR differs ({})'.format(language)
+  print('- {} completed'.format(language))
+
+def test_indexOfCoincidence(pytestconfig):
+ print('\n--- test_indexOfCoincidence ---')
+ rnd = random.Random(12)
+ for alphabet in [MzEnigma.stdAlphabet, MzEnigma.sgsAlphabet]:
+  for length in [2, 30, 200]:
+   # random sprueche and sprueche of a few characters only, i.e. high indices of coincidence
+   sprueche = [''.join(rnd.choice(alphabet) for _ in range(length)) for _ in range(5)]
+   sprueche += [''.join(rnd.choice(alphabet[:n]) for _ in range(length)) for n in [1, 3]]
+   expected = [MzEnigma.SpruchScoring.indexOfCoincidence(spruch, alphabet) for spruch in sprueche]
+   codes = numpy.array([[alphabet.index(c) for c in spruch] for spruch in sprueche])
+   assert MzEnigma.SpruchScoring.indexOfCoincidenceBatch(codes, len(alphabet)).tolist() == pytest.approx(expected), 'indexOfCoincidenceBatch differs (length {})'.format(length)
+  print('- {} completed'.format(alphabet))